@@ -0,0 +1,288 @@
+"""Module backends that contains the ground checking backends of go_gilmore.
+
+A backend collects the encoded ground instances of the Herbrand levels and
+decides whether their conjunction is contradictory. Every backend has the
+same interface:
+
+    normal_form     the normal form of the encoded instances, dnf or cnf
+    add(instances)  adds a stream of encoded instances, returns True if the
+                    conjunction is already known to be contradictory
+    check()         decides if the conjunction of all the instances added
+                    so far is contradictory
+    open_clause()   returns an encoded clause that is left of the
+                    conjunction after check, None if nothing is left
+    print_state()   prints what is left of the conjunction after check
+    close()         releases the resources of the backend"""
+from literals import EMPTY_CLAUSE, bits, multiply_encoded
+from dnf import dnf, print_dnf
+from cnf import cnf
+from dpll import Solver
+from store import ClauseStore
+from vectorized import multiply_level
+
+# Number of instances multiplied in one pass over a clause store
+INSTANCES_PER_PASS = 16
+
+class MultiplicationBackend(object):
+    """The multiplication method: the DNF of the conjunction is built and
+    only its non-contradictory clauses are kept."""
+
+    normal_form = staticmethod(dnf)
+
+    def __init__(self, literal_table):
+        self.literal_table = literal_table
+        # The DNF of the empty conjunction is a single empty clause
+        self.surviving_clauses = [EMPTY_CLAUSE]
+
+    def add(self, instances):
+        """Multiplies the surviving clauses by the given instances.
+
+        Stops as soon as no clause survives."""
+        clause_list = self.surviving_clauses
+        for instance in instances:
+            clause_list = multiply_encoded(clause_list, instance)
+            if not clause_list:
+                break
+        self.surviving_clauses = clause_list
+        return not clause_list
+
+    def check(self):
+        """Checks if no clause survived."""
+        return not self.surviving_clauses
+
+    def open_clause(self):
+        """Returns the first clause that survived."""
+        if not self.surviving_clauses:
+            return None
+        return self.surviving_clauses[0]
+
+    def print_state(self):
+        """Prints the clauses that survived."""
+        print "-- DNF WITH SUBSTITUTIONS --"
+        print_dnf([self.literal_table.decode_clause(clause) \
+        for clause in self.surviving_clauses])
+        print "---------"
+        print("SURVIVING CLAUSES: %s" % len(self.surviving_clauses))
+
+    def close(self):
+        pass
+
+class VectorizedBackend(MultiplicationBackend):
+    """The multiplication method on numpy matrices, see the vectorized
+    module.
+
+    add only collects the instances, check multiplies the surviving clauses
+    by all the instances of the level at once and removes the subsumed
+    products at the end. Without numpy the instances are multiplied one
+    after the other, as by the multiplication backend."""
+
+    def __init__(self, literal_table):
+        MultiplicationBackend.__init__(self, literal_table)
+        self.pending_instances = []
+
+    def add(self, instances):
+        """Collects the given instances for the next check."""
+        self.pending_instances.extend(instances)
+        return not self.surviving_clauses
+
+    def check(self):
+        """Multiplies the surviving clauses by the collected instances,
+        checks if no clause survived."""
+        if self.pending_instances:
+            self.surviving_clauses = multiply_level(self.surviving_clauses, \
+            self.pending_instances)
+            self.pending_instances = []
+        return not self.surviving_clauses
+
+class DpllBackend(object):
+    """The Davis-Putnam method: the satisfiability of the CNF clauses of
+    the instances is decided by a DPLL solver.
+
+    The matrix is converted to CNF with definitional atoms once, see the
+    cnf module, so every instance is already a list of solver clauses.
+
+    Every level only extends the clause set of the previous one, so a
+    single solver is kept for the whole proof: only the clauses of the new
+    instances are added to it, and its learned clauses, the activity of
+    its variables and the atom to variable mapping carry over from one
+    check to the next."""
+
+    normal_form = staticmethod(cnf)
+
+    def __init__(self, literal_table):
+        self.literal_table = literal_table
+        self.solver = Solver()
+        # atom id => solver variable
+        self.variables = {}
+
+    def add(self, instances):
+        """Adds the CNF clauses of the given instances to the solver.
+
+        Stops as soon as the clauses are contradictory on level 0."""
+        for instance in instances:
+            if not self.add_instance(instance):
+                return True
+        return False
+
+    def check(self):
+        """Runs the solver on the clauses added so far."""
+        return not self.solver.solve()
+
+    def add_instance(self, instance):
+        """Adds the CNF clauses of an encoded instance to the solver.
+
+        Returns False if the clauses became unsatisfiable."""
+        for clause in instance:
+            if not self.solver.add_clause(self.literals(clause)):
+                return False
+        return True
+
+    def literals(self, clause):
+        """Returns the solver literals of an encoded clause."""
+        positive, negative = clause
+        return [self.variable(bit) for bit in bits(positive)] \
+        + [-self.variable(bit) for bit in bits(negative)]
+
+    def variable(self, bit):
+        """Returns the solver variable of the atom of a given bit."""
+        atom_id = bit.bit_length() - 1
+        variable = self.variables.get(atom_id)
+        if variable is None:
+            variable = self.solver.new_variable()
+            self.variables[atom_id] = variable
+        return variable
+
+    def open_clause(self):
+        """Returns the literals of the model found by the last check."""
+        if self.solver.unsatisfiable:
+            return None
+        model = set(self.solver.model())
+        positive = 0
+        negative = 0
+        for atom_id, variable in self.variables.items():
+            if variable in model:
+                positive |= 1 << atom_id
+            else:
+                negative |= 1 << atom_id
+        return (positive, negative)
+
+    def print_state(self):
+        """Prints the literals of the model found by the last check."""
+        clause = self.open_clause()
+        if clause is None:
+            return
+        print "-- SURVIVING CLAUSE --"
+        print_dnf([self.literal_table.decode_clause(clause)])
+
+    def close(self):
+        pass
+
+class DiskBackend(object):
+    """The multiplication method over clause stores.
+
+    The surviving clauses live in a memory mapped file, see the store
+    module. Every pass streams over the file, multiplies each clause by a
+    batch of instances depth first and writes the products that are not
+    contradictory to a new file, so only the batch is kept in memory.
+    Duplicate and subsumed clauses are not removed, that would need all
+    the clauses in memory."""
+
+    normal_form = staticmethod(dnf)
+
+    def __init__(self, literal_table, directory=None):
+        self.literal_table = literal_table
+        self.directory = directory
+        # The DNF of the empty conjunction is a single empty clause
+        self.store = ClauseStore(directory)
+        self.store.append(EMPTY_CLAUSE)
+
+    def add(self, instances):
+        """Multiplies the stored clauses by the given instances.
+
+        Stops as soon as no clause survives."""
+        batch = []
+        for instance in instances:
+            batch.append(instance)
+            if len(batch) == INSTANCES_PER_PASS:
+                if self.multiply(batch):
+                    return True
+                batch = []
+        return self.multiply(batch)
+
+    def multiply(self, batch):
+        """Multiplies the stored clauses by a batch of instances in one pass.
+
+        Returns True if no clause survives."""
+        if not batch or not len(self.store):
+            return not len(self.store)
+
+        products = ClauseStore(self.directory)
+        for clause in self.store:
+            # depth first over the batch, every step of the path holds the
+            # index of the next clause to try and the product so far
+            path = [(0, clause)]
+            while path:
+                choice, (positive, negative) = path[-1]
+                clauses = batch[len(path) - 1]
+                if choice == len(clauses):
+                    path.pop()
+                    continue
+                path[-1] = (choice + 1, (positive, negative))
+
+                clause_positive, clause_negative = clauses[choice]
+                positive |= clause_positive
+                negative |= clause_negative
+                if positive & negative:
+                    continue
+                if len(path) == len(batch):
+                    products.append((positive, negative))
+                else:
+                    path.append((0, (positive, negative)))
+
+        self.store.close()
+        self.store = products
+        return not len(products)
+
+    def check(self):
+        """Checks if no clause survived."""
+        return not len(self.store)
+
+    def open_clause(self):
+        """Returns the first clause that survived."""
+        for clause in self.store:
+            return clause
+        return None
+
+    def __getstate__(self):
+        raise Exception("Backend exception: the disk backend can not be \
+        checkpointed!")
+
+    def print_state(self):
+        """Prints the clauses that survived."""
+        print "-- DNF WITH SUBSTITUTIONS --"
+        for clause in self.store:
+            print_dnf([self.literal_table.decode_clause(clause)])
+        print "---------"
+        print("SURVIVING CLAUSES: %s" % len(self.store))
+
+    def close(self):
+        """Removes the clause store."""
+        self.store.close()
+
+# Backend name => constructor that takes a literal table and the options
+BACKENDS = {
+    "multiplication": lambda literal_table, store_directory: \
+        MultiplicationBackend(literal_table),
+    "vectorized": lambda literal_table, store_directory: \
+        VectorizedBackend(literal_table),
+    "dpll": lambda literal_table, store_directory: \
+        DpllBackend(literal_table),
+    "disk": lambda literal_table, store_directory: \
+        DiskBackend(literal_table, store_directory),
+}
+
+def make_backend(name, literal_table, store_directory=None):
+    """Returns a new backend with a given name."""
+    if name not in BACKENDS:
+        raise Exception("Backend exception: unknown backend %s!" % name)
+    return BACKENDS[name](literal_table, store_directory)
@@ -0,0 +1,154 @@
+"""Module batch that proves a stream of problems on a pool of processes.
+
+Every problem is proven by prove_valid in a fresh worker process, under a
+wall-clock, an instance and a memory budget, and gives one tab separated
+result row: the name, the status, the number of the level reached, the
+size of the Herbrand universe, the number of instances and the time in
+seconds. The formulas are sent to the
+workers serialized (see the serialize module), and every worker starts with
+an empty global_signature and fresh unique name counters, so the problems
+of a corpus do not see each other.
+
+    python batch.py corpus.p --time-limit 10 --memory-limit 1024 -o out.tsv"""
+from gilmore import prove_valid, Result, LimitExceeded, TIME_LIMIT, \
+GILMORE_LIMIT, QUIET, PROGRESS
+from serialize import dumps, loads
+from syntax_tree import global_signature
+from checkpoint import COUNTERS, set_counters
+from reader import load_problems
+from multiprocessing import Pool, cpu_count
+from itertools import chain
+from time import time
+import argparse
+import resource
+import signal
+import traceback
+import sys
+
+# Statuses of the problems that did not finish in a worker
+MEMORY_LIMIT = "MEMORY_LIMIT"
+ERROR = "ERROR"
+
+COLUMNS = ["name", "status", "level", "universe", "instances", "time"]
+
+def time_out(signum, frame):
+    raise LimitExceeded(TIME_LIMIT)
+
+def prove_problem(task):
+    """Proves one problem in a worker process, returns its result row."""
+    name, blob, options, time_limit, memory_limit = task
+    if isinstance(blob, Exception):
+        # the problem could not be read
+        sys.stderr.write("%s: %s\n" % (name, blob))
+        return [name, ERROR, None, None, None, "0.000"]
+
+    global_signature.clear()
+    set_counters([0] * len(COUNTERS))
+    if memory_limit is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+    start = time()
+    if time_limit is not None:
+        signal.signal(signal.SIGALRM, time_out)
+        signal.setitimer(signal.ITIMER_REAL, time_limit)
+    try:
+        result = prove_valid(loads(blob), **options)
+    except LimitExceeded as limit:
+        # the time ran out before the search started
+        result = Result(limit.status, 0, None, 0)
+    except MemoryError:
+        result = Result(MEMORY_LIMIT, None, None, None)
+    except Exception:
+        traceback.print_exc()
+        result = Result(ERROR, None, None, None)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        sys.stdout.flush()
+
+    return [name, result.status, result.level, result.universe_size, \
+    result.instances, "%.3f" % (time() - start)]
+
+def prove_batch(problems, output, processes=None, time_limit=None, \
+memory_limit=None, **options):
+    """Proves the (name, formula) problems of a stream valid, the formula
+    of a problem that could not be read is its exception.
+
+    Writes a header and one result row per problem to output, in the order
+    the problems finish, and returns the number of problems per status.
+    time_limit is in seconds and memory_limit in bytes, the instance budget
+    and the other options are passed to go_gilmore, see max_instances. The
+    parallel option is not allowed, the workers can not have processes of
+    their own."""
+    if options.get("parallel"):
+        raise Exception("Batch exception: parallel proofs in a batch!")
+    if processes is None:
+        processes = cpu_count()
+
+    # A problem that could not be read keeps its exception in place of the
+    # formula and gets an ERROR row, see load_problems
+    tasks = ((name, formula if isinstance(formula, Exception) \
+    else dumps(formula), options, time_limit, memory_limit) \
+    for name, formula in problems)
+
+    output.write("\t".join(COLUMNS) + "\n")
+    output.flush()
+    sys.stdout.flush()
+
+    statuses = {}
+    # A process per problem, the memory limit and the global state of a
+    # proof die with it
+    pool = Pool(processes, maxtasksperchild=1)
+    try:
+        for row in pool.imap_unordered(prove_problem, tasks):
+            output.write("\t".join("-" if value is None else str(value) \
+            for value in row) + "\n")
+            output.flush()
+            statuses[row[1]] = statuses.get(row[1], 0) + 1
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+    return statuses
+
+def main(arguments):
+    argument_parser = argparse.ArgumentParser(description= \
+    "Proves the problems of files on a pool of processes.")
+    argument_parser.add_argument("paths", nargs="+")
+    argument_parser.add_argument("--syntax", choices=["gilmore", "tptp"])
+    argument_parser.add_argument("-o", "--output")
+    argument_parser.add_argument("-j", "--processes", type=int)
+    argument_parser.add_argument("--time-limit", type=float)
+    argument_parser.add_argument("--memory-limit", type=int, \
+    help="megabytes")
+    argument_parser.add_argument("--max-instances", type=int)
+    argument_parser.add_argument("--max-levels", type=int, \
+    default=GILMORE_LIMIT)
+    argument_parser.add_argument("--backend", default="multiplication")
+    argument_parser.add_argument("--verbose", action="store_true")
+    arguments = argument_parser.parse_args(arguments)
+
+    problems = chain.from_iterable(load_problems(path, arguments.syntax) \
+    for path in arguments.paths)
+    memory_limit = None
+    if arguments.memory_limit is not None:
+        memory_limit = arguments.memory_limit << 20
+
+    output = sys.stdout
+    if arguments.output is not None:
+        output = open(arguments.output, "w")
+    try:
+        statuses = prove_batch(problems, output, arguments.processes, \
+        arguments.time_limit, memory_limit, backend=arguments.backend, \
+        max_levels=arguments.max_levels, \
+        max_instances=arguments.max_instances, \
+        verbosity=PROGRESS if arguments.verbose else QUIET)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    for status in sorted(statuses):
+        sys.stderr.write("%s: %d\n" % (status, statuses[status]))
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,86 @@
+"""Module checkpoint that saves the state of a proof to disk and loads it.
+
+A checkpoint is a serialized blob of all the syntax tree nodes of the state
+(see the serialize module) followed by a pickle of the rest of the state,
+in which every node is a reference to its item in the blob. The counters of
+the unique names in syntax_tree are saved as well, so the names made after
+a resume do not clash with the names in the state."""
+from serialize import Encoder, Decoder
+from syntax_tree import Node
+from struct import pack, unpack_from, calcsize
+from cStringIO import StringIO
+from time import time
+import cPickle
+import syntax_tree
+import os
+
+LENGTH = "<I"
+
+# Names of the unique name counters in syntax_tree
+COUNTERS = ["uv_index", "uc_index", "uf_index", "up_index"]
+
+def get_counters():
+    """Returns the values of the unique name counters."""
+    return [getattr(syntax_tree, counter) for counter in COUNTERS]
+
+def set_counters(values):
+    """Sets the unique name counters to the given values."""
+    for counter, value in zip(COUNTERS, values):
+        setattr(syntax_tree, counter, value)
+
+def save_checkpoint(path, state):
+    """Writes a state dictionary to a file, atomically."""
+    encoder = Encoder()
+    items = {}
+
+    def persistent_id(obj):
+        if not isinstance(obj, Node):
+            return None
+        if obj not in items:
+            items[obj] = encoder.add_formula(obj)
+        return items[obj]
+
+    stream = StringIO()
+    pickler = cPickle.Pickler(stream, 2)
+    pickler.persistent_id = persistent_id
+    pickler.dump(state)
+    blob = encoder.to_bytes()
+
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "wb") as checkpoint_file:
+        checkpoint_file.write(pack(LENGTH, len(blob)))
+        checkpoint_file.write(blob)
+        checkpoint_file.write(stream.getvalue())
+    os.rename(temporary_path, path)
+
+def load_checkpoint(path):
+    """Reads a state dictionary written by save_checkpoint."""
+    with open(path, "rb") as checkpoint_file:
+        data = checkpoint_file.read()
+
+    length, = unpack_from(LENGTH, data)
+    start = calcsize(LENGTH)
+    decoder = Decoder(data[start:start + length])
+
+    unpickler = cPickle.Unpickler(StringIO(data[start + length:]))
+    unpickler.persistent_load = lambda item: decoder.formula(int(item))
+    return unpickler.load()
+
+class Checkpointer(object):
+    """A class that saves the state of a proof after a level, if at least
+    interval seconds passed since the last checkpoint."""
+
+    def __init__(self, path, state, interval=0):
+        self.path = path
+        self.state = state
+        self.interval = interval
+        self.last = time()
+
+    def level_done(self, level):
+        """Saves the state after the level with a given index is done."""
+        if time() - self.last < self.interval:
+            return
+        self.state["level"] = level
+        self.state["counters"] = get_counters()
+        save_checkpoint(self.path, self.state)
+        self.last = time()
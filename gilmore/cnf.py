@@ -0,0 +1,230 @@
+"""Module cnf that contains the functions for the Conjunctive Normal Form.
+
+Unlike dnf, the conversion never distributes one operator over another:
+every compound subformula below the top level clauses is replaced by a new
+definitional atom over its variables (Tseitin), so the CNF is linear in the
+size of the formula and satisfiable iff the formula is satisfiable. Only the
+implications needed by the polarity of a subformula are added, and a
+subformula that occurs more than once is defined only once."""
+from syntax_tree import OperandTypes, TermTypes, Not, TrueConstant, \
+FalseConstant, get_unique_predicate, subformulas, bottom_up
+from sys import stdout
+
+# Types that are replaced by a definitional atom
+COMPOUND_TYPES = [OperandTypes.T_AND, OperandTypes.T_OR, OperandTypes.T_IMP, \
+    OperandTypes.T_IFF]
+
+# Types that are their own literal
+LITERAL_TYPES = [OperandTypes.T_ATOM, OperandTypes.T_TRUE, OperandTypes.T_FALSE]
+
+def print_cnf(clause_list):
+    """Prints the clause list."""
+    for clause in clause_list:
+        stdout.write("[")
+        for i in range(0, len(clause)):
+            if i > 0:
+                stdout.write(" \\/ ")
+            clause[i].print_me()
+        stdout.write("]")
+        print
+
+def cnf(formula):
+    """Transforms a quantifier free formula into an equisatisfiable
+    Conjunctive Normal Form, a list of clauses that are lists of literals.
+
+    The formula does not have to be in NNF, implications and equivalences
+    are encoded directly."""
+    encoder = CnfEncoder()
+    encoder.add_formula(formula)
+    return encoder.clauses
+
+def negate(literal):
+    """Returns the complement of a literal or a logical constant."""
+    literal_type = literal.get_type()
+    if literal_type is OperandTypes.T_NOT:
+        return literal.get_formula()
+    elif literal_type is OperandTypes.T_TRUE:
+        return FalseConstant()
+    elif literal_type is OperandTypes.T_FALSE:
+        return TrueConstant()
+    return Not(literal)
+
+class CnfEncoder(object):
+    """A class that collects the CNF clauses of formulas, the definitions
+    of their subformulas are shared by all the formulas of one encoder."""
+
+    def __init__(self):
+        self.clauses = []
+        # subformula => its definitional atom
+        self.definitions = {}
+        # subformula => (positive, negative) implications already added
+        self.polarities = {}
+        # subformula => its variables, see variables
+        self.variable_lists = {}
+
+    def add_formula(self, formula):
+        """Adds the clauses of a formula that must be true."""
+        stack = [formula]
+        while stack:
+            node = stack.pop()
+            if node.get_type() is OperandTypes.T_AND:
+                stack.extend(reversed(node.get_formulas()))
+            else:
+                self.add_clause(self.disjuncts(node))
+
+    def disjuncts(self, formula):
+        """Returns the literals of a top level disjunction."""
+        literals = []
+        stack = [formula]
+        while stack:
+            node = stack.pop()
+            node_type = node.get_type()
+            if node_type is OperandTypes.T_OR:
+                stack.extend(reversed(node.get_formulas()))
+            elif node_type is OperandTypes.T_IMP:
+                stack.append(node.get_formula2())
+                literals.append(negate(self.literal(node.get_formula1(), \
+                False, True)))
+            else:
+                literals.append(self.literal(node, True, False))
+        return literals
+
+    def add_clause(self, literals):
+        """Adds a clause, true literals satisfy it and false ones are dropped."""
+        clause = []
+        for literal in literals:
+            literal_type = literal.get_type()
+            if literal_type is OperandTypes.T_TRUE:
+                return
+            if literal_type is not OperandTypes.T_FALSE \
+            and literal not in clause:
+                clause.append(literal)
+        self.clauses.append(clause)
+
+    def literal(self, formula, positive, negative):
+        """Returns a literal that stands for a formula.
+
+        positive and negative tell if the formula occurs positively or
+        negatively, a compound formula is replaced by its definitional atom
+        and the implications between them are added for those polarities.
+        The formula is walked with bottom_up, so its depth is not limited,
+        and the definitional atoms are made in the order of a recursion."""
+        # (formula, positive, negative) => the definition of the formula and
+        # the polarities whose implications are still to be added
+        pending = {}
+
+        def expand(item):
+            formula, positive, negative = item
+            formula_type = formula.get_type()
+
+            if formula_type in LITERAL_TYPES:
+                return []
+            elif formula_type is OperandTypes.T_NOT:
+                return [(formula.get_formula(), negative, positive)]
+            elif formula_type not in COMPOUND_TYPES:
+                raise Exception("CNF exception: formula must be quantifier free!")
+
+            definition = self.definitions.get(formula)
+            if definition is None:
+                definition = get_unique_predicate(self.variables(formula))
+                self.definitions[formula] = definition
+
+            added_positive, added_negative = self.polarities.get(formula, \
+            (False, False))
+            positive = positive and not added_positive
+            negative = negative and not added_negative
+            pending[item] = (definition, positive, negative)
+            if not positive and not negative:
+                return []
+            self.polarities[formula] = (added_positive or positive, \
+            added_negative or negative)
+
+            if formula_type is OperandTypes.T_IMP:
+                return [(formula.get_formula1(), negative, positive), \
+                (formula.get_formula2(), positive, negative)]
+            elif formula_type is OperandTypes.T_IFF:
+                # both polarities of the operands of an equivalence are needed
+                return [(formula.get_formula1(), True, True), \
+                (formula.get_formula2(), True, True)]
+            return [(operand, positive, negative) \
+            for operand in formula.get_formulas()]
+
+        def combine(item, literals):
+            formula = item[0]
+            formula_type = formula.get_type()
+
+            if formula_type in LITERAL_TYPES:
+                return formula
+            elif formula_type is OperandTypes.T_NOT:
+                return negate(literals[0])
+
+            definition, positive, negative = pending[item]
+            if positive or negative:
+                self.define(formula, definition, positive, negative, literals)
+            return definition
+
+        return bottom_up((formula, positive, negative), expand, combine)
+
+    def variables(self, formula):
+        """Returns the variables of a formula in the order of fetch_variables,
+        those of every subformula are kept for the next definitions."""
+        def expand(node):
+            if node in self.variable_lists:
+                return []
+            return subformulas(node)
+
+        def combine(node, values):
+            variables = self.variable_lists.get(node)
+            if variables is None:
+                if node.get_type() is TermTypes.T_VAR:
+                    variables = [node]
+                else:
+                    variables = []
+                    for operand_variables in values:
+                        for variable in operand_variables:
+                            if variable not in variables:
+                                variables.append(variable)
+                self.variable_lists[node] = variables
+            return variables
+
+        return list(bottom_up(formula, expand, combine))
+
+    def define(self, formula, definition, positive, negative, literals):
+        """Adds the clauses of definition => formula if positive is set and
+        of formula => definition if negative is set, literals stand for the
+        operands of the formula."""
+        formula_type = formula.get_type()
+        not_definition = Not(definition)
+
+        if formula_type is OperandTypes.T_AND:
+            if positive:
+                for literal in literals:
+                    self.add_clause([not_definition, literal])
+            if negative:
+                self.add_clause([definition] \
+                + [negate(literal) for literal in literals])
+
+        elif formula_type is OperandTypes.T_OR:
+            if positive:
+                self.add_clause([not_definition] + literals)
+            if negative:
+                for literal in literals:
+                    self.add_clause([definition, negate(literal)])
+
+        elif formula_type is OperandTypes.T_IMP:
+            literal1, literal2 = literals
+            if positive:
+                self.add_clause([not_definition, negate(literal1), literal2])
+            if negative:
+                self.add_clause([definition, literal1])
+                self.add_clause([definition, negate(literal2)])
+
+        else:
+            literal1, literal2 = literals
+            if positive:
+                self.add_clause([not_definition, negate(literal1), literal2])
+                self.add_clause([not_definition, literal1, negate(literal2)])
+            if negative:
+                self.add_clause([definition, literal1, literal2])
+                self.add_clause([definition, negate(literal1), \
+                negate(literal2)])
@@ -1,41 +1,59 @@
 
 """Module dnf that contains the functions for the Disjunctive Normal Form"""
-from syntax_tree import OperandTypes
+from syntax_tree import OperandTypes, bottom_up
 from sys import stdout
 
 #Types that are already in DNF
 ATOMIC_TYPES = [OperandTypes.T_ATOM, OperandTypes.T_NOT]
 
+CONSTANT_TYPES = [OperandTypes.T_TRUE, OperandTypes.T_FALSE]
+
 def print_dnf(clause_list):
     """Prints the clause list."""
     for clause in clause_list:
         stdout.write("[")
-        for i in range(0, len(clause) - 1):
+        for i in range(0, len(clause)):
+            if i > 0:
+                stdout.write(" /\\ ")
             clause[i].print_me()
-            stdout.write(" /\\ ")
-        clause[len(clause)-1].print_me()
         stdout.write("]")
         print
 
 def dnf(formula):
     """Transforms a formula that is in prenex form without quantifiers
-    into its Disjunctive Normal Form"""
-    formula_type = formula.get_type()
-    if formula_type in ATOMIC_TYPES:
-        return [[formula]]
-    elif formula_type is OperandTypes.T_OR:
-        return dnf(formula.get_formula1()) + dnf(formula.get_formula2())
-    elif formula_type is OperandTypes.T_AND:
-        return make_pairs(dnf(formula.get_formula1()), \
-        dnf(formula.get_formula2()))
-    else:
-        raise Exception("DNF exception: given formula must be in NNF, \
-        without quantifiers.")
-
+    into its Disjunctive Normal Form
+
+    The formula is walked with an explicit stack, see bottom_up. The clauses
+    of the operands of a disjunction are concatenated and those of the
+    operands of a conjunction multiplied, left to right. TRUE is the empty
+    clause and FALSE has no clauses."""
+    def expand(node):
+        node_type = node.get_type()
+        if node_type in ATOMIC_TYPES or node_type in CONSTANT_TYPES:
+            return []
+        elif node_type is OperandTypes.T_OR or node_type is OperandTypes.T_AND:
+            return node.get_formulas()
+        else:
+            raise Exception("DNF exception: given formula must be in NNF, \
+            without quantifiers.")
+
+    def combine(node, values):
+        node_type = node.get_type()
+        if node_type in ATOMIC_TYPES:
+            return [[node]]
+        elif node_type is OperandTypes.T_TRUE:
+            return [[]]
+        elif node_type is OperandTypes.T_FALSE:
+            return []
+        elif node_type is OperandTypes.T_OR:
+            return [clause for clause_list in values for clause in clause_list]
+        clause_list = values[0]
+        for operand_clauses in values[1:]:
+            clause_list = make_pairs(clause_list, operand_clauses)
+        return clause_list
+
+    return bottom_up(formula, expand, combine)
 
 def make_pairs(atom_list1, atom_list2):
     """Cartesian product of two lists."""
     return [x + y for x in atom_list1 for y in atom_list2]
-
-
-
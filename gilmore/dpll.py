@@ -0,0 +1,264 @@
+"""Module dpll that contains a clause based satisfiability solver.
+
+The solver is a DPLL search with conflict driven clause learning: clauses
+are lists of signed variable ids, unit propagation watches two literals of
+every clause, every conflict is analysed into a learned clause (the first
+unique implication point) and the search jumps back to the level where
+that clause becomes unit. Decisions pick the unassigned variable with the
+highest activity.
+
+The solver is incremental: clauses can be added between the calls of solve,
+and the learned clauses and the activity of the variables are kept, since
+they still hold for every extension of the clause set."""
+from heapq import heappush, heappop
+
+# Activity of the variables decays by this factor after every conflict
+ACTIVITY_DECAY = 0.95
+
+# Activities are rescaled when they grow over this limit
+ACTIVITY_LIMIT = 1e100
+
+class Solver(object):
+    """A CDCL solver with two watched literals."""
+
+    def __init__(self):
+        # clauses are lists of literals, the first two literals are watched
+        self.clauses = []
+        # literal => indexes of the clauses that watch it
+        self.watches = {}
+
+        # variable ids start from 1, index 0 is never used
+        self.values = [None]
+        self.levels = [None]
+        self.reasons = [None]
+        self.phases = [False]
+        self.activity = [0.0]
+        self.activity_increment = 1.0
+        # heap of (-activity, variable), stale entries are skipped
+        self.order = []
+
+        self.trail = []
+        # length of the trail at every decision
+        self.trail_limits = []
+        self.propagated = 0
+        self.unsatisfiable = False
+
+    def new_variable(self):
+        """Adds a new variable and returns its id."""
+        self.values.append(None)
+        self.levels.append(None)
+        self.reasons.append(None)
+        self.phases.append(False)
+        self.activity.append(0.0)
+        variable = len(self.values) - 1
+        heappush(self.order, (0.0, variable))
+        return variable
+
+    def value(self, literal):
+        """Returns the value of a literal, None if it is unassigned."""
+        value = self.values[abs(literal)]
+        if value is None or literal > 0:
+            return value
+        return not value
+
+    def add_clause(self, literals):
+        """Adds a clause, a list of signed variable ids.
+
+        Returns False if the clause set became unsatisfiable."""
+        self.backtrack(0)
+        if self.unsatisfiable:
+            return False
+
+        clause = []
+        for literal in literals:
+            value = self.value(literal)
+            if value is True or -literal in clause:
+                # satisfied on level 0 or a tautology
+                return True
+            if value is None and literal not in clause:
+                clause.append(literal)
+
+        if not clause:
+            self.unsatisfiable = True
+        elif len(clause) == 1:
+            self.assign(clause[0], None)
+            self.unsatisfiable = self.propagate() is not None
+        else:
+            self.attach(clause)
+        return not self.unsatisfiable
+
+    def attach(self, clause):
+        """Stores a clause and watches its first two literals."""
+        index = len(self.clauses)
+        self.clauses.append(clause)
+        self.watches.setdefault(clause[0], []).append(index)
+        self.watches.setdefault(clause[1], []).append(index)
+        return index
+
+    def assign(self, literal, reason):
+        """Makes a literal true, reason is the index of the implying clause."""
+        variable = abs(literal)
+        self.values[variable] = literal > 0
+        self.levels[variable] = len(self.trail_limits)
+        self.reasons[variable] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """Unit propagation. Returns the index of a conflicting clause or None.
+
+        Only the clauses that watch the complement of a new true literal are
+        visited, and a clause stays watched by two literals that are not
+        false as long as it is not unit."""
+        while self.propagated < len(self.trail):
+            false_literal = -self.trail[self.propagated]
+            self.propagated += 1
+            watchers = self.watches.get(false_literal, [])
+            kept = []
+
+            for position, index in enumerate(watchers):
+                clause = self.clauses[index]
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], clause[0]
+                other = clause[0]
+                if self.value(other) is True:
+                    kept.append(index)
+                    continue
+
+                moved = False
+                for k in range(2, len(clause)):
+                    if self.value(clause[k]) is not False:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self.watches.setdefault(clause[1], []).append(index)
+                        moved = True
+                        break
+                if moved:
+                    continue
+
+                kept.append(index)
+                if self.value(other) is False:
+                    self.watches[false_literal] = kept + watchers[position + 1:]
+                    return index
+                self.assign(other, index)
+
+            self.watches[false_literal] = kept
+        return None
+
+    def analyze(self, conflict):
+        """Derives the learned clause of a conflict.
+
+        Returns the learned clause, whose first literal is the complement of
+        the first unique implication point, and the level to jump back to."""
+        current_level = len(self.trail_limits)
+        learned = [None]
+        seen = set()
+        pending = 0
+        literal = None
+        position = len(self.trail) - 1
+        clause = self.clauses[conflict]
+
+        while True:
+            # the first literal of a reason clause is the implied one
+            for other in clause[0 if literal is None else 1:]:
+                variable = abs(other)
+                if variable not in seen and self.levels[variable] > 0:
+                    seen.add(variable)
+                    self.bump(variable)
+                    if self.levels[variable] == current_level:
+                        pending += 1
+                    else:
+                        learned.append(other)
+
+            while abs(self.trail[position]) not in seen:
+                position -= 1
+            literal = self.trail[position]
+            position -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.clauses[self.reasons[abs(literal)]]
+
+        learned[0] = -literal
+        level = 0
+        if len(learned) > 1:
+            # the second literal is watched, it must be the last to be undone
+            deepest = max(range(1, len(learned)), \
+            key=lambda i: self.levels[abs(learned[i])])
+            learned[1], learned[deepest] = learned[deepest], learned[1]
+            level = self.levels[abs(learned[1])]
+        return learned, level
+
+    def bump(self, variable):
+        """Increases the activity of a variable."""
+        self.activity[variable] += self.activity_increment
+        if self.activity[variable] > ACTIVITY_LIMIT:
+            for other in range(1, len(self.activity)):
+                self.activity[other] /= ACTIVITY_LIMIT
+            self.activity_increment /= ACTIVITY_LIMIT
+            self.order = [(-self.activity[other], other) \
+            for other in range(1, len(self.activity))]
+            self.order.sort()
+        else:
+            heappush(self.order, (-self.activity[variable], variable))
+
+    def backtrack(self, level):
+        """Undoes all the assignments above a given decision level."""
+        if len(self.trail_limits) <= level:
+            return
+        for literal in self.trail[self.trail_limits[level]:]:
+            variable = abs(literal)
+            self.phases[variable] = self.values[variable]
+            self.values[variable] = None
+            self.reasons[variable] = None
+            heappush(self.order, (-self.activity[variable], variable))
+        del self.trail[self.trail_limits[level]:]
+        del self.trail_limits[level:]
+        self.propagated = len(self.trail)
+
+    def pick_branch(self):
+        """Returns the unassigned variable with the highest activity."""
+        while self.order:
+            activity, variable = heappop(self.order)
+            if self.values[variable] is None \
+            and -activity == self.activity[variable]:
+                return variable
+        # every variable with an up to date entry is assigned
+        for variable in range(1, len(self.values)):
+            if self.values[variable] is None:
+                return variable
+        return None
+
+    def solve(self):
+        """Decides the satisfiability of the clauses added so far.
+
+        Returns True if they are satisfiable, the model is then given by
+        the values of the variables, see model."""
+        if self.unsatisfiable:
+            return False
+
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                if not self.trail_limits:
+                    self.unsatisfiable = True
+                    return False
+
+                learned, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learned) == 1:
+                    self.assign(learned[0], None)
+                else:
+                    self.assign(learned[0], self.attach(learned))
+                self.activity_increment /= ACTIVITY_DECAY
+            else:
+                variable = self.pick_branch()
+                if variable is None:
+                    return True
+                self.trail_limits.append(len(self.trail))
+                if self.phases[variable]:
+                    self.assign(variable, None)
+                else:
+                    self.assign(-variable, None)
+
+    def model(self):
+        """Returns the true literals of the last satisfying assignment."""
+        return list(self.trail)
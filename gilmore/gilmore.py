@@ -1,20 +1,133 @@
 """Gilmore's algorithm implementation."""
 
-from syntax_tree import And, OperandTypes, Not
+from syntax_tree import Not
 from skolemize import skolemize, eliminate_universal_quantifiers
-from herbrand import HerbrandUniverse, fetch_variables
+from herbrand import HerbrandUniverse, fetch_variables, new_tuples, \
+tuple_at, weighted_tuples
+from ground import compile_clauses
 from dnf import dnf, print_dnf
+from literals import LiteralTable, find_open_clause
+from relevance import RelevanceFilter
+from backends import make_backend
+from parallel import LevelPool
+from checkpoint import Checkpointer, load_checkpoint, get_counters, \
+set_counters
 from itertools import product
 import pdb
 
 GILMORE_LIMIT = 5
 
-def prove_valid(formula):
+# Statuses of a proof
+UNSAT = "UNSAT"
+NOT_FOUND = "NOT_FOUND"
+TIME_LIMIT = "TIME_LIMIT"
+INSTANCE_LIMIT = "INSTANCE_LIMIT"
+
+# Output levels of a proof, nothing is formatted below the level asked for
+QUIET = 0
+# the iterations and the outcome
+PROGRESS = 1
+# the transformed formula and the surviving clauses of every level too
+TRACE = 2
+
+class Result(object):
+    """The outcome of a proof.
+
+    status is UNSAT, NOT_FOUND, TIME_LIMIT or INSTANCE_LIMIT, level is the
+    number of the last level reached, universe_size the number of terms of
+    the Herbrand universe that were made and instances the number of ground
+    instances. If the proof was not found, clause holds the literals of a
+    clause that survived the last level, a ground model of its instances."""
+
+    def __init__(self, status, level, universe_size, instances, clause=None):
+        self.status = status
+        self.level = level
+        self.universe_size = universe_size
+        self.instances = instances
+        self.clause = clause
+
+    def print_me(self):
+        """Prints the result."""
+        print("%s at iteration number %s, %s terms, %s instances" \
+        % (self.status, self.level, self.universe_size, self.instances))
+        if self.clause is not None:
+            print "-- SURVIVING CLAUSE --"
+            print_dnf([self.clause])
+
+class LimitExceeded(Exception):
+    """Raised when a proof goes over one of its budgets, the status tells
+    which one."""
+
+    def __init__(self, status):
+        Exception.__init__(self, "Gilmore exception: %s!" % status)
+        self.status = status
+
+def prove_valid(formula, **options):
     not_formula = Not(formula)
-    go_gilmore(not_formula)
+    return go_gilmore(not_formula, **options)
+
+def go_gilmore(formula, backend="multiplication", streaming=False, \
+dovetailing=False, relevance=False, parallel=False, processes=None, \
+store_directory=None, max_term_size=None, max_level_terms=None, \
+checkpoint=None, checkpoint_interval=0, \
+max_levels=GILMORE_LIMIT, max_instances=None, verbosity=QUIET):
+    """Gilmore's algorithm implementation.
+
+    Returns the Result of the proof. Nothing is printed unless verbosity is
+    PROGRESS or TRACE.
 
-def go_gilmore(formula):
-    """Gilmore's algorithm implementation."""
+    backend names the ground checking backend, "multiplication",
+    "vectorized", "dpll" or "disk", see the backends module. The vectorized
+    backend multiplies the clauses of a level on numpy matrices if numpy is
+    installed. The disk backend keeps the surviving clauses in memory mapped
+    files in store_directory (the system temporary directory if it is not
+    given).
+
+    If streaming is set every level is checked by a lazy pipeline instead:
+    tuples, their instances and the clauses of the product are generated on
+    demand and searched depth first, so the product of the level is never
+    held in memory, only the instances down to the deepest tuple reached,
+    see find_open_clause. The search stops at the first clause that
+    survives.
+
+    If dovetailing is set the tuples are not grouped by universe levels but
+    fairly enumerated by their total weight, see weighted_tuples, and the
+    proof is found after the smallest possible number of instances.
+
+    If relevance is set the tuples are passed through a RelevanceFilter
+    before they are instantiated, and the tuples of the instances none of
+    whose literals can be complemented by another instance are left out.
+    The streaming search checks whole levels and does not use the filter.
+
+    If parallel is set the tuples of every level are split into shards that
+    are multiplied on a pool of processes (cpu_count() if processes is not
+    given), see the parallel module. This mode always multiplies DNFs, it
+    takes no other backend and no relevance filter, asking for them raises
+    an exception before the proof starts.
+
+    max_term_size and max_level_terms bound the Herbrand universe, see
+    HerbrandUniverse, dovetailing only takes max_term_size. At most
+    max_levels levels are checked, and the proof is given up with
+    INSTANCE_LIMIT after max_instances instances.
+
+    If checkpoint is set the complete state of the level method is saved to
+    that file after every level, at most once per checkpoint_interval
+    seconds, and resume_gilmore continues the proof from it. The other
+    methods and the disk backend can not be checkpointed, asking for it
+    raises an exception before the proof starts."""
+    if parallel and (relevance or backend != "multiplication"):
+        raise Exception("Gilmore exception: the parallel method takes no \
+        backend and no relevance filter!")
+    if dovetailing and max_level_terms is not None:
+        raise Exception("Gilmore exception: dovetailing has no levels to \
+        bound with max_level_terms!")
+    if checkpoint is not None:
+        if streaming or dovetailing or parallel:
+            raise Exception("Checkpoint exception: only the level method \
+            can be checkpointed!")
+        if backend == "disk":
+            raise Exception("Checkpoint exception: the disk backend can \
+            not be checkpointed!")
 
     #Transform the formula into its prenex form
     #and eliminate the universal quantifiers
@@ -23,88 +136,393 @@ def go_gilmore(formula):
     transformed_formula = skolemize(transformed_formula, [])
     transformed_formula = eliminate_universal_quantifiers(transformed_formula)
 
-    print "-- TRANSFORMED FORMULA --"
-    transformed_formula.print_me()
-    print
+    if verbosity >= TRACE:
+        print "-- TRANSFORMED FORMULA --"
+        transformed_formula.print_me()
+        print
 
-    universe = HerbrandUniverse(transformed_formula)
-    variables = fetch_variables(transformed_formula)
+    universe = HerbrandUniverse(transformed_formula, max_levels - 1, \
+    max_term_size, max_level_terms)
 
-    current_level = universe.get_current_level()
+    # Ground literals are encoded as integers and clauses as bitsets, the
+    # streaming and the parallel methods multiply DNFs without a backend
+    literal_table = LiteralTable()
+    level_backend = None
+    if not streaming and not parallel:
+        level_backend = make_backend(backend, literal_table, store_directory)
+
+    relevance_filter = None
+    if relevance:
+        relevance_filter = RelevanceFilter(transformed_formula, \
+        fetch_variables(transformed_formula), literal_table)
+
+    # Everything a checkpoint has to hold
+    state = {
+        "formula": transformed_formula,
+        "options": {"streaming": streaming, "parallel": parallel, \
+            "processes": processes, "dovetailing": dovetailing, \
+            "checkpoint": checkpoint, \
+            "checkpoint_interval": checkpoint_interval, \
+            "max_levels": max_levels, "max_instances": max_instances, \
+            "verbosity": verbosity},
+        "universe": universe,
+        "literal_table": literal_table,
+        "backend": level_backend,
+        "relevance_filter": relevance_filter,
+        # the unique name counters before the matrix is compiled
+        "compile_counters": get_counters(),
+        # the index of the last level that was done
+        "level": None,
+        # the number of the last level reached and of the instances made
+        "progress": {"level": 0, "instances": 0},
+    }
+    return search(state)
+
+def resume_gilmore(path, verbosity=None, max_levels=None):
+    """Continues a proof of go_gilmore from a checkpoint file.
+
+    The levels that were done before the checkpoint are not checked again.
+    The verbosity and the number of levels of the proof are kept unless
+    other ones are given, max_levels counts the levels from the start of
+    the proof like in go_gilmore."""
+    state = load_checkpoint(path)
+    if verbosity is not None:
+        state["options"]["verbosity"] = verbosity
+    if max_levels is not None:
+        # the universe stops growing at the last level
+        state["options"]["max_levels"] = max_levels
+        state["universe"].max_depth = max_levels - 1
+    verbosity = state["options"].get("verbosity", QUIET)
+
+    if verbosity >= TRACE:
+        print "-- RESUMED FORMULA --"
+        state["formula"].print_me()
+        print
+    if verbosity >= PROGRESS:
+        print("Resuming after iteration number %s" % (state["level"] + 1))
+
+    return search(state)
+
+def search(state):
+    """Compiles the matrix and runs the method chosen by the options.
+
+    Returns the Result of the proof."""
+    transformed_formula = state["formula"]
+    options = state["options"]
+    universe = state["universe"]
+    literal_table = state["literal_table"]
+    level_backend = state["backend"]
+    relevance_filter = state["relevance_filter"]
+    progress = state.setdefault("progress", {"level": 0, "instances": 0})
+    max_levels = options.get("max_levels", GILMORE_LIMIT)
+    max_instances = options.get("max_instances")
+    verbosity = options.get("verbosity", QUIET)
+
+    variables = fetch_variables(transformed_formula)
     num_vars = len(variables)
 
+    normal_form = dnf
+    if level_backend is not None:
+        normal_form = level_backend.normal_form
+
+    # The normal form of the matrix is computed only once, the clauses of
+    # every instance are then produced from it by substitution. The
+    # definitional atoms of cnf must get the same names on a resume
+    set_counters(state["compile_counters"])
+    instance_clauses = compile_clauses(transformed_formula, variables, \
+    normal_form)
+    if state["level"] is not None:
+        set_counters(state["counters"])
+
+    def count_instances(number):
+        """Counts new instances, checks the instance budget."""
+        progress["instances"] += number
+        if max_instances is not None and progress["instances"] > max_instances:
+            raise LimitExceeded(INSTANCE_LIMIT)
+
+    def encode_instance(substitution):
+        """Returns the encoded clauses of the instance for a tuple."""
+        return [literal_table.encode_clause(clause) \
+        for clause in instance_clauses(substitution)]
+
+    def encoded_instance(substitution):
+        """Counts and returns the encoded clauses of a new instance."""
+        count_instances(1)
+        return encode_instance(substitution)
+
+    def instances(substitutions):
+        """Generates the encoded instances of the given tuples, only of the
+        relevant ones if there is a relevance filter."""
+        if relevance_filter is not None:
+            substitutions = relevance_filter.filter(substitutions)
+        return (encoded_instance(substitution) \
+        for substitution in substitutions)
+
+    checkpointer = None
+    if options["checkpoint"] is not None:
+        checkpointer = Checkpointer(options["checkpoint"], state, \
+        options["checkpoint_interval"])
+
+    try:
+        try:
+            if options["streaming"]:
+                status, clause = streaming_method(universe, num_vars, \
+                encode_instance, count_instances, literal_table, progress, \
+                max_levels, verbosity)
+            elif options["parallel"]:
+                status, clause = parallel_method(universe, \
+                LevelPool(transformed_formula, variables, universe, \
+                options["processes"]), literal_table, progress, \
+                count_instances, max_levels, verbosity)
+            elif options["dovetailing"]:
+                status, clause = dovetailing_method(universe, num_vars, \
+                instances, level_backend, progress, max_levels, verbosity)
+            else:
+                status, clause = multiplication_method(universe, num_vars, \
+                instances, level_backend, progress, checkpointer, \
+                state["level"] is not None, verbosity)
+        except LimitExceeded as limit:
+            if verbosity >= PROGRESS:
+                print "Proof given up: %s." % limit.status
+            status, clause = limit.status, None
+    finally:
+        if level_backend is not None:
+            level_backend.close()
+
+    if clause is not None:
+        clause = literal_table.decode_clause(clause)
+    return Result(status, progress["level"], len(universe.terms), \
+    progress["instances"], clause)
+
+def multiplication_method(universe, num_vars, instances, backend, progress, \
+checkpointer=None, resumed=False, verbosity=QUIET):
+    """The level method, interleaved with the universe growth.
+
+    The instances are added to the backend across the levels. Every new
+    term of the universe adds only the instances of the tuples that use it
+    and the terms that came before it, so every tuple is instantiated
+    exactly once. The backend checks the conjunction at the end of every
+    level, and a level is abandoned as soon as the backend finds it
+    contradictory while the instances are added.
+
+    Returns the status of the proof and the encoded clause that survived,
+    the number of the level reached is kept in progress. The checkpointer
+    is told about every level that is done, resumed is set if the state
+    comes from a checkpoint, the current universe level is then done and
+    the method continues with the next one."""
+
+    if resumed:
+        seen_terms = list(universe.get_current_level())
+        level_terms = universe.level_terms()
+    else:
+        # If there are no variables the matrix itself is the only
+        # (empty tuple) instance
+        backend.add(instances(product([], repeat=num_vars)))
+        seen_terms = []
+        level_terms = [(term,) + universe.terms[term] \
+        for term in universe.get_current_level()]
+
     # ALGORITHM STARTS HERE: iterates until the proof is found
     # or we have reached the GILMORE_LIMIT
-    for iteration in range(0, GILMORE_LIMIT):
-        print("Iteration number %s" %(iteration + 1))
-        substitutions = list(product(current_level, repeat=num_vars))
-        subd_formula = transformed_formula
+    level = None
+    while True:
+        new_terms = False
+        for term, depth, _ in level_terms:
+            if depth != level:
+                if level is not None:
+                    if verbosity >= TRACE:
+                        backend.print_state()
+                    if verbosity >= PROGRESS:
+                        print "Next level."
+                level = depth
+                progress["level"] = depth + 1
+                if verbosity >= PROGRESS:
+                    print("Iteration number %s" %(depth + 1))
 
-        for i in range(0, num_vars):
-            subd_formula = subd_formula.substitute_variable(variables[i],\
-            substitutions[0][i])
+            # MULTIPLICATION METHOD: with the multiplication backend the
+            # contradictory clauses are dropped while the product is built,
+            # so only the surviving clauses are kept
+            closed = backend.add(instances(new_tuples(seen_terms, [term], \
+            num_vars)))
+            seen_terms.append(term)
+            new_terms = True
 
-        transformed_formula.print_me()
-        print
+            if closed:
+                report_unsat(backend, verbosity)
+                return UNSAT, None
 
-        for i in range(1, len(substitutions)):
-            new_subd_formula = transformed_formula
-            for j in range(0, num_vars):
-                new_subd_formula = new_subd_formula.substitute_variable(\
-                variables[j], substitutions[i][j])
+        if not new_terms:
+            # the universe brought no new terms
+            break
 
-            subd_formula = And(subd_formula, new_subd_formula)
+        if backend.check():
+            report_unsat(backend, verbosity)
+            return UNSAT, None
 
-        print "-- SUBD FORMULA --"
-        subd_formula.print_me()
-        print
-        print "-- DNF WITH SUBSTITUTIONS --"
-        dnf_formula = dnf(subd_formula)
-        print_dnf(dnf_formula)
-        print "---------"
-
-        remove_count = 0
-
-        # MULTIPLICATION METHOD
-        for clause in dnf_formula:
-            found_positive = []
-            found_negative = []
-            found = False
-
-            for literal in clause:
-                if literal.get_type() is OperandTypes.T_NOT:
-                    if literal.get_formula() in found_positive:
-                        found = True
-                        remove_count += 1
-                        break
-                    else:
-                        found_negative.append(literal.get_formula())
-                elif literal.get_type() is OperandTypes.T_ATOM:
-                    if literal in found_negative:
-                        found = True
-                        remove_count += 1
-                        break
-                    else:
-                        found_positive.append(literal)
-                else:
-                    raise Exception("Gilmore multiplication method exception!")
-
-            if not found:
-                print("NOT ELIMINATED")
-                print("["),
-                for literal in clause:
-                    literal.print_me()
-                    print(", "),
-                print("]")
-
-        print("REMOVE COUNT: %s" %remove_count)
-        if remove_count == len(dnf_formula):
-            print "UNSAT!"
+        if checkpointer is not None:
+            checkpointer.level_done(level)
+        level_terms = universe.level_terms()
+
+    report_not_found(backend, verbosity)
+    return NOT_FOUND, backend.open_clause()
+
+def report_unsat(backend, verbosity):
+    """Prints the state of a backend that found the proof."""
+    if verbosity >= TRACE:
+        backend.print_state()
+    if verbosity >= PROGRESS:
+        print "UNSAT!"
+
+def report_not_found(backend, verbosity):
+    """Prints the state of a backend that did not find the proof."""
+    if verbosity >= TRACE:
+        backend.print_state()
+    if verbosity >= PROGRESS:
+        print "Proof not found."
+
+def dovetailing_method(universe, num_vars, instances, backend, progress, \
+max_levels=GILMORE_LIMIT, verbosity=QUIET):
+    """The level method over the tuples in dovetailing order.
+
+    Iteration i adds the instances of the tuples of the i-th smallest total
+    weight to the backend, and the method stops at the first iteration
+    whose conjunction is contradictory, or once the terms over the size
+    bound of the universe would be needed."""
+    max_weight = None
+    if not universe.functions or num_vars == 0:
+        max_weight = num_vars
+    elif universe.max_size is not None:
+        max_weight = num_vars * universe.max_size
+
+    for iteration in range(0, max_levels):
+        weight = num_vars + iteration
+        if max_weight is not None and weight > max_weight:
             break
-        else:
+        progress["level"] = iteration + 1
+        if verbosity >= PROGRESS:
+            print("Iteration number %s" %(iteration + 1))
+
+        closed = backend.add(instances(weighted_tuples(universe, num_vars, \
+        weight)))
+        closed = closed or backend.check()
+
+        if closed:
+            report_unsat(backend, verbosity)
+            return UNSAT, None
+        if verbosity >= TRACE:
+            backend.print_state()
+        if verbosity >= PROGRESS:
             print "Next level."
 
+    if verbosity >= PROGRESS:
+        print "Proof not found."
+    return NOT_FOUND, backend.open_clause()
+
+def streaming_method(universe, num_vars, encode_instance, count_instances, \
+literal_table, progress, max_levels=GILMORE_LIMIT, verbosity=QUIET):
+    """Checks every level with a depth first search for an open clause.
+
+    The search stops when the universe stops growing. count_instances is
+    told about every tuple only once, the tuples of the terms of the last
+    level were counted there."""
+    current_level = universe.get_current_level()
+    open_clause = None
+    # the number of terms of the last level, they come first in the level
+    counted_terms = 0
+
+    for iteration in range(0, max_levels):
+        progress["level"] = iteration + 1
+        if verbosity >= PROGRESS:
+            print("Iteration number %s" %(iteration + 1))
+
+        level = list(current_level)
+        # the search reaches the tuples in the order of their indexes, the
+        # tuples up to the deepest one reached were already counted
+        deepest = [-1]
+
+        def instance_at(index):
+            while deepest[0] < index:
+                deepest[0] += 1
+                if not counted_tuple(deepest[0]):
+                    count_instances(1)
+            return encode_instance(tuple_at(level, num_vars, index))
+
+        def counted_tuple(index):
+            if iteration == 0:
+                return False
+            for _ in range(0, num_vars):
+                index, digit = divmod(index, len(level))
+                if digit >= counted_terms:
+                    return False
+            return True
+
+        open_clause = find_open_clause(len(level) ** num_vars, instance_at)
+
+        if open_clause is None:
+            if verbosity >= PROGRESS:
+                print "UNSAT!"
+            return UNSAT, None
+
+        if verbosity >= TRACE:
+            print "-- SURVIVING CLAUSE --"
+            print_dnf([literal_table.decode_clause(open_clause)])
+        counted_terms = len(level)
         current_level = universe.next_level()
+        if len(current_level) == len(level):
+            # the universe brought no new terms, the next level is the same
+            break
+        if verbosity >= PROGRESS:
+            print "Next level."
 
-    if iteration is GILMORE_LIMIT - 1:
+    if verbosity >= PROGRESS:
         print "Proof not found."
+    return NOT_FOUND, open_clause
+
+def parallel_method(universe, level_pool, literal_table, progress, \
+count_instances, max_levels=GILMORE_LIMIT, verbosity=QUIET):
+    """Checks every level by multiplying its shards on a pool of processes.
+
+    The new instances of a level are counted with count_instances before
+    the level is handed to the pool, the tuples of the last level were
+    counted there. The method stops when the universe stops growing."""
+    current_level = universe.get_current_level()
+    open_clause = None
+    counted_tuples = 0
+
+    try:
+        for iteration in range(0, max_levels):
+            progress["level"] = iteration + 1
+            if verbosity >= PROGRESS:
+                print("Iteration number %s" %(iteration + 1))
+
+            level_tuples = len(current_level) ** level_pool.num_vars
+            count_instances(level_tuples - counted_tuples)
+            counted_tuples = level_tuples
+            surviving_clauses = level_pool.check_level(iteration, \
+            len(current_level), literal_table)
+
+            if verbosity >= TRACE:
+                print "-- DNF WITH SUBSTITUTIONS --"
+                print_dnf([literal_table.decode_clause(clause) \
+                for clause in surviving_clauses])
+                print "---------"
+                print("SURVIVING CLAUSES: %s" % len(surviving_clauses))
+
+            if not surviving_clauses:
+                if verbosity >= PROGRESS:
+                    print "UNSAT!"
+                return UNSAT, None
+            open_clause = surviving_clauses[0]
+            level_size = len(current_level)
+            current_level = universe.next_level()
+            if len(current_level) == level_size:
+                # the universe brought no new terms, the level is the same
+                break
+            if verbosity >= PROGRESS:
+                print "Next level."
+
+        if verbosity >= PROGRESS:
+            print "Proof not found."
+        return NOT_FOUND, open_clause
+    finally:
+        level_pool.close()
@@ -0,0 +1,141 @@
+"""Module ground that compiles a quantifier free formula into a template
+for its ground instances."""
+from syntax_tree import OperandTypes, TermTypes, Atom, FunctionTerm, \
+subformulas, bottom_up
+from dnf import dnf
+
+# Types of the nodes of a quantifier free formula
+COMPILED_TYPES = [TermTypes.T_VAR, TermTypes.T_CONST, TermTypes.T_FUNC, \
+    OperandTypes.T_ATOM, OperandTypes.T_TRUE, OperandTypes.T_FALSE, \
+    OperandTypes.T_NOT, OperandTypes.T_AND, OperandTypes.T_OR, \
+    OperandTypes.T_IMP, OperandTypes.T_IFF]
+
+# Kinds of the values of a compiled program
+CONSTANT, SLOT, BUILD = range(3)
+
+def compile_formula(formula, variables):
+    """Compiles a quantifier free formula into a ground-instance template.
+
+    The template has one indexed slot for each of the given variables.
+    Returns a function that takes a tuple of terms (one for each variable,
+    in the same order) and returns the instance of the formula, so
+    instantiating is a fill-in of the slots instead of a tree rewrite."""
+    slots = dict((variable, index) for index, variable in enumerate(variables))
+    template = compile_node(formula, slots)
+
+    if template is None:
+        return constant(formula)
+    return template
+
+def compile_clauses(formula, variables, normal_form=dnf):
+    """Computes the normal form of a quantifier free formula once and
+    compiles its clauses into ground-instance templates.
+
+    normal_form is dnf or cnf.cnf. Returns a function that takes a tuple of
+    terms and returns the clause list of the instance, produced by
+    substitution alone."""
+    literal_indexes = {}
+    literals = []
+    clauses = []
+
+    for clause in normal_form(formula):
+        indexes = []
+        for literal in clause:
+            if literal not in literal_indexes:
+                literal_indexes[literal] = len(literals)
+                literals.append(compile_formula(literal, variables))
+            indexes.append(literal_indexes[literal])
+        clauses.append(indexes)
+
+    def instance(terms):
+        """Returns the clause list of the instance for the given terms."""
+        ground_literals = [literal(terms) for literal in literals]
+        return [[ground_literals[i] for i in clause] for clause in clauses]
+
+    return instance
+
+def constant(node):
+    """Returns a template that always instantiates to the given node."""
+    return lambda terms: node
+
+def compile_node(node, slots):
+    """Compiles a node of a quantifier free formula.
+
+    Returns None if the node contains none of the slot variables, so that
+    ground subtrees are shared by all the instances instead of rebuilt.
+
+    The node is compiled into a program of build steps in postorder, every
+    step builds a node from the values of its operands: the ground subtrees,
+    the terms of the slots or the nodes of earlier steps. A subtree that
+    occurs more than once is built once, and neither compiling nor
+    instantiating is limited by the depth of the node."""
+    # node => whether it contains one of the slot variables
+    dependent = {}
+
+    def expand(node):
+        if node.get_type() not in COMPILED_TYPES:
+            raise Exception("Compile exception: formula must be quantifier free!")
+        return subformulas(node)
+
+    def combine(node, values):
+        if node.get_type() is TermTypes.T_VAR:
+            dependent[node] = node in slots
+        else:
+            dependent[node] = any(values)
+        return dependent[node]
+
+    if not bottom_up(node, expand, combine):
+        return None
+
+    # node => (kind, number) of the value that stands for it
+    registers = {}
+    constants = []
+    steps = []
+    stack = [(node, False)]
+    while stack:
+        current, operands_done = stack.pop()
+        if operands_done:
+            registers[current] = (BUILD, len(steps))
+            steps.append((builder(current), [registers[operand] \
+            for operand in subformulas(current)]))
+        elif current in registers:
+            continue
+        elif not dependent[current]:
+            registers[current] = (CONSTANT, len(constants))
+            constants.append(current)
+        elif current.get_type() is TermTypes.T_VAR:
+            registers[current] = (SLOT, slots[current])
+        else:
+            stack.append((current, True))
+            stack.extend((operand, False) \
+            for operand in reversed(subformulas(current)))
+
+    # the values are the constants, the terms and the built nodes in order
+    offsets = {CONSTANT: 0, SLOT: len(constants), \
+    BUILD: len(constants) + max(slots.values()) + 1}
+    program = [(build, [offsets[kind] + number for kind, number in operands]) \
+    for build, operands in steps]
+    kind, number = registers[node]
+    result = offsets[kind] + number
+
+    def template(terms):
+        """Returns the instance of the node for the given terms."""
+        values = constants + list(terms)
+        for build, indexes in program:
+            values.append(build([values[index] for index in indexes]))
+        return values[result]
+
+    return template
+
+def builder(node):
+    """Returns a function that builds a node like the given one from a list
+    of operands."""
+    node_type = node.get_type()
+    if node_type is TermTypes.T_FUNC:
+        symbol = node.function_symbol
+        return lambda operands: FunctionTerm(symbol, operands)
+    elif node_type is OperandTypes.T_ATOM:
+        symbol = node.predicate_symbol
+        return lambda operands: Atom(symbol, operands)
+    node_class = node.__class__
+    return lambda operands: node_class(*operands)
@@ -1,133 +1,234 @@
 """Module Herbrand contains Gilmore's algorithm."""
 from syntax_tree import OperandTypes, TermTypes, get_unique_constant, \
-ConstantTerm, FunctionTerm
+ConstantTerm, FunctionTerm, subformulas
 from sys import stdout
-from itertools import permutations
+from itertools import chain, product
 
-def apply_function(function, operands):
-    """Applies a given function to a list of operands.
-
-    Returns a list of all possible function applications."""
-    arity = len(function.operands)
-
-    if len(operands) < arity:
-        new_operands = list(operands)
-        for _ in range(len(operands), arity):
-            new_operands.append(ConstantTerm(get_unique_constant()))
-        return [FunctionTerm(function.function_symbol, new_operands)]
-    else:
-        applications = []
-        operand_lists = list(permutations(operands, arity))
-
-        for operand_list in operand_lists:
-            applications.append(FunctionTerm(function.function_symbol, \
-            operand_list))
-
-        return applications
+# Types of the nodes of a quantifier free formula in nnf
+NNF_TYPES = [OperandTypes.T_ATOM, OperandTypes.T_NOT, OperandTypes.T_AND, \
+    OperandTypes.T_OR, OperandTypes.T_TRUE, OperandTypes.T_FALSE, \
+    TermTypes.T_VAR, TermTypes.T_CONST, TermTypes.T_FUNC]
 
 def fetch_constants(formula):
     """Finds all constants in a formula."""
-    formula_type = formula.get_type()
-    constants = []
-
-    if formula_type is OperandTypes.T_ATOM \
-    or formula_type is TermTypes.T_FUNC:
-        for operand in formula.operands:
-            constants += fetch_constants(operand)
-    elif formula_type is OperandTypes.T_NOT:
-        constants = fetch_constants(formula.get_formula())
-    elif formula_type is OperandTypes.T_AND or \
-    formula_type is OperandTypes.T_OR:
-        constants = fetch_constants(formula.get_formula1()) \
-        + fetch_constants(formula.get_formula2())
-    elif formula_type is TermTypes.T_VAR:
-        constants = []
-    elif formula_type is TermTypes.T_CONST:
-        constants = [formula]
-    else:
-        raise Exception("Herbrand exception: formula of unexpected type!")
-
-    return remove_duplicates(constants)
+    return fetch_nodes(formula, TermTypes.T_CONST, NNF_TYPES)
 
 def fetch_variables(formula):
     """Finds all variables in a formula."""
-    formula_type = formula.get_type()
-    variables = []
-
-    if formula_type is OperandTypes.T_ATOM \
-    or formula_type is TermTypes.T_FUNC:
-        for operand in formula.operands:
-            variables += fetch_variables(operand)
-    elif formula_type is OperandTypes.T_NOT:
-        variables = fetch_variables(formula.get_formula())
-    elif formula_type is OperandTypes.T_AND or \
-    formula_type is OperandTypes.T_OR:
-        variables = fetch_variables(formula.get_formula1()) \
-        + fetch_variables(formula.get_formula2())
-    elif formula_type is TermTypes.T_VAR:
-        variables = [formula]
-    elif formula_type is TermTypes.T_CONST:
-        variables = []
-    else:
-        raise Exception("Herbrand exception: formula of unexpected type!")
-
-    return remove_duplicates(variables)
-
+    return fetch_nodes(formula, TermTypes.T_VAR, \
+    NNF_TYPES + [OperandTypes.T_IMP, OperandTypes.T_IFF])
 
 def fetch_functions(formula):
     """Finds all functions in a formula."""
-    formula_type = formula.get_type()
-    functions = []
-
-    if formula_type is OperandTypes.T_ATOM:
-        for operand in formula.operands:
-            functions += fetch_functions(operand)
-    elif formula_type is OperandTypes.T_NOT:
-        functions = fetch_functions(formula.get_formula())
-    elif formula_type is OperandTypes.T_AND or \
-    formula_type is OperandTypes.T_OR:
-        functions = fetch_functions(formula.get_formula1()) \
-        + fetch_functions(formula.get_formula2())
-    elif formula_type is TermTypes.T_VAR \
-    or formula_type is TermTypes.T_CONST:
-        functions = []
-    elif formula_type is TermTypes.T_FUNC:
-        functions = [formula]
-    else:
-        raise Exception("Herbrand exception: formula of unexpected type!")
-
-    return remove_duplicates(functions)
+    return fetch_nodes(formula, TermTypes.T_FUNC, NNF_TYPES)
+
+def fetch_nodes(formula, node_type, allowed_types):
+    """Finds all the nodes of a given type in a formula of nodes of the
+    allowed types, in the order of their first occurrence.
+
+    The formula is walked with an explicit stack, so its depth is not
+    limited, and a shared subtree is walked only once."""
+    nodes = []
+    seen = set()
+    stack = [formula]
+
+    while stack:
+        node = stack.pop()
+        if node in seen:
+            continue
+        seen.add(node)
+
+        current_type = node.get_type()
+        if current_type not in allowed_types:
+            raise Exception("Herbrand exception: formula of unexpected type!")
+        if current_type is node_type:
+            nodes.append(node)
+        stack.extend(reversed(subformulas(node)))
+
+    return nodes
+
+def new_tuples(old_terms, new_terms, length):
+    """Generates all the tuples of a given length over the old and the new
+    terms that contain at least one of the new terms.
+
+    Every tuple is generated exactly once: the position of its first new
+    term splits it into a prefix of old terms and an unrestricted suffix."""
+    all_terms = list(old_terms) + list(new_terms)
+
+    for position in range(0, length):
+        for prefix in product(old_terms, repeat=position):
+            for term in new_terms:
+                for suffix in product(all_terms, repeat=length - position - 1):
+                    yield prefix + (term,) + suffix
+
+def tuple_at(terms, length, index):
+    """Returns the tuple at a given index of product(terms, repeat=length).
+
+    Tuples can be generated on demand this way, without keeping the
+    product in memory."""
+    base = len(terms)
+    digits = []
+    for _ in range(0, length):
+        index, digit = divmod(index, base)
+        digits.append(terms[digit])
+    digits.reverse()
+    return tuple(digits)
+
+def compositions(total, parts):
+    """Generates all the tuples of a given number of positive integers
+    that sum up to a given total."""
+    if parts == 0:
+        if total == 0:
+            yield ()
+        return
+
+    for first in range(1, total - parts + 2):
+        for rest in compositions(total - first, parts - 1):
+            yield (first,) + rest
+
+def weighted_tuples(universe, length, weight):
+    """Generates all the tuples of a given length over the universe whose
+    total weight, the sum of the term sizes, is equal to a given weight.
+
+    Going through the weights in increasing order enumerates the tuples
+    fairly (a diagonal, dovetailing order): every tuple comes after finitely
+    many others, and a tuple with one deep term does not wait for all the
+    tuples of shallower terms in every position."""
+    for sizes in compositions(weight, length):
+        buckets = [universe.get_terms_of_size(size) for size in sizes]
+        for terms in product(*buckets):
+            yield terms
 
 def remove_duplicates(given_list):
-    """Removes duplicates from a given list."""
+    """Removes duplicates from a given list, keeping the order."""
+    seen = set()
     without_duplicates = []
-    [without_duplicates.append(item) \
-    for item in given_list if item not in without_duplicates]
+    for item in given_list:
+        if item not in seen:
+            seen.add(item)
+            without_duplicates.append(item)
 
     return without_duplicates
 
 class HerbrandUniverse(object):
     """Class representing a Herbrand Herbrands universe
-    of a given formula."""
+    of a given formula.
+
+    Level k holds all the terms of depth at most k, every function symbol
+    of the formula is applied at every level. The universe can be bounded
+    by the term depth, the term size (the number of symbols in a term) and
+    the number of new terms per level.
+
+    The terms over max_size are never made. The applications that do not
+    fit in a level of max_level_terms terms are kept in order and are the
+    first ones made at the next level, so the bound delays terms but does
+    not lose any: every function symbol is eventually applied to every
+    tuple of terms, and a term made late belongs to the level it is made
+    at."""
     level_index = 0
 
-    def __init__(self, formula):
+    def __init__(self, formula, max_depth=None, max_size=None, \
+    max_level_terms=None):
         self.current_universe_level = fetch_constants(formula)
         if not self.current_universe_level:
             self.current_universe_level = [ConstantTerm(get_unique_constant())]
-        self.functions = fetch_functions(formula)
+
+        # (function symbol, arity) pairs
+        self.functions = remove_duplicates([(function.function_symbol, \
+        len(function.operands)) for function in fetch_functions(formula)])
+
+        self.max_depth = max_depth
+        self.max_size = max_size
+        self.max_level_terms = max_level_terms
+
+        # term => (depth, size)
+        self.terms = dict((term, (0, 1)) for term in self.current_universe_level)
+        # size => all the terms of that size
+        self.size_buckets = {1: list(self.current_universe_level)}
+        self.previous_universe_level = []
+        self.new_terms = list(self.current_universe_level)
+        # (function symbol, operands) applications left over by the bound
+        # on the number of terms of a level
+        self.pending_applications = []
 
     def get_current_level(self):
         """Get the current universe level."""
         return self.current_universe_level
 
+    def get_new_terms(self):
+        """Get the terms that are new at the current universe level."""
+        return self.new_terms
+
+    def get_terms_of_size(self, size):
+        """Returns all the terms of the universe of a given size.
+
+        The terms of a given size are built once, from the smaller ones,
+        independently of the universe levels. They are added to terms with
+        their depth and size like the terms of the levels. There are no
+        terms over max_size."""
+        if size not in self.size_buckets:
+            terms = []
+            if self.max_size is not None and size > self.max_size:
+                self.size_buckets[size] = terms
+                return terms
+            for function_symbol, arity in self.functions:
+                for sizes in compositions(size - 1, arity):
+                    buckets = [self.get_terms_of_size(operand_size) \
+                    for operand_size in sizes]
+                    for operands in product(*buckets):
+                        term = FunctionTerm(function_symbol, operands)
+                        if term not in self.terms:
+                            self.terms[term] = (1 + max(self.terms[operand][0] \
+                            for operand in operands), size)
+                        terms.append(term)
+            self.size_buckets[size] = terms
+        return self.size_buckets[size]
+
+    def level_terms(self):
+        """Lazily generates the terms of the next level as (term, depth, size)
+        triples and moves the universe to that level once they are exhausted.
+
+        Only the applications that have at least one operand that was new
+        at the current level are built, all the others are already in it,
+        or pending if the last level was full."""
+        depth = self.level_index + 1
+        new_terms = []
+
+        if self.max_depth is None or depth <= self.max_depth:
+            applications = chain(self.pending_applications, \
+            ((function_symbol, operands) \
+            for function_symbol, arity in self.functions \
+            for operands in new_tuples(self.previous_universe_level, \
+            self.new_terms, arity)))
+            pending_applications = []
+
+            for function_symbol, operands in applications:
+                size = 1 + sum(self.terms[operand][1] for operand in operands)
+                if self.max_size is not None and size > self.max_size:
+                    continue
+
+                if self.max_level_terms is not None \
+                and len(new_terms) >= self.max_level_terms:
+                    pending_applications.append((function_symbol, operands))
+                    continue
+
+                term = FunctionTerm(function_symbol, operands)
+                if term not in self.terms:
+                    self.terms[term] = (depth, size)
+                    new_terms.append(term)
+                    yield (term, depth, size)
+
+            self.pending_applications = pending_applications
+
+        self.level_index = depth
+        self.previous_universe_level = self.current_universe_level
+        self.current_universe_level = self.current_universe_level + new_terms
+        self.new_terms = new_terms
+
     def next_level(self):
         """Returns the next level of the Herbrand universe."""
-        self.level_index += 1
-        if self.functions:
-            self.current_universe_level = remove_duplicates(\
-            self.current_universe_level + apply_function(self.functions[0], \
-            self.current_universe_level))
+        for _ in self.level_terms():
+            pass
         return self.current_universe_level
 
     def print_current_level(self):
@@ -0,0 +1,177 @@
+"""Module literals that contains the integer encoding of ground literals.
+
+Every distinct ground atom gets an integer id, a literal is encoded as the
+id of its atom (negated for a negative literal) and a clause is encoded as
+a pair of bitsets (positive, negative) over the atom ids, so that the
+complementary literal check is a single bitwise AND."""
+from syntax_tree import OperandTypes, Not
+
+# The encoding of the empty clause
+EMPTY_CLAUSE = (0, 0)
+
+class LiteralTable(object):
+    """A class that maps ground atoms to integer ids and back."""
+
+    def __init__(self):
+        self.atom_ids = {}
+        # ids start from 1 so that every literal has a sign
+        self.atoms = [None]
+
+    def atom_id(self, atom):
+        """Returns the id of a given atom, a new id for an unseen atom."""
+        atom_id = self.atom_ids.get(atom)
+        if atom_id is None:
+            atom_id = len(self.atoms)
+            self.atom_ids[atom] = atom_id
+            self.atoms.append(atom)
+        return atom_id
+
+    def encode(self, literal):
+        """Returns the signed id of a given literal."""
+        if literal.get_type() is OperandTypes.T_NOT:
+            return -self.atom_id(literal.get_formula())
+        elif literal.get_type() is OperandTypes.T_ATOM:
+            return self.atom_id(literal)
+        else:
+            raise Exception("Literal table exception: literal must be an atom \
+            or a negated atom!")
+
+    def decode(self, code):
+        """Returns the literal for a given signed id."""
+        if code < 0:
+            return Not(self.atoms[-code])
+        return self.atoms[code]
+
+    def encode_clause(self, clause):
+        """Encodes a list of literals as a (positive, negative) bitset pair."""
+        positive = 0
+        negative = 0
+        for literal in clause:
+            code = self.encode(literal)
+            if code < 0:
+                negative |= 1 << -code
+            else:
+                positive |= 1 << code
+        return (positive, negative)
+
+    def decode_clause(self, clause):
+        """Decodes a (positive, negative) bitset pair into a list of literals."""
+        positive, negative = clause
+        return [self.atoms[bit.bit_length() - 1] for bit in bits(positive)] \
+        + [Not(self.atoms[bit.bit_length() - 1]) for bit in bits(negative)]
+
+def bits(mask):
+    """Generates the single-bit masks of all the bits set in a given mask."""
+    while mask:
+        bit = mask & -mask
+        yield bit
+        mask ^= bit
+
+def is_contradictory(clause):
+    """Checks if an encoded clause contains a literal and its complement."""
+    positive, negative = clause
+    return positive & negative != 0
+
+def multiply_encoded(clause_list1, clause_list2):
+    """Multiplies two lists of encoded clauses, the DNF of their conjunction.
+
+    Duplicate literals merge in the bitwise OR, a product clause is rejected
+    when its positive and negative bitsets intersect, duplicate clauses are
+    dropped and so are the subsumed ones."""
+    products = []
+    seen = set()
+
+    for positive1, negative1 in clause_list1:
+        for positive2, negative2 in clause_list2:
+            positive = positive1 | positive2
+            negative = negative1 | negative2
+            if positive & negative:
+                continue
+
+            clause = (positive, negative)
+            if clause not in seen:
+                seen.add(clause)
+                products.append(clause)
+
+    return remove_subsumed_encoded(products)
+
+def remove_subsumed_encoded(clause_list):
+    """Removes the subsumed clauses from a list of encoded clauses.
+
+    A clause subsumes another one if its bitsets are subsets of the other
+    clause's bitsets. Returns the remaining clauses in their original order."""
+    kept = {}
+    # every kept clause is indexed by one of its literals, positive atom
+    # bits are keyed by the bit and negative ones by the negated bit
+    index = {}
+
+    by_size = sorted(enumerate(clause_list), key=lambda item: \
+    bin(item[1][0]).count("1") + bin(item[1][1]).count("1"))
+
+    for position, clause in by_size:
+        positive, negative = clause
+        if not positive and not negative:
+            # the empty clause subsumes everything
+            return [clause]
+
+        subsumed = False
+        keys = list(bits(positive)) + [-bit for bit in bits(negative)]
+        for key in keys:
+            for kept_positive, kept_negative in index.get(key, []):
+                if kept_positive & ~positive == 0 \
+                and kept_negative & ~negative == 0:
+                    subsumed = True
+                    break
+            if subsumed:
+                break
+
+        if not subsumed:
+            kept[position] = clause
+            index.setdefault(keys[0], []).append(clause)
+
+    return [kept[position] for position in sorted(kept)]
+
+def find_open_clause(instance_count, instance_at):
+    """Searches the DNF of a conjunction of instances for one clause
+    without complementary literals, depth first.
+
+    The product is never materialized: instance_at(i) returns the encoded
+    clauses of the i-th instance, it is called once for every instance the
+    search reaches and the clauses are kept for the backtracking. The
+    memory is therefore linear in the number of instances reached, not
+    constant: the clauses of every instance down to the deepest one, and
+    one product clause per step of the path, but never more than one
+    instance per tuple. Returns the first open clause, or None if every
+    clause of the product is contradictory."""
+    if instance_count == 0:
+        return EMPTY_CLAUSE
+
+    # the clauses of the instances down to the deepest one reached
+    instances = [instance_at(0)]
+    # every step of the path holds the index of the next clause of its
+    # instance to try and the product clause before the instance
+    path = [(0, EMPTY_CLAUSE)]
+
+    while path:
+        depth = len(path) - 1
+        clauses = instances[depth]
+        choice, (positive, negative) = path[-1]
+        if choice == len(clauses):
+            path.pop()
+            continue
+        path[-1] = (choice + 1, (positive, negative))
+
+        clause_positive, clause_negative = clauses[choice]
+        positive |= clause_positive
+        negative |= clause_negative
+        if positive & negative:
+            continue
+
+        depth += 1
+        if depth == instance_count:
+            return (positive, negative)
+        if depth == len(instances):
+            instances.append(instance_at(depth))
+        path.append((0, (positive, negative)))
+
+    return None
@@ -5,7 +5,7 @@ from skolemize import skolemize, eliminate_universal_quantifiers
 from dnf import dnf
 from herbrand import fetch_constants, fetch_functions, fetch_variables, HerbrandUniverse
 import pdb
-from gilmore import go_gilmore, prove_valid
+from gilmore import go_gilmore, prove_valid, TRACE
 from skolemize import skolemize
 
 
@@ -65,7 +65,8 @@ left = And(faepxy, fafaipxypxy)
 test_formula = Imp(left, faeqxy)
 
 print_formula(test_formula)
-prove_valid(test_formula)
+result = prove_valid(test_formula, verbosity=TRACE)
+result.print_me()
 
 
 
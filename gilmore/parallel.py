@@ -0,0 +1,112 @@
+"""Module parallel that checks the ground instances of a level on a pool
+of worker processes.
+
+The tuple space of a level, product(level, repeat=num_vars), is cut into
+shards of consecutive indexes. Every worker compiles the matrix once, when
+it starts, multiplies the instances of the shards it gets and sends back
+only the clauses that survived, serialized, or None if the shard alone is
+already contradictory. The DNF of the level is the product of the DNFs of its
+shards, so the parent only has to multiply the surviving clauses.
+
+The terms of the levels are never sent to the workers: every worker gets
+its own copy of the universe when it starts and grows it to the level of
+the shard, like the parent grows its universe, so a task is only a level
+number and a range of tuple indexes."""
+from ground import compile_clauses
+from herbrand import tuple_at
+from literals import LiteralTable, EMPTY_CLAUSE, multiply_encoded
+from serialize import dumps_clauses, loads_clauses
+from multiprocessing import Pool, cpu_count
+
+# Number of shards given to every process for one level
+SHARDS_PER_PROCESS = 4
+
+# The state of a worker process, set by init_worker
+worker = {}
+
+def init_worker(formula, variables, universe):
+    """Compiles the matrix in a worker process, the universe must be at its
+    first level."""
+    worker["instance_clauses"] = compile_clauses(formula, variables)
+    worker["literal_table"] = LiteralTable()
+    worker["num_vars"] = len(variables)
+    worker["universe"] = universe
+
+def worker_level(index, size):
+    """Grows the universe of the worker to the level with a given index and
+    returns its terms, size is the number of terms of the level of the
+    proof. The levels are checked in order, so the universe never has to
+    go back."""
+    universe = worker["universe"]
+    while universe.level_index < index:
+        universe.next_level()
+    level = universe.get_current_level()
+    if universe.level_index != index or len(level) != size:
+        raise Exception("Parallel exception: the universe of a worker \
+        differs from the universe of the proof!")
+    return level
+
+def check_shard(task):
+    """Multiplies the instances of the tuples with indexes in [start, stop).
+
+    Returns the serialized surviving clauses, the bitsets of the worker
+    are meaningless in the parent, or None if no clause survives."""
+    level_index, level_size, start, stop = task
+    level = worker_level(level_index, level_size)
+    instance_clauses = worker["instance_clauses"]
+    literal_table = worker["literal_table"]
+    num_vars = worker["num_vars"]
+
+    clause_list = [EMPTY_CLAUSE]
+    for index in range(start, stop):
+        clause_list = multiply_encoded(clause_list, \
+        [literal_table.encode_clause(clause) for clause \
+        in instance_clauses(tuple_at(level, num_vars, index))])
+        if not clause_list:
+            return None
+
+    return dumps_clauses([literal_table.decode_clause(clause) \
+    for clause in clause_list])
+
+def shards(count, num_shards):
+    """Cuts the indexes 0 .. count-1 into at most num_shards ranges."""
+    size = max(1, -(-count // num_shards))
+    return [(start, min(start + size, count)) \
+    for start in range(0, count, size)]
+
+class LevelPool(object):
+    """A class that owns the worker processes of a proof."""
+
+    def __init__(self, formula, variables, universe, processes=None):
+        if processes is None:
+            processes = cpu_count()
+        self.processes = processes
+        self.num_vars = len(variables)
+        self.pool = Pool(processes, init_worker, \
+        (formula, variables, universe))
+
+    def check_level(self, level_index, level_size, literal_table):
+        """Multiplies all the instances of the level with a given index and
+        number of terms, the levels must be checked in order.
+
+        Returns the encoded surviving clauses, an empty list as soon as one
+        shard or the product of the shards is contradictory."""
+        tasks = [(level_index, level_size, start, stop) for start, stop in \
+        shards(level_size ** self.num_vars, \
+        self.processes * SHARDS_PER_PROCESS)]
+
+        surviving_clauses = [EMPTY_CLAUSE]
+        for shard_clauses in self.pool.imap_unordered(check_shard, tasks):
+            if shard_clauses is None:
+                return []
+            surviving_clauses = multiply_encoded(surviving_clauses, \
+            [literal_table.encode_clause(clause) \
+            for clause in loads_clauses(shard_clauses)])
+            if not surviving_clauses:
+                return []
+        return surviving_clauses
+
+    def close(self):
+        """Stops the worker processes."""
+        self.pool.terminate()
+        self.pool.join()
@@ -0,0 +1,442 @@
+"""Module reader that parses formulas from text.
+
+Two notations are read. The notation of print_me:
+
+    (A{x}.(E{y}.(p(x, y) ==> ~q(f(x), c)))) <==> TRUE
+
+where a name is a variable if a quantifier around it binds it and a
+constant otherwise. And a subset of TPTP FOF, without equality:
+
+    fof(name, axiom, ! [X] : (p(X) => ? [Y] : q(X, Y))).
+
+Both are tokenized with one regular expression and parsed by precedence
+climbing, so parsing is linear in the size of the text. From the loosest
+to the tightest, the binary connectives are the equivalences, the
+implications (right associative), the disjunctions and the conjunctions.
+Negations and quantifiers bind tighter than any of them. The arities of
+the symbols are registered in global_signature while they are read."""
+from syntax_tree import VariableTerm, ConstantTerm, FunctionTerm, Atom, \
+TrueConstant, FalseConstant, Not, And, Or, Imp, Iff, Forall, Exists, \
+global_signature
+import re
+
+GILMORE_TOKENS = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<operator><==>|==>|/\\|\\/|~|\(|\)|,|\{|\}|\.)
+  | (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+""", re.VERBOSE)
+
+TPTP_TOKENS = re.compile(r"""
+    (?P<space>\s+|%[^\n]*|/\*.*?\*/)
+  | (?P<operator><=>|<~>|=>|<=|~\||~&|!=|[~&|!?\[\]:(),.=])
+  | (?P<name>\$?[A-Za-z][A-Za-z0-9_]*|'(?:[^'\\]|\\.)*')
+  | (?P<integer>[0-9]+)
+""", re.VERBOSE | re.DOTALL)
+
+# The name and the role at the start of a TPTP statement
+ANNOTATION = re.compile(r"\s*\w+\s*\(\s*([^,\s]+)\s*,\s*(\w+)")
+
+# Binary connective => (precedence, right associative, builder)
+GILMORE_CONNECTIVES = {
+    "<==>": (1, False, Iff),
+    "==>": (2, True, Imp),
+    "\\/": (3, False, Or),
+    "/\\": (4, False, And),
+}
+
+TPTP_CONNECTIVES = {
+    "<=>": (1, False, Iff),
+    "<~>": (1, False, lambda left, right: Not(Iff(left, right))),
+    "=>": (2, True, Imp),
+    "<=": (2, True, lambda left, right: Imp(right, left)),
+    "|": (3, False, Or),
+    "~|": (3, False, lambda left, right: Not(Or(left, right))),
+    "&": (4, False, And),
+    "~&": (4, False, lambda left, right: Not(And(left, right))),
+}
+
+# Roles of the TPTP formulas that are assumed
+TPTP_AXIOM_ROLES = ["axiom", "hypothesis", "definition", "assumption", \
+    "lemma", "theorem", "corollary"]
+
+def tokenize(text, pattern):
+    """Returns the (kind, value, position) triples of a text."""
+    tokens = []
+    position = 0
+    length = len(text)
+    while position < length:
+        match = pattern.match(text, position)
+        if match is None:
+            raise Exception("Parser exception: unexpected character %r at \
+            position %d!" % (text[position], position))
+        kind = match.lastgroup
+        if kind != "space":
+            tokens.append((kind, match.group(kind), position))
+        position = match.end()
+    tokens.append(("end", None, length))
+    return tokens
+
+class Parser(object):
+    """A precedence climbing parser over a list of tokens."""
+
+    connectives = GILMORE_CONNECTIVES
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.index = 0
+        # name => number of the quantifiers that bind it
+        self.bound = {}
+
+    def peek(self):
+        """Returns the value of the next token, None at the end."""
+        return self.tokens[self.index][1]
+
+    def consume(self):
+        """Consumes the next token and returns its value."""
+        token = self.tokens[self.index]
+        if token[0] == "end":
+            self.error("unexpected end of input")
+        self.index += 1
+        return token[1]
+
+    def expect(self, value):
+        """Consumes the next token, that must have a given value."""
+        if self.peek() != value:
+            self.error("expected %s" % value)
+        self.index += 1
+
+    def name(self):
+        """Consumes a name."""
+        if self.tokens[self.index][0] != "name":
+            self.error("expected a name")
+        return self.consume()
+
+    def error(self, message):
+        kind, value, position = self.tokens[self.index]
+        raise Exception("Parser exception: %s at position %d, found %s!" \
+        % (message, position, value if value is not None else "the end"))
+
+    def at_end(self):
+        return self.tokens[self.index][0] == "end"
+
+    def formula(self, min_precedence=1):
+        """Parses binary connectives of at least a given precedence, a run
+        of conjunctions or disjunctions becomes one n-ary node."""
+        left = self.unary()
+        while True:
+            connective = self.connectives.get(self.peek())
+            if connective is None or connective[0] < min_precedence:
+                return left
+            precedence, right_associative, builder = connective
+            operands = [left]
+            while True:
+                self.index += 1
+                operands.append(self.formula(precedence if right_associative \
+                else precedence + 1))
+                following = self.connectives.get(self.peek())
+                if builder not in (And, Or) or following is None \
+                or following[2] is not builder:
+                    break
+            left = builder(*operands)
+
+    def quantified(self, quantifier, variables):
+        """Parses the body of a quantifier over the given variable names."""
+        for variable in variables:
+            self.bound[variable] = self.bound.get(variable, 0) + 1
+        body = self.unary()
+        for variable in reversed(variables):
+            self.bound[variable] -= 1
+            body = quantifier(VariableTerm(variable), body)
+        return body
+
+    def operands(self):
+        """Parses a parenthesized list of terms."""
+        self.expect("(")
+        operands = [self.term()]
+        while self.peek() == ",":
+            self.index += 1
+            operands.append(self.term())
+        self.expect(")")
+        return operands
+
+    def function(self, symbol, operands):
+        """Returns a function term, its arity must match the signature."""
+        arity = global_signature.functions.get(symbol, len(operands))
+        if arity != len(operands):
+            self.error("function %s has arity %d" % (symbol, arity))
+        return FunctionTerm(symbol, operands)
+
+    def atom(self, symbol, operands):
+        """Returns an atom, its arity must match the signature."""
+        arity = global_signature.predicates.get(symbol, len(operands))
+        if arity != len(operands):
+            self.error("predicate %s has arity %d" % (symbol, arity))
+        return Atom(symbol, operands)
+
+class GilmoreParser(Parser):
+    """A parser of the notation of print_me."""
+
+    connectives = GILMORE_CONNECTIVES
+
+    def unary(self):
+        """Parses a negation, a quantified formula or an atomic formula."""
+        value = self.peek()
+        if value == "~":
+            self.index += 1
+            return Not(self.unary())
+        elif value == "(":
+            self.index += 1
+            formula = self.formula()
+            self.expect(")")
+            return formula
+
+        symbol = self.name()
+        if symbol in ("A", "E") and self.peek() == "{":
+            self.index += 1
+            variables = [self.name()]
+            while self.peek() == ",":
+                self.index += 1
+                variables.append(self.name())
+            self.expect("}")
+            self.expect(".")
+            return self.quantified(Forall if symbol == "A" else Exists, \
+            variables)
+        elif symbol == "TRUE":
+            return TrueConstant()
+        elif symbol == "FALSE":
+            return FalseConstant()
+        elif self.peek() != "(":
+            return self.atom(symbol, [])
+        elif self.tokens[self.index + 1][1] == ")":
+            self.index += 2
+            return self.atom(symbol, [])
+        return self.atom(symbol, self.operands())
+
+    def term(self):
+        """Parses a term, unbound names are constants."""
+        symbol = self.name()
+        if self.peek() == "(":
+            return self.function(symbol, self.operands())
+        elif self.bound.get(symbol):
+            return VariableTerm(symbol)
+        return ConstantTerm(symbol)
+
+class TptpParser(Parser):
+    """A parser of a subset of TPTP FOF, equality is not supported."""
+
+    connectives = TPTP_CONNECTIVES
+
+    def annotated(self):
+        """Parses fof(name, role, formula). and returns the triple."""
+        if self.name() != "fof":
+            self.error("expected fof")
+        self.expect("(")
+        # the name of a statement is a name or an integer
+        if self.tokens[self.index][0] == "integer":
+            name = self.consume()
+        else:
+            name = self.name()
+        self.expect(",")
+        role = self.name()
+        self.expect(",")
+        formula = self.formula()
+        self.expect(")")
+        self.expect(".")
+        return (name, role, formula)
+
+    def unary(self):
+        """Parses a negation, a quantified formula or an atomic formula."""
+        value = self.peek()
+        if value == "~":
+            self.index += 1
+            return Not(self.unary())
+        elif value == "(":
+            self.index += 1
+            formula = self.formula()
+            self.expect(")")
+            return formula
+        elif value in ("!", "?"):
+            self.index += 1
+            self.expect("[")
+            variables = [self.variable()]
+            while self.peek() == ",":
+                self.index += 1
+                variables.append(self.variable())
+            self.expect("]")
+            self.expect(":")
+            return self.quantified(Forall if value == "!" else Exists, \
+            variables)
+
+        symbol = self.name()
+        if symbol == "$true":
+            formula = TrueConstant()
+        elif symbol == "$false":
+            formula = FalseConstant()
+        elif self.peek() == "(":
+            formula = self.atom(symbol, self.operands())
+        else:
+            formula = self.atom(symbol, [])
+
+        if self.peek() in ("=", "!="):
+            self.error("equality is not supported")
+        return formula
+
+    def variable(self):
+        """Parses a variable name."""
+        name = self.name()
+        if not name[0].isupper():
+            self.error("expected a variable")
+        return name
+
+    def term(self):
+        """Parses a term, upper case names are variables."""
+        symbol = self.name()
+        if symbol[0].isupper():
+            return VariableTerm(symbol)
+        elif self.peek() == "(":
+            return self.function(symbol, self.operands())
+        return ConstantTerm(symbol)
+
+def parse_formula(text):
+    """Parses a formula in the notation of print_me."""
+    parser = GilmoreParser(tokenize(text, GILMORE_TOKENS))
+    formula = parser.formula()
+    if not parser.at_end():
+        parser.error("expected the end")
+    return formula
+
+def parse_tptp(text):
+    """Parses the fof formulas of a text into (name, role, formula)
+    triples."""
+    parser = TptpParser(tokenize(text, TPTP_TOKENS))
+    annotated = []
+    while not parser.at_end():
+        annotated.append(parser.annotated())
+    return annotated
+
+def tptp_problem(annotated):
+    """Returns the formula to prove valid for a list of annotated formulas,
+    the axioms imply the conjecture. Without a conjecture the negation of
+    the axioms is to be proven, that is their unsatisfiability."""
+    axioms = [formula for _, role, formula in annotated \
+    if role in TPTP_AXIOM_ROLES]
+    conjectures = [formula for _, role, formula in annotated \
+    if role == "conjecture"]
+    negated = [formula for _, role, formula in annotated \
+    if role == "negated_conjecture"]
+    if len(conjectures) > 1:
+        raise Exception("Parser exception: more than one conjecture!")
+
+    premises = axioms + negated
+
+    if conjectures:
+        if not premises:
+            return conjectures[0]
+        return Imp(And(*premises), conjectures[0])
+    if not premises:
+        raise Exception("Parser exception: empty problem!")
+    return Not(And(*premises))
+
+def statements(lines):
+    """Generates the TPTP statements of a stream of lines, a statement ends
+    with a dot outside of parentheses, quotes and comments. Text left after
+    the last statement is generated too, for the parser to report it."""
+    buffer = []
+    depth = 0
+    quoted = False
+    for line in lines:
+        start = 0
+        for position, character in enumerate(line):
+            if quoted:
+                if character == "'":
+                    quoted = False
+            elif character == "'":
+                quoted = True
+            elif character == "%":
+                break
+            elif character == "(":
+                depth += 1
+            elif character == ")":
+                depth -= 1
+            elif character == "." and depth == 0:
+                buffer.append(line[start:position + 1])
+                yield "".join(buffer)
+                buffer = []
+                start = position + 1
+        buffer.append(line[start:])
+    rest = "".join(buffer)
+    position = 0
+    match = TPTP_TOKENS.match(rest)
+    while match is not None and match.lastgroup == "space":
+        position = match.end()
+        match = TPTP_TOKENS.match(rest, position)
+    if position < len(rest):
+        yield rest
+
+def load_problems(path, syntax=None):
+    """Lazily generates the (name, formula) problems of a file, the formulas
+    are to be proven valid.
+
+    In the notation of print_me every line that is not empty and does not
+    start with % or # is a problem. In TPTP (syntax "tptp", the default for
+    .p, .ax and .tptp files) a problem is made of the formulas up to and
+    including a conjecture, see tptp_problem, the formulas after the last
+    conjecture make a problem as well.
+
+    A problem that can not be read is generated with the exception of its
+    first error in place of the formula, and the next problems are read as
+    usual. The role of a TPTP statement that does not parse is guessed from
+    its start, see ANNOTATION, to know where its problem ends.
+
+    global_signature is cleared before every problem, so the problems of a
+    file may give a symbol different arities. A problem has to be proven
+    before the next one is read."""
+    if syntax is None:
+        syntax = "tptp" if path.endswith((".p", ".ax", ".tptp")) \
+        else "gilmore"
+
+    with open(path) as problem_file:
+        if syntax == "gilmore":
+            for number, line in enumerate(problem_file, 1):
+                line = line.strip()
+                if line and not line.startswith(("%", "#")):
+                    global_signature.clear()
+                    try:
+                        formula = parse_formula(line)
+                    except Exception as error:
+                        formula = error
+                    yield ("%s:%d" % (path, number), formula)
+        elif syntax == "tptp":
+            annotated = []
+            error = None
+            global_signature.clear()
+            for number, statement in enumerate(statements(problem_file), 1):
+                try:
+                    parser = TptpParser(tokenize(statement, TPTP_TOKENS))
+                    name, role, formula = parser.annotated()
+                    annotated.append((name, role, formula))
+                except Exception as statement_error:
+                    error = error or statement_error
+                    header = ANNOTATION.match(statement)
+                    name, role = header.groups() if header \
+                    else ("%s:%d" % (path, number), None)
+                    annotated.append((name, role, None))
+                if role == "conjecture":
+                    yield (name, problem_formula(annotated, error))
+                    annotated = []
+                    error = None
+                    global_signature.clear()
+            if annotated:
+                yield (annotated[-1][0], problem_formula(annotated, error))
+        else:
+            raise Exception("Parser exception: unknown syntax %s!" % syntax)
+
+def problem_formula(annotated, error):
+    """Returns the formula of the annotated formulas of a TPTP problem, or
+    the exception of its first error."""
+    if error is not None:
+        return error
+    try:
+        return tptp_problem(annotated)
+    except Exception as problem_error:
+        return problem_error
@@ -0,0 +1,125 @@
+"""Module relevance that selects the ground instances worth multiplying.
+
+A ground instance whose literals have no complement in any other instance
+can never take part in a contradiction: making all of its literals true
+satisfies it without falsifying anything else. The tuples of such
+instances are held back until a complementary literal shows up, and most of
+them never have to be instantiated and multiplied at all."""
+from syntax_tree import OperandTypes
+from literals import bits
+from ground import compile_formula
+from herbrand import remove_duplicates
+
+def fetch_literals(formula):
+    """Finds all the literals of a quantifier free formula in NNF, walking
+    it with an explicit stack."""
+    literals = []
+    stack = [formula]
+    while stack:
+        node = stack.pop()
+        node_type = node.get_type()
+
+        if node_type is OperandTypes.T_ATOM or node_type is OperandTypes.T_NOT:
+            literals.append(node)
+        elif node_type is OperandTypes.T_AND or node_type is OperandTypes.T_OR:
+            stack.extend(reversed(node.get_formulas()))
+        elif node_type is not OperandTypes.T_TRUE \
+        and node_type is not OperandTypes.T_FALSE:
+            raise Exception("Relevance exception: formula must be in NNF, \
+            without quantifiers.")
+    return literals
+
+class RelevanceFilter(object):
+    """A class that filters a stream of tuples before their instances are
+    made.
+
+    The literals of the matrix are indexed by predicate symbol and polarity,
+    only the predicates that occur with both polarities can ever clash, so
+    only the literals of those predicates are instantiated for a tuple. A
+    tuple is released as soon as one of these literals has a complement in
+    a tuple seen before it, and the tuples that were held back are released
+    when a complement of one of their literals arrives. A matrix that is a
+    logical constant has no literals to clash, its tuples are all released,
+    their instances may be contradictory on their own."""
+
+    def __init__(self, formula, variables, literal_table):
+        literals = remove_duplicates(fetch_literals(formula))
+        polarities = {}
+        for literal in literals:
+            polarities.setdefault(predicate_symbol(literal), set()).add( \
+            literal.get_type() is not OperandTypes.T_NOT)
+
+        self.clashing_literals = [literal for literal in literals \
+        if len(polarities[predicate_symbol(literal)]) == 2]
+        self.variables = variables
+        self.constant = formula.get_type() is OperandTypes.T_TRUE \
+        or formula.get_type() is OperandTypes.T_FALSE
+        self.literal_table = literal_table
+        # the templates of the clashing literals, compiled on first use
+        self.templates = None
+
+        # bitsets of the literals of all the tuples seen so far
+        self.seen_positive = 0
+        self.seen_negative = 0
+
+        # signed atom bit => held back tuples with that literal
+        self.held_back = {}
+
+    def __getstate__(self):
+        # the templates are functions, they are compiled again after a load
+        state = dict(self.__dict__)
+        state["templates"] = None
+        return state
+
+    def filter(self, substitutions):
+        """Generates the relevant tuples from a stream of tuples."""
+        for substitution in substitutions:
+            for released in self.add(substitution):
+                yield released
+
+    def add(self, substitution):
+        """Adds a tuple and returns the list of the released tuples."""
+        if self.constant:
+            return [substitution]
+        if self.templates is None:
+            self.templates = [compile_formula(literal, self.variables) \
+            for literal in self.clashing_literals]
+
+        positive = 0
+        negative = 0
+        for template in self.templates:
+            code = self.literal_table.encode(template(substitution))
+            if code < 0:
+                negative |= 1 << -code
+            else:
+                positive |= 1 << code
+
+        released = []
+        if positive & negative or positive & self.seen_negative \
+        or negative & self.seen_positive:
+            released.append(substitution)
+            # the held back tuples that clash with this one
+            keys = [-bit for bit in bits(positive & self.seen_negative)] \
+            + [bit for bit in bits(negative & self.seen_positive)]
+            for key in keys:
+                for held in self.held_back.pop(key, []):
+                    if held[1]:
+                        held[1] = False
+                        released.append(held[0])
+        else:
+            # a held back tuple is [tuple, still held back]
+            held = [substitution, True]
+            for bit in bits(positive):
+                self.held_back.setdefault(bit, []).append(held)
+            for bit in bits(negative):
+                self.held_back.setdefault(-bit, []).append(held)
+
+        self.seen_positive |= positive
+        self.seen_negative |= negative
+        return released
+
+def predicate_symbol(literal):
+    """Returns the predicate symbol of a literal."""
+    if literal.get_type() is OperandTypes.T_NOT:
+        return literal.get_formula().predicate_symbol
+    return literal.predicate_symbol
@@ -0,0 +1,308 @@
+"""Module serialize that contains a compact binary encoding of terms,
+formulas and clause lists.
+
+The encoding is a symbol table followed by a flat array of 32 bit integers
+that holds the nodes in prefix order: the type of the node (OperandTypes and
+TermTypes), then its symbol id and number of operands where it has them, then
+its children. A node that was already written is replaced by a reference to
+its offset, so shared subtrees are written only once. A blob holds a list of
+items, formulas or clause lists, that are decoded one at a time, only when
+they are needed.
+
+Layout, all numbers are little endian:
+
+    header      magic, number of symbols, number of items, number of codes
+    symbols     every symbol as its length followed by its bytes
+    items       the offset of every item in the codes
+    codes       the code array"""
+from syntax_tree import OperandTypes, TermTypes, VariableTerm, ConstantTerm, \
+FunctionTerm, Atom, TrueConstant, FalseConstant, Not, And, Or, Imp, Iff, \
+Forall, Exists
+from array import array
+from struct import pack, unpack_from, calcsize
+import sys
+
+MAGIC = "GLM2"
+HEADER = "<4sIII"
+LENGTH = "<I"
+
+# Codes that are not node types
+REFERENCE = 13
+CLAUSE_LIST = 14
+
+# Node classes by the type code
+NAMED_TYPES = {TermTypes.T_VAR: VariableTerm, TermTypes.T_CONST: ConstantTerm}
+OPERAND_TYPES = {TermTypes.T_FUNC: FunctionTerm, OperandTypes.T_ATOM: Atom}
+CONSTANT_TYPES = {OperandTypes.T_TRUE: TrueConstant, \
+    OperandTypes.T_FALSE: FalseConstant}
+NARY_TYPES = {OperandTypes.T_AND: And, OperandTypes.T_OR: Or}
+BINARY_TYPES = {OperandTypes.T_IMP: Imp, OperandTypes.T_IFF: Iff}
+QUANTIFIER_TYPES = {OperandTypes.T_FORALL: Forall, \
+    OperandTypes.T_EXISTS: Exists}
+
+def to_bytes(codes):
+    """Returns the little endian bytes of a code array."""
+    if sys.byteorder == "big":
+        codes = array("i", codes)
+        codes.byteswap()
+    return codes.tostring()
+
+def from_bytes(data):
+    """Returns the code array of little endian bytes."""
+    codes = array("i")
+    codes.fromstring(data)
+    if sys.byteorder == "big":
+        codes.byteswap()
+    return codes
+
+class Encoder(object):
+    """A class that encodes formulas and clause lists into one blob."""
+
+    def __init__(self):
+        self.symbols = []
+        self.symbol_ids = {}
+        self.items = []
+        self.codes = array("i")
+        # node => offset of its code, for the references
+        self.offsets = {}
+
+    def symbol_id(self, symbol):
+        """Returns the id of a given symbol, a new id for an unseen symbol."""
+        symbol_id = self.symbol_ids.get(symbol)
+        if symbol_id is None:
+            symbol_id = len(self.symbols)
+            self.symbol_ids[symbol] = symbol_id
+            self.symbols.append(symbol)
+        return symbol_id
+
+    def add_formula(self, formula):
+        """Adds a formula or a term, returns the index of the item."""
+        self.items.append(len(self.codes))
+        self.encode(formula)
+        return len(self.items) - 1
+
+    def add_clause_list(self, clause_list):
+        """Adds a list of clauses of literals, returns the index of the item."""
+        self.items.append(len(self.codes))
+        self.codes.append(CLAUSE_LIST)
+        self.codes.append(len(clause_list))
+        for clause in clause_list:
+            self.codes.append(len(clause))
+            for literal in clause:
+                self.encode(literal)
+        return len(self.items) - 1
+
+    def encode(self, node):
+        """Appends the codes of a node in prefix order, with an explicit stack
+        of the nodes still to write, so the depth of the node is not limited."""
+        codes = self.codes
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            offset = self.offsets.get(node)
+            if offset is not None:
+                codes.append(REFERENCE)
+                codes.append(offset)
+                continue
+            self.offsets[node] = len(codes)
+
+            node_type = node.get_type()
+            codes.append(node_type)
+
+            children = ()
+            if node_type in NAMED_TYPES:
+                codes.append(self.symbol_id(node.name))
+            elif node_type is TermTypes.T_FUNC:
+                codes.append(self.symbol_id(node.function_symbol))
+                children = node.operands
+                codes.append(len(children))
+            elif node_type is OperandTypes.T_ATOM:
+                codes.append(self.symbol_id(node.predicate_symbol))
+                children = node.operands
+                codes.append(len(children))
+            elif node_type is OperandTypes.T_NOT:
+                children = (node.get_formula(),)
+            elif node_type in NARY_TYPES:
+                children = node.get_formulas()
+                codes.append(len(children))
+            elif node_type in BINARY_TYPES:
+                children = (node.get_formula1(), node.get_formula2())
+            elif node_type in QUANTIFIER_TYPES:
+                children = (node.get_variable(), node.get_formula())
+            elif node_type not in CONSTANT_TYPES:
+                raise Exception("Serialize exception: unknown node type!")
+            stack.extend(reversed(children))
+
+    def to_bytes(self):
+        """Returns the blob."""
+        parts = [pack(HEADER, MAGIC, len(self.symbols), len(self.items), \
+        len(self.codes))]
+        for symbol in self.symbols:
+            parts.append(pack(LENGTH, len(symbol)))
+            parts.append(symbol)
+        parts.append(to_bytes(array("i", self.items)))
+        parts.append(to_bytes(self.codes))
+        return "".join(parts)
+
+class Decoder(object):
+    """A class that decodes the items of a blob on demand.
+
+    Only the symbol table and the code array are read when the blob is
+    loaded, syntax tree nodes are built when an item is asked for."""
+
+    def __init__(self, data):
+        data = memoryview(data)
+        magic, num_symbols, num_items, num_codes = unpack_from(HEADER, data)
+        if magic != MAGIC:
+            raise Exception("Serialize exception: not a serialized blob!")
+
+        position = calcsize(HEADER)
+        self.symbols = []
+        for _ in range(0, num_symbols):
+            length, = unpack_from(LENGTH, data, position)
+            position += calcsize(LENGTH)
+            self.symbols.append(data[position:position + length].tobytes())
+            position += length
+
+        size = array("i").itemsize
+        self.items = from_bytes(data[position:position \
+        + num_items * size].tobytes())
+        position += num_items * size
+        self.codes = from_bytes(data[position:position \
+        + num_codes * size].tobytes())
+        # offset => decoded node, for the references
+        self.nodes = {}
+
+    def __len__(self):
+        return len(self.items)
+
+    def is_clause_list(self, index):
+        """Checks if the item with a given index is a clause list."""
+        return self.codes[self.items[index]] == CLAUSE_LIST
+
+    def formula(self, index):
+        """Returns the formula or the term with a given index."""
+        if self.is_clause_list(index):
+            raise Exception("Serialize exception: item is a clause list!")
+        return self.decode(self.items[index])[0]
+
+    def clause_list(self, index):
+        """Returns the clause list with a given index."""
+        if not self.is_clause_list(index):
+            raise Exception("Serialize exception: item is not a clause list!")
+
+        offset = self.items[index] + 1
+        count = self.codes[offset]
+        offset += 1
+        clause_list = []
+        for _ in range(0, count):
+            length = self.codes[offset]
+            offset += 1
+            clause = []
+            for _ in range(0, length):
+                literal, offset = self.decode(offset)
+                clause.append(literal)
+            clause_list.append(clause)
+        return clause_list
+
+    def decode(self, offset):
+        """Decodes the node at a given offset.
+
+        Returns the node and the offset right after its codes. The nodes
+        whose operands are being decoded are kept on an explicit stack of
+        [type, start, symbol, count, operands] frames, so the depth of the
+        node is not limited. A reference to a node that was not decoded yet
+        pushes a REFERENCE frame with the offset to continue from after it."""
+        codes = self.codes
+        stack = []
+        while True:
+            node_type = codes[offset]
+            start = offset
+
+            if node_type == REFERENCE:
+                target = codes[offset + 1]
+                node = self.nodes.get(target)
+                if node is None:
+                    stack.append([REFERENCE, offset + 2, None, 1, []])
+                    offset = target
+                    continue
+                offset += 2
+            elif node_type in NAMED_TYPES:
+                node = NAMED_TYPES[node_type](self.symbols[codes[offset + 1]])
+                self.nodes[start] = node
+                offset += 2
+            elif node_type in CONSTANT_TYPES:
+                node = CONSTANT_TYPES[node_type]()
+                self.nodes[start] = node
+                offset += 1
+            else:
+                if node_type in OPERAND_TYPES:
+                    frame = [node_type, start, self.symbols[codes[offset + 1]], \
+                    codes[offset + 2], []]
+                    offset += 3
+                elif node_type in NARY_TYPES:
+                    frame = [node_type, start, None, codes[offset + 1], []]
+                    offset += 2
+                elif node_type == OperandTypes.T_NOT:
+                    frame = [node_type, start, None, 1, []]
+                    offset += 1
+                elif node_type in BINARY_TYPES or node_type in QUANTIFIER_TYPES:
+                    frame = [node_type, start, None, 2, []]
+                    offset += 1
+                else:
+                    raise Exception("Serialize exception: unknown code %d!" \
+                    % node_type)
+                if frame[3] > 0:
+                    stack.append(frame)
+                    continue
+                node = self.build(frame)
+
+            # hand the node to the frames it completes
+            while stack:
+                frame = stack[-1]
+                frame[4].append(node)
+                if len(frame[4]) < frame[3]:
+                    break
+                stack.pop()
+                if frame[0] == REFERENCE:
+                    offset = frame[1]
+                else:
+                    node = self.build(frame)
+            else:
+                return node, offset
+
+    def build(self, frame):
+        """Builds the node of a frame whose operands are decoded."""
+        node_type, start, symbol, count, operands = frame
+        if node_type in OPERAND_TYPES:
+            node = OPERAND_TYPES[node_type](symbol, operands)
+        elif node_type in NARY_TYPES:
+            node = NARY_TYPES[node_type](*operands)
+        elif node_type == OperandTypes.T_NOT:
+            node = Not(operands[0])
+        elif node_type in BINARY_TYPES:
+            node = BINARY_TYPES[node_type](*operands)
+        else:
+            node = QUANTIFIER_TYPES[node_type](*operands)
+        self.nodes[start] = node
+        return node
+
+def dumps(formula):
+    """Returns the blob of a single formula."""
+    encoder = Encoder()
+    encoder.add_formula(formula)
+    return encoder.to_bytes()
+
+def loads(data):
+    """Returns the formula of a blob made by dumps."""
+    return Decoder(data).formula(0)
+
+def dumps_clauses(clause_list):
+    """Returns the blob of a single clause list."""
+    encoder = Encoder()
+    encoder.add_clause_list(clause_list)
+    return encoder.to_bytes()
+
+def loads_clauses(data):
+    """Returns the clause list of a blob made by dumps_clauses."""
+    return Decoder(data).clause_list(0)
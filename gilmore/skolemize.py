@@ -1,7 +1,6 @@
 """A module that contains the Skolemize function.
 
 Skolemization eliminates the existential quantifiers from the formula."""
-import copy
 from syntax_tree import OperandTypes, get_unique_constant,\
 ConstantTerm, Forall, get_unique_function
 import pdb
@@ -9,69 +8,82 @@ import pdb
 # Non-quantifier operand types
 NOT_QUANTIFIERS = [OperandTypes.T_ATOM, OperandTypes.T_NOT,\
     OperandTypes.T_AND, OperandTypes.T_OR, OperandTypes.T_IMP, \
-    OperandTypes.T_IFF]
+    OperandTypes.T_IFF, OperandTypes.T_TRUE, OperandTypes.T_FALSE]
 
 def skolemize(formula, quantified_varible_list):
     """Skolemizes (eliminates the existential quantifiers) the given formula.
 
-        We assume that the formula is in the prenex  form.
+        We assume that the formula is in the prenex  form. The prefix is
+        walked with a loop, so the number of quantifiers is not limited.
     """
-    formula_type = formula.get_type()
+    universal_variables = []
 
-    if formula_type in NOT_QUANTIFIERS:
-        return skolemize_non_quantifier(formula)
+    while True:
+        formula_type = formula.get_type()
 
-    elif formula_type == OperandTypes.T_EXISTS:
-        return skolemize_exists(formula, quantified_varible_list)
+        if formula_type in NOT_QUANTIFIERS:
+            formula = skolemize_non_quantifier(formula)
+            break
 
-    elif formula_type == OperandTypes.T_FORALL:
-        return skolemize_forall(formula, quantified_varible_list)
+        elif formula_type == OperandTypes.T_EXISTS:
+            formula = skolemize_exists(formula, quantified_varible_list)
 
-    else:
-        raise Exception("Skolemize exception: formula must be in nnf, \
-        prenex form!")
+        elif formula_type == OperandTypes.T_FORALL:
+            quantified_varible_list = skolemize_forall(formula, \
+            quantified_varible_list)
+            universal_variables.append(formula.get_variable())
+            formula = formula.get_formula()
+
+        else:
+            raise Exception("Skolemize exception: formula must be in nnf, \
+            prenex form!")
+
+    for variable in reversed(universal_variables):
+        formula = Forall(variable, formula)
+    return formula
 
 def skolemize_non_quantifier(formula):
-    """Formula that is not quantified is already skolemized. (Prenex assumed)"""
-    return copy.deepcopy(formula)
+    """Formula that is not quantified is already skolemized. (Prenex assumed)
+
+    Formulas are immutable so there is no need to copy it."""
+    return formula
 
 def skolemize_exists(formula, quantified_varible_list):
-    """Skolemizes a formula quantified with an existential quantifier."""
+    """Eliminates the existential quantifier in front of a formula.
+
+    Returns the quantified formula with the variable replaced by a new
+    constant, or a new function of the universally quantified variables."""
     quantified_variable = formula.get_variable()
     quantified_formula = formula.get_formula()
 
     if not quantified_varible_list:
-        return skolemize(quantified_formula.substitute_variable(\
-        quantified_variable, ConstantTerm(get_unique_constant())), \
-        quantified_varible_list)
+        return quantified_formula.substitute_variable(quantified_variable, \
+        ConstantTerm(get_unique_constant()))
     else:
         new_function = get_unique_function(quantified_varible_list)
-        return skolemize(quantified_formula.substitute_variable(\
-        quantified_variable, new_function), quantified_varible_list)
-
+        return quantified_formula.substitute_variable(quantified_variable, \
+        new_function)
 
 def skolemize_forall(formula, quantified_varible_list):
-    """Skolemizes a formula quantified with an universal quantifier."""
+    """Returns the list of the universally quantified variables with the
+    variable of the universal quantifier in front of a formula added."""
     quantified_variable = formula.get_variable()
-    quantified_formula = formula.get_formula()
 
     if not quantified_varible_list:
         quantified_varible_list = [quantified_variable]
     else:
         quantified_varible_list.append(quantified_variable)
-    return Forall(quantified_variable, skolemize(quantified_formula, \
-        quantified_varible_list))
+    return quantified_varible_list
 
 def eliminate_universal_quantifiers(formula):
     """Eliminates the universal quantifers from a skolemized formula."""
-    formula_type = formula.get_type()
-
-    if formula_type in NOT_QUANTIFIERS:
-        return copy.deepcopy(formula)
-    elif formula_type == OperandTypes.T_FORALL:
-        return eliminate_universal_quantifiers(formula.get_formula())
-    else:
-        raise Exception("Eliminate quantifiers exception: \
-        formula of unexpected type!")
-
-
+    while True:
+        formula_type = formula.get_type()
+
+        if formula_type in NOT_QUANTIFIERS:
+            return formula
+        elif formula_type == OperandTypes.T_FORALL:
+            formula = formula.get_formula()
+        else:
+            raise Exception("Eliminate quantifiers exception: \
+            formula of unexpected type!")
@@ -0,0 +1,89 @@
+"""Module store that keeps encoded clauses in a file instead of in memory.
+
+A clause is written as the number of its literals followed by the signed
+atom ids of the literals (see LiteralTable), all as 32 bit integers. The
+file is read back through a memory map, one window at a time, so a store
+can be much larger than the available memory."""
+from literals import bits
+from array import array
+from tempfile import mkstemp
+import mmap
+import os
+
+# Number of integers buffered before they are written to the file
+BUFFER_SIZE = 1 << 16
+
+# Number of bytes of the file decoded at once
+WINDOW_SIZE = 1 << 22
+
+class ClauseStore(object):
+    """An append-only file of encoded clauses in a temporary file."""
+
+    def __init__(self, directory=None):
+        descriptor, self.path = mkstemp(prefix="gilmore-", \
+        suffix=".clauses", dir=directory)
+        self.file = os.fdopen(descriptor, "w+b")
+        self.buffer = array("i")
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def append(self, clause):
+        """Appends an encoded (positive, negative) clause."""
+        positive, negative = clause
+        literals = [bit.bit_length() - 1 for bit in bits(positive)] \
+        + [1 - bit.bit_length() for bit in bits(negative)]
+        self.buffer.append(len(literals))
+        self.buffer.extend(literals)
+        self.count += 1
+        if len(self.buffer) >= BUFFER_SIZE:
+            self.flush()
+
+    def flush(self):
+        """Writes the buffered clauses to the file."""
+        self.file.seek(0, os.SEEK_END)
+        self.buffer.tofile(self.file)
+        self.buffer = array("i")
+        self.file.flush()
+
+    def __iter__(self):
+        """Generates the encoded clauses, in the order they were appended."""
+        self.flush()
+        size = os.fstat(self.file.fileno()).st_size
+        if size == 0:
+            return
+
+        mapped = mmap.mmap(self.file.fileno(), size, access=mmap.ACCESS_READ)
+        try:
+            pending = array("i")
+            for start in range(0, size, WINDOW_SIZE):
+                codes = array("i", pending)
+                codes.fromstring(mapped[start:start + WINDOW_SIZE])
+
+                position = 0
+                while position < len(codes):
+                    end = position + 1 + codes[position]
+                    if end > len(codes):
+                        break
+                    yield decode(codes[position + 1:end])
+                    position = end
+                pending = codes[position:]
+        finally:
+            mapped.close()
+
+    def close(self):
+        """Closes and removes the file."""
+        self.file.close()
+        os.remove(self.path)
+
+def decode(literals):
+    """Returns the (positive, negative) bitsets of signed atom ids."""
+    positive = 0
+    negative = 0
+    for literal in literals:
+        if literal < 0:
+            negative |= 1 << -literal
+        else:
+            positive |= 1 << literal
+    return (positive, negative)
@@ -1,7 +1,8 @@
 """A module that contains the syntax tree for first order logic."""
 
 from sys import stdout
-import copy
+from weakref import WeakValueDictionary
+from heapq import heappush, heappop
 import pdb
 
 class OperandTypes(object):
@@ -36,6 +37,11 @@ class Signature(object):
     functions = {}
     predicates = {}
 
+    def clear(self):
+        """Removes all the symbols from the signature."""
+        self.functions.clear()
+        self.predicates.clear()
+
     def add_function_symbol(self, function_symbol, arity):
         """Adds a function to the signature."""
         self.functions[function_symbol] = arity
@@ -66,180 +72,172 @@ class Signature(object):
 
 global_signature = Signature()
 
-class VariableTerm:
-    """A term that represents a variable, for example p, q, r in formulas like: (p /\\ q) => r"""
-    def __init__(self, name):
-        self.name = name
+#table of all the live syntax tree nodes, used for hash-consing
+node_table = WeakValueDictionary()
 
-    def print_me(self):
-        """Print the formula."""
-        stdout.write(self.name)
+class Node(object):
+    """A base class for all the nodes of the syntax tree.
 
-    def get_type(self):
-        """Returns the type of this formula."""
-        return TermTypes.T_VAR
+        Nodes are immutable and hash-consed: constructing a node that is structurally equal
+        to a node that already exists returns the existing node. Identical subtrees are
+        therefore shared, equality is an identity check and the hash is computed only once.
+    """
+    __slots__ = ('_hash', '__weakref__')
+    _fields = ()
+
+    def __new__(cls, *args):
+        key = (cls,) + args
+        node = node_table.get(key)
+        if node is None:
+            node = object.__new__(cls)
+            for field, value in zip(cls._fields, args):
+                object.__setattr__(node, field, value)
+            object.__setattr__(node, '_hash', hash(key))
+            node_table[key] = node
+        return node
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Syntax tree nodes are immutable!")
+
+    def __delattr__(self, name):
+        raise AttributeError("Syntax tree nodes are immutable!")
 
     def __eq__(self, other):
         """Equality operator."""
-        equal = False
-        try:
-            equal = other.get_type() == TermTypes.T_VAR and self.name == other.name
-        except AttributeError ,attr_err:
-            print "Exception: %s" % attr_err
-            print """-- TIP FROM DIVIC: You probably used substitute_variable with a variable name
-instead of a VariableTerm object. --"""
-            raise
-
-        return equal
-
-    def __ne__(self):
-        """Non-equality operator."""
-        return not self.__eq__(other)
+        return self is other
 
-    def substitute_variable(self, variable, term):
-        """Substitutes the given variable with a given term."""
-        if self == variable:
-            return term
-        else:
-            return copy.deepcopy(self)
+    def __ne__(self, other):
+        """Non-equality operator."""
+        return self is not other
 
-    def contains_variable(self, variable):
-        """Checks if this formula contains the given variable."""
-        if self == variable:
-            return True
-        else:
-            return False
+    def __hash__(self):
+        """Returns the precomputed structural hash."""
+        return self._hash
 
-    def pullquants(self):
-        """Pulls the quantifiers in front of the formula, for prenex."""
-        return copy.deepcopy(self)
+    def __reduce__(self):
+        return (self.__class__, tuple([getattr(self, field) for field in self._fields]))
 
-    def prenex(self):
-        """Returns the prenex form of this formula."""
-        return copy.deepcopy(self)
+    def __copy__(self):
+        return self
 
-class ConstantTerm(object):
-    """A term that represents a constant of a given language like: socrat in HUMAN(socrat)."""
-    def __init__(self, name):
-        self.name = name
+    def __deepcopy__(self, memo):
+        return self
 
     def print_me(self):
-        """Prints the formula."""
-        stdout.write(self.name)
+        """Prints the formula.
 
-    def get_type(self):
-        """Returns the type of this formula."""
-        return TermTypes.T_CONST
+            The parts of a node, see print_parts, are strings and its children, that
+            are printed from an explicit stack, so the depth of the formula is not limited.
+        """
+        stack = [self]
+        while stack:
+            part = stack.pop()
+            if isinstance(part, Node):
+                stack.extend(reversed(part.print_parts()))
+            else:
+                stdout.write(part)
 
-    def __eq__(self, other):
-        """Equality operator."""
-        return other.get_type() == TermTypes.T_CONST and self.name == other.name
+    def nnf(self):
+        """Returns the Negation Normal Form of this formula."""
+        return negation_normal_form(self)
 
-    def __ne__(self, other):
-        """Non-equality operator."""
-        return not self.__eq__(other)
+    def prenex(self):
+        """Returns the prenex form of this formula, that must be in nnf."""
+        return prenex_form(self)
+
+    def substitute(self, mapping):
+        """Substitutes the variables with the terms from a given mapping, in one pass.
+
+            Untouched subtrees are reused, not copied. The variable of a quantifier is
+            never substituted, and it is renamed if one of the substituted terms contains it.
+        """
+        return substitute_terms(self, mapping)
 
     def substitute_variable(self, variable, term):
         """Substitutes the given variable with a given term."""
-        if self == variable:
-            return term
-        else:
-            return copy.deepcopy(self)
+        return self.substitute({variable: term})
 
     def contains_variable(self, variable):
-        """Checks if this formula contains a given variable."""
-        if self == variable:
-            return True
-        else:
-            return False
+        """Checks if this formula contains a given variable.
+
+            The variables right after the quantifiers are not looked at."""
+        stack = [self]
+        seen = set()
+        while stack:
+            node = stack.pop()
+            if node is variable:
+                return True
+            if node not in seen:
+                seen.add(node)
+                stack.extend(subformulas(node))
+        return False
+
+class VariableTerm(Node):
+    """A term that represents a variable, for example p, q, r in formulas like: (p /\\ q) => r"""
+    __slots__ = ('name',)
+    _fields = __slots__
+
+    def print_parts(self):
+        """Returns the parts of the printed formula, see print_me."""
+        return [self.name]
+
+    def get_type(self):
+        """Returns the type of this formula."""
+        return TermTypes.T_VAR
 
     def pullquants(self):
         """Pulls the quantifiers in front of the formula, for prenex."""
-        return copy.deepcopy(self)
+        return self
 
-    def prenex(self):
-        """Returns the prenex form of this formula."""
-        return copy.deepcopy(self)
+class ConstantTerm(Node):
+    """A term that represents a constant of a given language like: socrat in HUMAN(socrat)."""
+    __slots__ = ('name',)
+    _fields = __slots__
+
+    def print_parts(self):
+        """Returns the parts of the printed formula, see print_me."""
+        return [self.name]
 
-class FunctionTerm:
+    def get_type(self):
+        """Returns the type of this formula."""
+        return TermTypes.T_CONST
+
+    def pullquants(self):
+        """Pulls the quantifiers in front of the formula, for prenex."""
+        return self
+
+class FunctionTerm(Node):
     """A term that represents a function of multiple other terms, for example f(p) or q(x, f(y))."""
-    def __init__(self, function_symbol, operands):
-        self.function_symbol = function_symbol
-        self.operands = operands
+    __slots__ = ('function_symbol', 'operands')
+    _fields = __slots__
 
+    def __new__(cls, function_symbol, operands):
         global global_signature
 
         if not global_signature.check_function_symbol(function_symbol, len(operands)):
             raise Exception("Syntax error! Bad signature.")
 
-    def print_me(self):
-        """Prints the formula."""
-        stdout.write(self.function_symbol)
+        return Node.__new__(cls, function_symbol, tuple(operands))
 
-        stdout.write("(")
-        length = len(self.operands)
-        for i in range(0, length - 1):
-            self.operands[i].print_me()
-            stdout.write(", ")
-
-        self.operands[length-1].print_me()
-        stdout.write(")")
+    def print_parts(self):
+        """Returns the parts of the printed formula, see print_me."""
+        return [self.function_symbol + "("] + separated(self.operands, ", ") + [")"]
 
     def get_type(self):
         """Returns the type of this formula."""
         return TermTypes.T_FUNC
 
-    def __eq__(self, other):
-        """Equality operator."""
-        return other.get_type() == TermTypes.T_FUNC and self.function_symbol == other.function_symbol and self.operands == other.operands
-
-    def __ne__(self, other):
-        """Non-equality operator."""
-        return not self.__eq__(other)
-
-    def contains_variable(self, variable):
-        """Checks if this function contains the given variable."""
-        for operand in self.operands:
-            if operand.contains_variable(variable) == True:
-                return True
-
-        return False
-
-    def substitute_variable(self, variable, term):
-        """Substitutes the given variable with a given term."""
-        if self.contains_variable(variable):
-            temp_ops = []
-
-            for operand in self.operands:
-                temp_ops.append(operand.substitute_variable(variable, term))
-
-            return FunctionTerm(self.function_symbol, temp_ops)
-
-        else:
-            return copy.deepcopy(self)
-
     def pullquants(self):
         """Pulls the quantifiers in front of the formula, for prenex."""
-        return copy.deepcopy(self)
+        return self
 
-    def prenex(self):
-        """Return the prenex form of this formula."""
-        return copy.deepcopy(self)
-
-class AtomicFormula(object):
+class AtomicFormula(Node):
     """A class that represents an atomic formula in first order logic, atom, true and false."""
-    def nnf(self):
-        """Returns the Negation Normal Form of this formula."""
-        return copy.deepcopy(self)
+    __slots__ = ()
 
     def pullquants(self):
         """Pulls the quantifiers in front of the formula, for prenex."""
-        return copy.deepcopy(self)
-
-    def prenex(self):
-        """Returns the prenex form of this formula."""
-        return copy.deepcopy(self)
-
+        return self
 
 class Atom(AtomicFormula):
     """A class that represents an atom in first order logic.
@@ -248,547 +246,200 @@ class Atom(AtomicFormula):
         FLIES(bird) is an atom, FLIES is a predicate
         IS_WHOLE_NUMBER(square(whole_number))  is an atom, square() is a function and IS_WHOLE_NUMBER is a predicate.
     """
-    def __init__(self, predicate_symbol, operands):
-        self.predicate_symbol = predicate_symbol
-        self.operands = operands
+    __slots__ = ('predicate_symbol', 'operands')
+    _fields = __slots__
 
+    def __new__(cls, predicate_symbol, operands):
         global global_signature
 
         if not global_signature.check_predicate_symbol(predicate_symbol, len(operands)):
             raise Exception("Syntax error! Bad signature")
 
+        return Node.__new__(cls, predicate_symbol, tuple(operands))
 
-    def print_me(self):
-        """Prints the formula."""
-        stdout.write(self.predicate_symbol + "(")
-
-        length = len(self.operands)
-        for i in range(0, length - 1):
-            self.operands[i].print_me()
-            stdout.write(", ")
-
-        self.operands[length-1].print_me()
-        stdout.write(")")
-
+    def print_parts(self):
+        """Returns the parts of the printed formula, see print_me."""
+        return [self.predicate_symbol + "("] + separated(self.operands, ", ") + [")"]
 
     def get_type(self):
         """Returns the type of this formula."""
         return OperandTypes.T_ATOM
 
-
-    def __eq__(self, other):
-        """Equality operator."""
-        return other.get_type() == OperandTypes.T_ATOM and self.predicate_symbol == other.predicate_symbol and self.operands == other.operands
-
-    def __ne__(self, other):
-        """Non-equality operator."""
-        return not self.__eq__(other)
-
-    def contains_variable(self, variable):
-        """Checks if this formula contains a given variable."""
-        for operand in self.operands:
-            if operand.contains_variable(variable) == True:
-                return True
-
-        return False
-
-
-    def substitute_variable(self, variable, term):
-        """Substitutes a given variable with a given term."""
-        if self.contains_variable(variable):
-            temp_ops = []
-
-            for operand in self.operands:
-                temp_ops.append(operand.substitute_variable(variable, term))
-
-            return Atom(self.predicate_symbol, temp_ops)
-
-        else:
-            return copy.deepcopy(self)
-
-
 class LogicalConstant(AtomicFormula):
     """A class that represents a logical constant in first order logic."""
-    def contains_variable(self, variable):
-        """Check if this formula contains a given variable."""
-        return False
-
-    def substitute_variable(self, variable, term):
-        """Substitutes the given variable with a given term."""
-        return copy.deepcopy(self)
+    __slots__ = ()
 
 class TrueConstant(LogicalConstant):
     """A class that represents TRUE."""
-    def print_me(self):
-        """Prints the formula."""
-        stdout.write("TRUE")
+    __slots__ = ()
+
+    def print_parts(self):
+        """Returns the parts of the printed formula, see print_me."""
+        return ["TRUE"]
 
     def get_type(self):
         """Returns the type of this formula."""
         return OperandTypes.T_TRUE
 
-    def __eq__(self, other):
-        """Equality operator."""
-        return other.get_type() == OperandTypes.T_TRUE
-
-    def __ne__(self, other):
-        """Non-equality operator."""
-        return not self.__eq__(other)
-
-
 class FalseConstant(LogicalConstant):
     """A class that represents FALSE."""
-    def print_me(self):
-        """Prints the formula."""
-        stdout.write("FALSE")
+    __slots__ = ()
+
+    def print_parts(self):
+        """Returns the parts of the printed formula, see print_me."""
+        return ["FALSE"]
 
     def get_type(self):
         """Returns the type of this formula."""
         return OperandTypes.T_FALSE
 
-    def __eq__(self, other):
-        """Equality operator."""
-        return other.get_type() == OperandTypes.T_FALSE
-
-    def __ne__(self, other):
-        """Non-equality operator."""
-        return not self.__eq__(other)
-
-class Not:
+class Not(Node):
     """A class that represents a negation in first order logic."""
-    def __init__(self, formula):
-        self.formula= formula
+    __slots__ = ('formula',)
+    _fields = __slots__
 
     def get_formula(self):
         """Returns the negated formula."""
         return self.formula
 
-    def print_me(self):
-        """Prints the formula."""
-        stdout.write("(~")
-        self.formula.print_me()
-        stdout.write(")")
+    def print_parts(self):
+        """Returns the parts of the printed formula, see print_me."""
+        return ["(~", self.formula, ")"]
 
     def get_type(self):
         """Returns the type of this formula."""
         return OperandTypes.T_NOT
 
-    def nnf(self):
-        """Returns the Negation Normal Form of this formula."""
-
-        # DVOSTRUKA NEGACIJA
-        if self.formula.get_type() == OperandTypes.T_NOT:
-            return self.formula.get_formula().nnf()
-
-        # de Morgan 1: ~( A /\ B) == ~A \/ ~B
-        elif self.formula.get_type() == OperandTypes.T_AND:
-            not_first = Not(self.formula.get_formula1().nnf())
-            not_first = not_first.nnf()
-
-            not_second = Not(self.formula.get_formula2().nnf())
-            not_second = not_second.nnf()
-
-            return Or(not_first, not_second)
-
-        # de Morgan 2: ~( A \/ B) == ~A /\ ~B
-        elif self.formula.get_type() == OperandTypes.T_OR:
-            not_first = Not(self.formula.get_formula1().nnf())
-            not_first = not_first.nnf()
-
-            not_second = Not(self.formula.get_formula2().nnf())
-            not_second = not_second.nnf()
-
-            return And(not_first, not_second)
-
-        # Negacija implikacije:  ~ ( A ==> B) == A /\ ~B
-        elif self.formula.get_type() == OperandTypes.T_IMP:
-
-            first = self.formula.get_formula1().nnf()
-
-            not_second = Not(self.formula.get_formula2().nnf())
-            not_second = not_second.nnf()
-
-            return And(first, not_second)
-
-        # Negacija ekvivalencije: ~ ( A <==> B) == ~(A==>B) \/ ~(B==>A)
-        elif self.formula.get_type() == OperandTypes.T_IFF:
-            formula1 = self.formula.get_formula1().nnf()
-            formula2 = self.formula.get_formula2().nnf()
-
-            imp1 = Imp(formula1, formula2)
-            imp2 = Imp(formula2, formula1)
-
-            not1 = Not(imp1).nnf()
-
-            not2 = Not(imp2).nnf()
-
-            return Or(not1, not2)
-
-        # ~ FORALL(f) == EXISTS(~f)
-        elif self.formula.get_type() == OperandTypes.T_FORALL:
-            return Exists(self.formula.get_variable(), Not(self.formula.get_formula()).nnf())
-
-        # ~ EXISTS(f) == FORALL(~f)
-        elif self.formula.get_type() == OperandTypes.T_EXISTS:
-            return Forall(self.formula.get_variable(), Not(self.formula.get_formula()).nnf())
-        else:
-            return Not(self.formula.nnf())
-
-
-    def __eq__(self, other):
-        """Equality operator."""
-        return other.get_type() == OperandTypes.T_NOT and self.formula == other.formula
-
-    def __ne__(self, other):
-        """Non-equality operator."""
-        return not self.__eq__(other)
-
-    def contains_variable(self, variable):
-        """Checks if this formula contains the given variable."""
-        return self.formula.contains_variable(variable)
-
-    def substitute_variable(self, variable, term):
-        """Substitutes the given variable with a given term."""
-        if(self.contains_variable(variable)):
-            return Not(self.formula.substitute_variable(variable,term))
-        else:
-            return copy.deepcopy(self)
-
     def pullquants(self):
         """Pulls the quantifiers in front of the formula, for prenex."""
-        return copy.deepcopy(self)
+        return self
 
-    def prenex(self):
-        """Returns the prenex form of this formula."""
-        return copy.deepcopy(self)
-
-class BinaryOperator:
-    """A class that represents a binary operator in first order logic."""
-    def __init__(self, formula1, formula2):
-        self.formula1 = formula1
-        self.formula2 = formula2
-
-    def get_formula1(self):
-        """Returns the left conjunct."""
-        return self.formula1
-
-    def get_formula2(self):
-        """Returns the right conjunct."""
-        return self.formula2
-
-    def contains_variable(self, variable):
-        """Checks if this formula contains the given variable."""
-        return self.formula1.contains_variable(variable) or self.formula2.contains_variable(variable)
+class NaryOperator(Node):
+    """A class that represents an associative operator of any number of formulas in first order logic.
 
+        The operands are normalized on construction: an operand of the same class is replaced
+        by its operands, a repeated operand is dropped, and so is the neutral constant. The
+        absorbing constant, or an operand together with its negation, make the whole formula
+        the absorbing constant. An operator of one operand is that operand, of none the
+        neutral constant. So A /\\ (B /\\ A) is A /\\ B, and A /\\ ~A is FALSE.
+    """
+    __slots__ = ('formulas',)
+    _fields = __slots__
+    # set by the subclasses: the constant classes that are dropped and that absorb the
+    # operator, and the symbol printed between the operands
+    neutral = None
+    absorbing = None
+    symbol = None
+
+    def __new__(cls, *formulas):
+        operands = []
+        seen = set()
+        for formula in formulas:
+            children = formula.formulas if formula.__class__ is cls else (formula,)
+            for child in children:
+                if child in seen or isinstance(child, cls.neutral):
+                    continue
+                if isinstance(child, cls.absorbing):
+                    return child
+                seen.add(child)
+                operands.append(child)
+
+        for operand in operands:
+            if isinstance(operand, Not) and operand.formula in seen:
+                return cls.absorbing()
+
+        if not operands:
+            return cls.neutral()
+        elif len(operands) == 1:
+            return operands[0]
+        return Node.__new__(cls, tuple(operands))
+
+    def __reduce__(self):
+        return (self.__class__, self.formulas)
+
+    def get_formulas(self):
+        """Returns the operands."""
+        return self.formulas
+
+    def print_parts(self):
+        """Returns the parts of the printed formula, see print_me."""
+        return ["("] + separated(self.formulas, self.symbol) + [")"]
 
-class And(BinaryOperator):
-    """A class that represents the Conjunction of two formulas in first order logic."""
-    def __init__(self, formula1, formula2):
-        BinaryOperator.__init__(self, formula1, formula2)
+    def pullquants(self):
+        """Pulls the quantifiers in front of the formula, for prenex, see pull_operands."""
+        return pull_operands(self.__class__, self.formulas)
 
-    def print_me(self):
-        """Prints the formula."""
-        stdout.write("(")
-        self.formula1.print_me()
-        stdout.write(" /\\ ")
-        self.formula2.print_me()
-        stdout.write(")")
+class And(NaryOperator):
+    """A class that represents the Conjunction of formulas in first order logic."""
+    __slots__ = ()
+    neutral = TrueConstant
+    absorbing = FalseConstant
+    symbol = " /\\ "
 
     def get_type(self):
         """Returns the type of this formula."""
         return OperandTypes.T_AND
 
-    def nnf(self):
-        """Returns the Negation Normal Form of this formula."""
-        return And(self.formula1.nnf(), self.formula2.nnf())
-
-    def __eq__(self, other):
-        """Equality operator."""
-        return other.get_type() == OperandTypes.T_AND and self.formula1 == other.formula1 and self.formula2 == other.formula2
-
-    def __ne__(self, other):
-        """Non-equality operator."""
-        return not self.__eq__(other)
-
-    def substitute_variable(self, variable, term):
-        """Substitutes the given variable with a given term."""
-        if(self.contains_variable(variable)):
-            return And(self.formula1.substitute_variable(variable, term), self.formula2.substitute_variable(variable, term))
-        else:
-            return copy.deepcopy(self)
-
-    def pullquants(self):
-        """Pulls the quantifiers in front of the formula, for prenex.
-
-            We make the pullquants form using these rules:
-
-                (forall x) A /\\ (forall y) B == (forall z) A /\\ B
-                ((exists x) A) /\\ B == (exists z) ( A /\\ B)
-                A /\\ (exists x) B == ( exists z) ( A /\\ B)
-                ((forall x) A) /\\ B == ( forall z) ( A /\\ B )
-                A /\\ (forall x) B == ( forall z ) ( A /\\ B)
-
-            ELSE A /\\ B.
-        """
-        # (forall x) A /\ (forall y) B == (forall z) A /\ B
-        if self.formula1.get_type() == OperandTypes.T_FORALL and self.formula2.get_type() == OperandTypes.T_FORALL:
-            #check for special case where x == y
-            if self.formula1.variable == self.formula2.variable:
-                return Forall(self.formula1.variable, And(self.formula1.formula, self.formula2.formula).pullquants())
-            else:
-                unique_var = VariableTerm(get_unique_variable())
-                new_formula1 = self.formula1.formula.substitute_variable(self.formula1.variable, unique_var)
-                new_formula2 = self.formula2.formula.substitute_variable(self.formula2.variable, unique_var)
-                return Forall( unique_var, And( new_formula1, new_formula2).pullquants())
-
-        #((exists x) A) /\ B == (exists z) ( A /\ B)
-        elif self.formula1.get_type() == OperandTypes.T_EXISTS:
-            # if B doesn't contain x then we just pull the quantifier outside
-            if self.formula2.contains_variable(self.formula1.variable) == False:
-                return Exists(self.formula1.variable, And(self.formula1.formula, self.formula2).pullquants())
-            # if B contains x we have to rename x in A
-            else:
-                unique_var = VariableTerm(get_unique_variable())
-                return Exists( unique_var, And(self.formula1.formula.substitute_variable(self.formula1.variable, unique_var), self.formula2).pullquants())
-
-        #A /\ (exists x) B == ( exists z) ( A /\ B)
-        elif self.formula2.get_type() == OperandTypes.T_EXISTS:
-            # if A doesn't contain x then we just pull the quantifier outside
-            if self.formula1.contains_variable(self.formula2.variable) == False:
-                return Exists(self.formula2.variable, And(self.formula1 , self.formula2.formula).pullquants())
-            # if A contains x we have to rename x in B
-            else:
-                unique_var = VariableTerm(get_unique_variable())
-                return Exists( unique_var, And(self.formula1, self.formula2.formula.substitute_variable(self.formula2.variable, unique_var)).pullquants())
-        #((forall x) A) /\ B == ( forall z) ( A /\ B )
-        elif self.formula1.get_type() == OperandTypes.T_FORALL:
-            # if B doesn't contain x then we just pull the quantifier outside
-            if self.formula2.contains_variable(self.formula1.variable) == False:
-                return Forall(self.formula1.variable, And(self.formula1.formula, self.formula2).pullquants())
-            # if B contains x we have to rename x in A
-            else:
-                unique_var = VariableTerm(get_unique_variable())
-                return Forall( unique_var, And(self.formula1.formula.substitute_variable(self.formula1.variable, unique_var), self.formula2).pullquants())
-
-        #    A /\ (forall x) B == ( forall z ) ( A /\ B)
-        elif self.formula2.get_type() == OperandTypes.T_FORALL:
-            # if A doesn't contain x then we just pull the quantifier outside
-            if self.formula1.contains_variable(self.formula2.variable) == False:
-                return Forall(self.formula2.variable, And(self.formula1 , self.formula2.formula).pullquants())
-            # if A contains x we have to rename x in B
-            else:
-                unique_var = VariableTerm(get_unique_variable())
-                return Forall( unique_var, And(self.formula1, self.formula2.formula.substitute_variable(self.formula2.variable, unique_var)).pullquants())
-        # ELSE A /\ B
-        else:
-            return copy.deepcopy(self)
-
-    def prenex(self):
-        """Returns the prenex form of this formula."""
-        return And(self.formula1.prenex(), self.formula2.prenex()).pullquants()
-
-class Or(BinaryOperator):
-    """A class that represents the Disjunction of two formulas in first order logic."""
-    def __init__(self, formula1, formula2):
-        BinaryOperator.__init__(self, formula1, formula2)
-
-    def print_me(self):
-        """Prints the formula."""
-        stdout.write("(")
-        self.formula1.print_me()
-        stdout.write(" \\/ ")
-        self.formula2.print_me()
-        stdout.write(")")
+class Or(NaryOperator):
+    """A class that represents the Disjunction of formulas in first order logic."""
+    __slots__ = ()
+    neutral = FalseConstant
+    absorbing = TrueConstant
+    symbol = " \\/ "
 
     def get_type(self):
         """Returns the type of this formula."""
         return OperandTypes.T_OR
 
-    def nnf(self):
-        """Returns the Negation Normal Form of this formula."""
-        return Or(self.formula1.nnf(), self.formula2.nnf())
-
-    def __eq__(self, other):
-        """Equality operator."""
-        return other.get_type() == OperandTypes.T_OR and self.formula1 == other.formula1 and self.formula2 == other.formula2
-
-    def __ne__(self, other):
-        """Non-equality operator."""
-        return not self.__eq__(other)
-
-    def substitute_variable(self, variable, term):
-        """Substitutes the given variable with a given term."""
-        if(self.contains_variable(variable)):
-            return Or(self.formula1.substitute_variable(variable, term), self.formula2.substitute_variable(variable, term))
-        else:
-            return copy.deepcopy(self)
-
-
-    def pullquants(self):
-        """Pulls the quantifiers in front of the formula, for prenex.
-
-            We make the pullquants form using these rules:
-
-                (exists x) A \\/ (exists y) B == (exists z) A \\/ B
-                ((exists x) A) \\/ B == (exists z) ( A \\/ B)
-                A \\/ (exists x) B == ( exists z) ( A \\/ B)
-                ((forall x) A) \\/ B == ( forall z) ( A \\/ B )
-                A \\/ (forall x) B == ( forall z ) ( A \\/ B)
-
-            ELSE A \\/ B.
-        """
-        # (exists x) A \/ (exists y) B == (exists z) A \/ B
-        if self.formula1.get_type() == OperandTypes.T_EXISTS and self.formula2.get_type() == OperandTypes.T_EXISTS:
-            #check for special case where x == y
-            if self.formula1.variable == self.formula2.variable:
-                return Exists(self.formula1.variable, Or(self.formula1.formula, self.formula2.formula).pullquants())
-            else:
-                unique_var = VariableTerm(get_unique_variable())
-                new_formula1 = self.formula1.formula.substitute_variable(self.formula1.variable, unique_var)
-                new_formula2 = self.formula2.formula.substitute_variable(self.formula2.variable, unique_var)
-                return Exists( unique_var, Or( new_formula1, new_formula2).pullquants())
-
-        #((exists x) A) \/ B == (exists z) ( A \/ B)
-        elif self.formula1.get_type() == OperandTypes.T_EXISTS:
-            # if B doesn't contain x then we just pull the quantifier outside
-            if self.formula2.contains_variable(self.formula1.variable) == False:
-                return Exists(self.formula1.variable, Or(self.formula1.formula, self.formula2).pullquants())
-            # if B contains x we have to rename x in A
-            else:
-                unique_var = VariableTerm(get_unique_variable())
-                return Exists( unique_var, Or(self.formula1.formula.substitute_variable(self.formula1.variable, unique_var), self.formula2).pullquants())
-
-        #A \/ (exists x) B == ( exists z) ( A \/ B)
-        elif self.formula2.get_type() == OperandTypes.T_EXISTS:
-            # if A doesn't contain x then we just pull the quantifier outside
-            if self.formula1.contains_variable(self.formula2.variable) == False:
-                return Exists(self.formula2.variable, Or(self.formula1 , self.formula2.formula).pullquants())
-            # if A contains x we have to rename x in B
-            else:
-                unique_var = VariableTerm(get_unique_variable())
-                return Exists( unique_var, Or(self.formula1, self.formula2.formula.substitute_variable(self.formula2.variable, unique_var)).pullquants())
-        #((forall x) A) \/ B == ( forall z) ( A \/ B )
-        elif self.formula1.get_type() == OperandTypes.T_FORALL:
-            # if B doesn't contain x then we just pull the quantifier outside
-            if self.formula2.contains_variable(self.formula1.variable) == False:
-                return Forall(self.formula1.variable, Or(self.formula1.formula, self.formula2).pullquants())
-            # if B contains x we have to rename x in A
-            else:
-                unique_var = VariableTerm(get_unique_variable())
-                return Forall( unique_var, Or(self.formula1.formula.substitute_variable(self.formula1.variable, unique_var), self.formula2).pullquants())
-
-        #    A \/ (forall x) B == ( forall z ) ( A \/ B)
-        elif self.formula2.get_type() == OperandTypes.T_FORALL:
-            # if A doesn't contain x then we just pull the quantifier outside
-            if self.formula1.contains_variable(self.formula2.variable) == False:
-                return Forall(self.formula2.variable, Or(self.formula1, self.formula2.formula).pullquants())
-            # if A contains x we have to rename x in B
-            else:
-                unique_var = VariableTerm(get_unique_variable())
-                return Forall(unique_var, Or(self.formula1, self.formula2.formula.substitute_variable(self.formula2.variable, unique_var)).pullquants())
-        # ELSE A \/ B
-        else:
-            return copy.deepcopy(self)
-
+class BinaryOperator(Node):
+    """A class that represents a binary operator in first order logic."""
+    __slots__ = ('formula1', 'formula2')
+    _fields = __slots__
 
-    def prenex(self):
-        """Returns the prenex form of this formula."""
-        return Or(self.formula1.prenex(), self.formula2.prenex()).pullquants()
+    def get_formula1(self):
+        """Returns the left operand."""
+        return self.formula1
 
+    def get_formula2(self):
+        """Returns the right operand."""
+        return self.formula2
 
 class Imp(BinaryOperator):
     """A class that represents the Implication of two formulas in first order logic."""
-    def __init__(self, formula1, formula2):
-        BinaryOperator.__init__(self, formula1, formula2)
+    __slots__ = ()
 
-    def print_me(self):
-        """Prints the formula."""
-        stdout.write("(")
-        self.formula1.print_me()
-        stdout.write(" ==> ")
-        self.formula2.print_me()
-        stdout.write(")")
+    def print_parts(self):
+        """Returns the parts of the printed formula, see print_me."""
+        return ["(", self.formula1, " ==> ", self.formula2, ")"]
 
     def get_type(self):
         """Returns the type of this formula."""
         return OperandTypes.T_IMP
 
-    def nnf(self):
-        """Returns the Negation Normal Form of this formula."""
-        return Or(Not(self.formula1.nnf()).nnf(), self.formula2.nnf())
-
-    def __eq__(self, other):
-        """Equality operator."""
-        return other.get_type() == OperandTypes.T_IMP and self.formula1 == other.formula1 and self.formula2 == other.formula2
-
-    def __ne__(self, other):
-        """Non-equality operator."""
-        return not self.__eq__(other)
-
-    def substitute_variable(self, variable, term):
-        """Substitutes the given variable with a given term."""
-        if self.contains_variable(variable):
-            return Imp(self.formula1.substitute_variable(variable, term), self.formula2.substitute_variable(variable, term))
-        else:
-            return copy.deepcopy(self)
-
     def pullquants(self):
         """Pulls the quantifiers in front of the formula, for prenex."""
         raise Exception("pullquants failed! Formula must be in nnf!")
 
-    def prenex(self):
-        """Returns the prenex form of this formula."""
-        raise Exception("prenex failed! Formula must be in nnf!")
-
 class Iff(BinaryOperator):
     """A class that represent the Equivalence of two formulas in first order logic."""
-    def __init__(self, formula1, formula2):
-        BinaryOperator.__init__(self, formula1, formula2)
+    __slots__ = ()
 
-    def print_me(self):
-        """Prints the formula."""
-        stdout.write("(")
-        self.formula1.print_me()
-        stdout.write(" <==> ")
-        self.formula2.print_me()
-        stdout.write(")")
+    def print_parts(self):
+        """Returns the parts of the printed formula, see print_me."""
+        return ["(", self.formula1, " <==> ", self.formula2, ")"]
 
     def get_type(self):
         """Returns the type of this formula."""
         return OperandTypes.T_IFF
 
-    def nnf(self):
-        """Returns the Negation Normal Form of this formula."""
-        return And(Imp(self.formula1.nnf(), self.formula2.nnf()).nnf(), Imp(self.formula2.nnf(), self.formula1.nnf()).nnf())
-
-    def __eq__(self, other):
-        """Equality operator."""
-        return other.get_type() == OperandTypes.T_IFF and self.formula1 == other.formula1 and self.formula2 == other.formula2
-
-    def __ne__(self, other):
-        """Non-equality operator."""
-        return not self.__eq__(other)
-
-    def substitute_variable(self, variable, term):
-        """Substitutes the given variable with a given term."""
-        if self.contains_variable(variable):
-            return Iff(self.formula1.substitute_variable(variable, term), self.formula2.substitute_variable(variable, term))
-        else:
-            return copy.deepcopy(self)
-
     def pullquants(self):
         """Pulls the quantifiers in front of the formula, for prenex."""
         raise Exception("pullquants failed! Formula must be in nnf!")
 
-    def prenex(self):
-        """Returns the prenex form of this formula."""
-        raise Exception("prenex failed! Formula must be in nnf!")
-
-class Quantifier(object):
+class Quantifier(Node):
     """A class that represents a quantifier in first order logic."""
-    def __init__(self, variable, formula):
-        self.variable = variable
-        self.formula = formula
+    __slots__ = ('variable', 'formula')
+    _fields = __slots__
 
     def get_formula(self):
         """Returns the quantified formula."""
@@ -798,110 +449,37 @@ class Quantifier(object):
         """Returns the quantified variable."""
         return self.variable
 
-    def contains_variable(self, variable):
-        """Checks if this formula contains a given variable."""
-        return self.formula.contains_variable(variable)
-
 class Forall(Quantifier):
     """A class that represents the universal quantifier."""
-    def __init__(self, variable, formula):
-        Quantifier.__init__(self, variable, formula)
+    __slots__ = ()
 
-    def print_me(self):
-        """Prints the formula."""
-        stdout.write("(A{")
-        self.variable.print_me()
-        stdout.write("}.(")
-        self.formula.print_me()
-        stdout.write(")")
-
-    def nnf(self):
-        """Returns the Negation Normal Form of this formula."""
-        return Forall(self.variable, self.formula.nnf())
+    def print_parts(self):
+        """Returns the parts of the printed formula, see print_me."""
+        return ["(A{", self.variable, "}.(", self.formula, "))"]
 
     def get_type(self):
         """Returns the type of this formula."""
         return OperandTypes.T_FORALL
 
-    def __eq__(self, other):
-        """Equality operator."""
-        return other.get_type() == OperandTypes.T_FORALL and self.variable == other.variable and self.formula == other.formula
-
-    def __ne__(self, other):
-        """Non-equality operator."""
-        return not self.__eq__(other)
-
-    def substitute_variable(self, variable, term):
-        """Substitutes the given variable with a given term."""
-        if self.variable == variable:
-            return copy.deepcopy(self)
-
-        if term.contains_variable(self.variable):
-            unique_var = VariableTerm(get_unique_variable())
-            new_formula = self.formula.substitute_variable(self.variable, unique_var)
-            return Forall(unique_var, new_formula.substitute_variable(variable, term))
-
-        else:
-            return Forall(self.variable, self.formula.substitute_variable(variable, term))
-
     def pullquants(self):
         """Pulls the quantifiers in front of the formula, for prenex."""
-        return copy.deepcopy(self)
-
-    def prenex(self):
-        """Returns the prenex form of this formula."""
-        return Forall(self.variable, self.formula.prenex())
+        return self
 
 class Exists(Quantifier):
     """A class that represents the existential quantifier."""
-    def __init__(self, variable, formula):
-        Quantifier.__init__(self, variable, formula)
+    __slots__ = ()
 
-    def print_me(self):
-        """Prints the formula."""
-        stdout.write("(E{")
-        self.variable.print_me()
-        stdout.write("}.(")
-        self.formula.print_me()
-        stdout.write(")")
-
-    def nnf(self):
-        """Returns the Negation Normal Form of this formula."""
-        return Exists(self.variable, self.formula.nnf())
+    def print_parts(self):
+        """Returns the parts of the printed formula, see print_me."""
+        return ["(E{", self.variable, "}.(", self.formula, "))"]
 
     def get_type(self):
         """Returns the type of this formula."""
         return OperandTypes.T_EXISTS
 
-    def __eq__(self, other):
-        """Equality operator."""
-        return other.get_type() == OperandTypes.T_EXISTS and self.variable == other.variable and self.formula == other.formula
-
-    def __ne__(self, other):
-        """Non-equality operator."""
-        return not self.__eq__(other)
-
-    def substitute_variable(self, variable, term):
-        """Substitutes the given variable with a given term."""
-        if self.variable == variable:
-            return copy.deepcopy(self)
-
-        if term.contains_variable(self.variable):
-            unique_var = VariableTerm(get_unique_variable())
-            new_formula = self.formula.substitute_variable(self.variable, unique_var)
-            return Exists(unique_var, new_formula.substitute_variable(variable, term))
-
-        else:
-            return Exists(self.variable, self.formula.substitute_variable(variable, term))
-
     def pullquants(self):
         """Pulls the quantifiers in front of the formula, for prenex."""
-        return copy.deepcopy(self)
-
-    def prenex(self):
-        """Returns the prenex form of this formula."""
-        return Exists(self.variable, self.formula.prenex())
-
+        return self
 
 #unique variable index
 uv_index = 0
@@ -909,6 +487,8 @@ uv_index = 0
 uc_index = 0
 #unique function index
 uf_index = 0
+#unique predicate index
+up_index = 0
 
 def get_unique_variable():
     """Returns an unique variable."""
@@ -927,3 +507,288 @@ def get_unique_function(operands):
     global uf_index
     uf_index = uf_index + 1
     return FunctionTerm("uf%d" % uf_index, operands)
+
+def get_unique_predicate(operands):
+    """Returns an atom with an unique predicate."""
+    global up_index
+    up_index = up_index + 1
+    return Atom("up%d" % up_index, operands)
+
+def separated(nodes, separator):
+    """Returns the nodes with a separator between every two of them, for print_parts."""
+    parts = []
+    for node in nodes:
+        if parts:
+            parts.append(separator)
+        parts.append(node)
+    return parts
+
+def subformulas(node):
+    """Returns the children of a node: the operands of atoms and functions, the
+    subformulas of the other formulas. The variable of a quantifier is not a child."""
+    if isinstance(node, (Atom, FunctionTerm)):
+        return node.operands
+    elif isinstance(node, NaryOperator):
+        return node.formulas
+    elif isinstance(node, BinaryOperator):
+        return (node.formula1, node.formula2)
+    elif isinstance(node, (Not, Quantifier)):
+        return (node.formula,)
+    return ()
+
+def bottom_up(root, expand, combine):
+    """Evaluates a function over a formula bottom up, with an explicit stack
+    instead of recursion, so the depth of the formula is not limited.
+
+        An item is a node, or a node paired with a context. expand(item) returns
+        the items the value of the item depends on and combine(item, values) the
+        value from their values. Every item is expanded and combined only once,
+        in the same order as a recursion would.
+    """
+    values = {}
+    stack = [(root, None)]
+    while stack:
+        item, dependencies = stack.pop()
+        if dependencies is None:
+            if item in values:
+                continue
+            dependencies = expand(item)
+            stack.append((item, dependencies))
+            for dependency in reversed(dependencies):
+                stack.append((dependency, None))
+        else:
+            values[item] = combine(item, [values[dependency] for dependency in dependencies])
+    return values[root]
+
+def negation_normal_form(formula):
+    """Returns the Negation Normal Form of a formula.
+
+        Every subformula is visited once for each polarity it has in the formula:
+        a negation flips the polarity, implications and equivalences are expanded
+        and the negative conjunctions, disjunctions and quantifiers are dualized:
+
+            ~~A == A
+            ~(A /\\ B) == ~A \\/ ~B,  ~(A \\/ B) == ~A /\\ ~B
+            A ==> B == ~A \\/ B,  ~(A ==> B) == A /\\ ~B
+            A <==> B == (~A \\/ B) /\\ (~B \\/ A)
+            ~(A <==> B) == (A /\\ ~B) \\/ (B /\\ ~A)
+            ~(forall x) A == (exists x) ~A,  ~(exists x) A == (forall x) ~A
+            ~TRUE == FALSE,  ~FALSE == TRUE
+    """
+    def expand(item):
+        node, positive = item
+        node_type = node.get_type()
+        if node_type is OperandTypes.T_NOT:
+            return [(node.formula, not positive)]
+        elif node_type is OperandTypes.T_AND or node_type is OperandTypes.T_OR:
+            return [(formula, positive) for formula in node.formulas]
+        elif node_type is OperandTypes.T_IMP:
+            return [(node.formula1, not positive), (node.formula2, positive)]
+        elif node_type is OperandTypes.T_IFF:
+            return [(node.formula1, not positive), (node.formula2, positive), \
+            (node.formula2, not positive), (node.formula1, positive)]
+        elif isinstance(node, Quantifier):
+            return [(node.formula, positive)]
+        return []
+
+    def combine(item, values):
+        node, positive = item
+        node_type = node.get_type()
+        if node_type is OperandTypes.T_NOT:
+            return values[0]
+        elif node_type is OperandTypes.T_AND:
+            return And(*values) if positive else Or(*values)
+        elif node_type is OperandTypes.T_OR or node_type is OperandTypes.T_IMP:
+            return Or(*values) if positive else And(*values)
+        elif node_type is OperandTypes.T_IFF:
+            if positive:
+                return And(Or(values[0], values[1]), Or(values[2], values[3]))
+            return Or(And(values[0], values[1]), And(values[2], values[3]))
+        elif node_type is OperandTypes.T_FORALL:
+            return (Forall if positive else Exists)(node.variable, values[0])
+        elif node_type is OperandTypes.T_EXISTS:
+            return (Exists if positive else Forall)(node.variable, values[0])
+        elif positive:
+            return node
+        elif node_type is OperandTypes.T_TRUE:
+            return FalseConstant()
+        elif node_type is OperandTypes.T_FALSE:
+            return TrueConstant()
+        return Not(node)
+
+    return bottom_up((formula, True), expand, combine)
+
+def prenex_form(formula):
+    """Returns the prenex form of a formula in nnf.
+
+        The quantifiers of every conjunction and disjunction are pulled up with
+        pull_operands once those of its subformulas are, bottom up.
+    """
+    def expand(node):
+        node_type = node.get_type()
+        if node_type is OperandTypes.T_AND or node_type is OperandTypes.T_OR:
+            return list(node.formulas)
+        elif isinstance(node, Quantifier):
+            return [node.formula]
+        elif node_type is OperandTypes.T_IMP or node_type is OperandTypes.T_IFF:
+            raise Exception("prenex failed! Formula must be in nnf!")
+        return []
+
+    def combine(node, values):
+        if isinstance(node, NaryOperator):
+            return pull_operands(node.__class__, values)
+        elif isinstance(node, Quantifier):
+            return node.__class__(node.variable, values[0])
+        return node
+
+    return bottom_up(formula, expand, combine)
+
+def pull_operands(node_class, formulas):
+    """Pulls the quantifiers of prenex formulas in front of their conjunction (node_class
+    And) or disjunction (node_class Or).
+
+        The quantifiers are pulled one at a time, the existential ones first, from the
+        first operand that starts with one:
+
+            A /\\ (exists x) B /\\ C == (exists z) (A /\\ B /\\ C)
+            A /\\ (forall x) B /\\ C == (forall z) (A /\\ B /\\ C)
+
+        z is x if no other operand contains x, a new variable otherwise. The universal
+        quantifiers of all the operands of a conjunction that start with one are merged
+        into one, and so are the existential ones of a disjunction:
+
+            (forall x) A /\\ (forall y) B /\\ C == (forall z) (A /\\ B /\\ C)
+
+        Every operand is renamed only when one of its variables is, and the conjunction or
+        disjunction is built once, at the end.
+    """
+    # the quantifier that is merged when several operands start with it
+    merged = Forall if node_class is And else Exists
+    operands = list(formulas)
+    # the variables of every operand, and the number of operands that contain a variable
+    contained = [set() for _ in operands]
+    counts = {}
+    # the indexes of the operands that start with a quantifier, heaps by the quantifier
+    heads = {Forall: [], Exists: []}
+    prefix = []
+
+    def set_operand(index, operand, variables):
+        for variable in contained[index]:
+            counts[variable] -= 1
+        operands[index] = operand
+        contained[index] = variables
+        for variable in variables:
+            counts[variable] = counts.get(variable, 0) + 1
+        if isinstance(operand, Quantifier):
+            heappush(heads[operand.__class__], index)
+
+    def pull(index, variable):
+        """Takes the quantifier off the operand at an index, its variable becomes variable."""
+        quantified = operands[index]
+        if variable is quantified.variable:
+            set_operand(index, quantified.formula, contained[index])
+        else:
+            formula = quantified.formula.substitute_variable(quantified.variable, variable)
+            set_operand(index, formula, occurring_variables(formula))
+
+    for index in range(0, len(operands)):
+        set_operand(index, operands[index], occurring_variables(operands[index]))
+
+    while heads[Exists] or heads[Forall]:
+        quantifier = Exists if heads[Exists] else Forall
+        if quantifier is merged and len(heads[quantifier]) >= 2:
+            indexes = heads[quantifier]
+            heads[quantifier] = []
+        else:
+            indexes = [heappop(heads[quantifier])]
+
+        variable = operands[indexes[0]].variable
+        own = sum(1 for index in indexes if variable in contained[index])
+        if counts.get(variable, 0) > own \
+        or any(operands[index].variable is not variable for index in indexes):
+            variable = VariableTerm(get_unique_variable())
+
+        for index in indexes:
+            pull(index, variable)
+        prefix.append((quantifier, variable))
+
+    formula = node_class(*operands)
+    for quantifier, variable in reversed(prefix):
+        formula = quantifier(variable, formula)
+    return formula
+
+def occurring_variables(formula):
+    """Returns the set of the variables a formula contains, see contains_variable."""
+    variables = set()
+    seen = set()
+    stack = [formula]
+    while stack:
+        node = stack.pop()
+        if node not in seen:
+            seen.add(node)
+            if isinstance(node, VariableTerm):
+                variables.add(node)
+            stack.extend(subformulas(node))
+    return variables
+
+def substitute_terms(formula, mapping):
+    """Substitutes the variables of a formula with the terms from a given mapping,
+    see Node.substitute.
+
+        The items are the nodes paired with the id of the mapping that applies to
+        them, a quantifier gives its formula a mapping without its variable, or
+        with the variable renamed.
+    """
+    if not mapping:
+        return formula
+    # id => mapping, the ids of the items
+    mappings = {id(mapping): mapping}
+    # quantifier item => mapping of its formula
+    inner_mappings = {}
+
+    def expand(item):
+        node, mapping_id = item
+        if isinstance(node, Quantifier):
+            inner_mapping = quantified_mapping(node, mappings[mapping_id])
+            if not inner_mapping:
+                return []
+            mappings[id(inner_mapping)] = inner_mapping
+            inner_mappings[item] = inner_mapping
+            return [(node.formula, id(inner_mapping))]
+        return [(child, mapping_id) for child in subformulas(node)]
+
+    def combine(item, values):
+        node, mapping_id = item
+        if isinstance(node, VariableTerm):
+            return mappings[mapping_id].get(node, node)
+        elif isinstance(node, Quantifier):
+            if not values:
+                return node
+            variable = inner_mappings[item].get(node.variable, node.variable)
+            if variable is node.variable and values[0] is node.formula:
+                return node
+            return node.__class__(variable, values[0])
+
+        if all(value is child for value, child in zip(values, subformulas(node))):
+            return node
+        elif isinstance(node, Atom):
+            return Atom(node.predicate_symbol, values)
+        elif isinstance(node, FunctionTerm):
+            return FunctionTerm(node.function_symbol, values)
+        return node.__class__(*values)
+
+    return bottom_up((formula, id(mapping)), expand, combine)
+
+def quantified_mapping(quantifier, mapping):
+    """Returns the mapping for the formula of a quantifier, without its variable,
+    that is renamed if one of the substituted terms contains it."""
+    if quantifier.variable in mapping:
+        mapping = dict(mapping)
+        del mapping[quantifier.variable]
+
+    for term in mapping.values():
+        if term.contains_variable(quantifier.variable):
+            mapping = dict(mapping)
+            mapping[quantifier.variable] = VariableTerm(get_unique_variable())
+            break
+    return mapping
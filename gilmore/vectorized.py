@@ -0,0 +1,133 @@
+"""Module vectorized that contains the numpy multiplication of the encoded
+clauses of a level, for the vectorized backend.
+
+The clauses are packed into two matrices of 64 bit words, one for the
+positive and one for the negative literals: row i holds the bitsets of the
+i-th clause. The clauses of all the instances of a level are packed once,
+into one pair of matrices, and the product of the surviving clauses by an
+instance is built for all of its rows at once, the closed products are
+found with a single (positive & negative).any(axis=1). The clauses are only
+unpacked into bitsets at the end of the level.
+
+numpy is an optional dependency: without it the clauses are multiplied by
+multiply_encoded, one instance after the other."""
+from literals import multiply_encoded
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Number of bits in a word of the packed matrices
+WORD_BITS = 64
+WORD_MASK = (1 << WORD_BITS) - 1
+
+# Maximum number of product rows built at once
+BATCH_SIZE = 1 << 16
+
+def multiply_level(clause_list, instances):
+    """Multiplies a list of encoded clauses by a list of encoded instances,
+    the DNF of their conjunction without the subsumed clauses."""
+    if numpy is None or not instances:
+        for instance in instances:
+            clause_list = multiply_encoded(clause_list, instance)
+            if not clause_list:
+                break
+        return clause_list
+
+    level_clauses = [clause for instance in instances for clause in instance]
+    width = max([1] + [max(positive.bit_length(), negative.bit_length()) \
+    for positive, negative in clause_list + level_clauses])
+    words = (width + WORD_BITS - 1) // WORD_BITS
+
+    positive, negative = pack(clause_list, words)
+    level_positive, level_negative = pack(level_clauses, words)
+
+    start = 0
+    for instance in instances:
+        end = start + len(instance)
+        positive, negative = multiply_packed(positive, negative, \
+        level_positive[start:end], level_negative[start:end])
+        start = end
+        if not len(positive):
+            return []
+
+    return unpack(positive, negative)
+
+def pack(clause_list, words):
+    """Packs a list of encoded clauses into a matrix of positive and a
+    matrix of negative words."""
+    positive = numpy.array([split(clause[0], words) \
+    for clause in clause_list], dtype=numpy.uint64)
+    negative = numpy.array([split(clause[1], words) \
+    for clause in clause_list], dtype=numpy.uint64)
+    shape = (len(clause_list), words)
+    return positive.reshape(shape), negative.reshape(shape)
+
+def split(mask, words):
+    """Splits a bitset into words, the lowest bits first."""
+    return [(mask >> (WORD_BITS * word)) & WORD_MASK \
+    for word in range(0, words)]
+
+def unpack(positive, negative):
+    """Converts the rows of the packed matrices back into encoded clauses."""
+    return [(join(positive_row), join(negative_row)) for positive_row, \
+    negative_row in zip(positive.tolist(), negative.tolist())]
+
+def join(row):
+    """Joins the words of a row into a bitset."""
+    mask = 0
+    for word, value in enumerate(row):
+        mask |= int(value) << (WORD_BITS * word)
+    return mask
+
+def multiply_packed(positive, negative, clause_positive, clause_negative):
+    """Multiplies the packed clauses by the packed clauses of an instance.
+
+    Returns the packed products that are not closed, without duplicates and
+    subsumed products, in the order of the clauses they come from."""
+    rows, words = clause_positive.shape
+    if not rows or not len(positive):
+        return positive[:0], negative[:0]
+
+    step = max(1, BATCH_SIZE // rows)
+    kept_positive = []
+    kept_negative = []
+    for start in range(0, len(positive), step):
+        shape = (len(positive[start:start + step]) * rows, words)
+        product_positive = (positive[start:start + step, None, :] \
+        | clause_positive[None, :, :]).reshape(shape)
+        product_negative = (negative[start:start + step, None, :] \
+        | clause_negative[None, :, :]).reshape(shape)
+
+        open_rows = ~(product_positive & product_negative).any(axis=1)
+        kept_positive.append(product_positive[open_rows])
+        kept_negative.append(product_negative[open_rows])
+
+    positive = numpy.concatenate(kept_positive)
+    negative = numpy.concatenate(kept_negative)
+    if not len(positive):
+        return positive, negative
+    _, first_rows = numpy.unique(numpy.hstack([positive, negative]), axis=0, \
+    return_index=True)
+    first_rows.sort()
+    return remove_subsumed_packed(positive[first_rows], negative[first_rows])
+
+def remove_subsumed_packed(positive, negative):
+    """Removes the packed clauses that another packed clause subsumes, the
+    clauses must be distinct."""
+    rows = len(positive)
+    step = max(1, BATCH_SIZE // rows)
+    kept = numpy.ones(rows, dtype=bool)
+    for start in range(0, rows, step):
+        # subsumed[row, other] is set if the clause other subsumes the
+        # clause start + row
+        subsumed = ((positive[None, :, :] \
+        & ~positive[start:start + step, None, :]) == 0).all(axis=2) \
+        & ((negative[None, :, :] \
+        & ~negative[start:start + step, None, :]) == 0).all(axis=2)
+        chunk = len(subsumed)
+        subsumed[numpy.arange(chunk), numpy.arange(start, start + chunk)] \
+        = False
+        kept[start:start + chunk] = ~subsumed.any(axis=1)
+    return positive[kept], negative[kept]
@@ -0,0 +1,21 @@
+"""Shared set up of the tests, the modules of gilmore/ import each other by
+their flat names, so that directory is put on the path.
+
+    python -m unittest discover -s tests"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), \
+os.pardir, "gilmore"))
+
+from syntax_tree import global_signature
+from checkpoint import COUNTERS, set_counters
+
+class GilmoreTestCase(unittest.TestCase):
+    """A test case that starts every test with an empty global_signature
+    and fresh unique name counters."""
+
+    def setUp(self):
+        global_signature.clear()
+        set_counters([0] * len(COUNTERS))
@@ -0,0 +1,67 @@
+from support import GilmoreTestCase
+from reader import parse_formula
+from gilmore import prove_valid, NOT_FOUND
+from backends import make_backend
+from literals import LiteralTable
+
+# satisfiable with r true on every pair, so every level is checked
+SUCCESSOR = "A{x}.(A{y}.(r(x, y) ==> r(f(x), y))) ==> r(a, a)"
+
+P, Q, R = 1 << 1, 1 << 2, 1 << 3
+
+class MultiplicationTest(GilmoreTestCase):
+
+    def test_surviving_clauses_are_carried(self):
+        backend = make_backend("multiplication", LiteralTable())
+        # p \/ q, then ~p: only the clause q /\ ~p survives
+        self.assertFalse(backend.add([[(P, 0), (Q, 0)]]))
+        self.assertFalse(backend.check())
+        self.assertFalse(backend.add([[(0, P)]]))
+        self.assertEqual(backend.surviving_clauses, [(Q, P)])
+        self.assertEqual(backend.open_clause(), (Q, P))
+        # ~q \/ r, then ~r: no clause survives
+        self.assertFalse(backend.add([[(0, Q), (R, 0)]]))
+        self.assertEqual(backend.surviving_clauses, [(Q | R, P)])
+        self.assertTrue(backend.add([[(0, R)]]))
+        self.assertTrue(backend.check())
+        self.assertEqual(backend.open_clause(), None)
+
+    def test_every_tuple_is_instantiated_once(self):
+        result = prove_valid(parse_formula(SUCCESSOR), max_levels=3)
+        self.assertEqual(result.status, NOT_FOUND)
+        self.assertEqual(result.level, 3)
+        # a, f(a) and f(f(a)), every pair once
+        self.assertEqual(result.universe_size, 3)
+        self.assertEqual(result.instances, 9)
+
+class DpllTest(GilmoreTestCase):
+
+    def test_one_solver_for_every_level(self):
+        backend = make_backend("dpll", LiteralTable())
+        solver = backend.solver
+        # p \/ q and ~p \/ r
+        self.assertFalse(backend.add([[(P | Q, 0)], [(R, P)]]))
+        self.assertFalse(backend.check())
+        variables = dict(backend.variables)
+        clauses = len(solver.clauses)
+        # ~q and ~r on the next level
+        backend.add([[(0, Q)]])
+        self.assertFalse(backend.check())
+        positive, negative = backend.open_clause()
+        self.assertEqual((positive & P, negative & Q), (P, Q))
+        backend.add([[(0, R)]])
+        self.assertTrue(backend.check())
+        self.assertEqual(backend.open_clause(), None)
+        self.assertIs(backend.solver, solver)
+        self.assertTrue(len(solver.clauses) >= clauses)
+        for atom_id, variable in variables.items():
+            self.assertEqual(backend.variables[atom_id], variable)
+
+    def test_same_proofs_as_multiplication(self):
+        for text in [SUCCESSOR, "A{x}.(p(x)) ==> p(a)"]:
+            GilmoreTestCase.setUp(self)
+            formula = parse_formula(text)
+            expected = prove_valid(formula, max_levels=3)
+            result = prove_valid(formula, max_levels=3, backend="dpll")
+            self.assertEqual((result.status, result.level), \
+            (expected.status, expected.level))
@@ -0,0 +1,53 @@
+from support import GilmoreTestCase
+from reader import load_problems
+from batch import prove_batch, ERROR
+from gilmore import UNSAT
+from StringIO import StringIO
+import os
+import shutil
+import tempfile
+
+class BatchTest(GilmoreTestCase):
+
+    def setUp(self):
+        GilmoreTestCase.setUp(self)
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, name, text):
+        path = os.path.join(self.directory, name)
+        with open(path, "w") as problem_file:
+            problem_file.write(text)
+        return path
+
+    def test_a_bad_problem_does_not_stop_the_others(self):
+        path = self.write("mixed.p", "fof(a1, axiom, p(a)).\n" \
+        "fof(c1, conjecture, p(a)).\n" \
+        "fof(a2, axiom, p(a) &).\n" \
+        "fof(c2, conjecture, q(a)).\n" \
+        "fof(c3, conjecture, q(a) | ~q(a)).\n" \
+        "fof(c4, conjecture, q(a) =>\n")
+        problems = list(load_problems(path))
+        self.assertEqual([name for name, _ in problems], \
+        ["c1", "c2", "c3", "c4"])
+        self.assertIsInstance(problems[1][1], Exception)
+        self.assertIsInstance(problems[3][1], Exception)
+
+        output = StringIO()
+        statuses = prove_batch(load_problems(path), output, 1, max_levels=3)
+        self.assertEqual(statuses, {UNSAT: 2, ERROR: 2})
+        rows = [line.split("\t") for line in output.getvalue().splitlines()]
+        self.assertEqual(rows[0][0], "name")
+        self.assertEqual(sorted((row[0], row[1]) for row in rows[1:]), \
+        [("c1", UNSAT), ("c2", ERROR), ("c3", UNSAT), ("c4", ERROR)])
+
+    def test_problems_per_line(self):
+        path = self.write("mixed.txt", "# comment\np(a) ==> p(a)\n" \
+        "p(a) /\\\n\nq(a) \\/ ~q(a)\n")
+        problems = list(load_problems(path))
+        self.assertEqual([name for name, _ in problems], \
+        [path + ":2", path + ":3", path + ":5"])
+        self.assertIsInstance(problems[1][1], Exception)
+        self.assertNotIsInstance(problems[2][1], Exception)
@@ -0,0 +1,47 @@
+from support import GilmoreTestCase
+from reader import parse_formula
+from gilmore import prove_valid, resume_gilmore, UNSAT, NOT_FOUND
+import os
+import shutil
+import tempfile
+
+DRINKER = "E{x}.(d(x) ==> A{y}.(d(y)))"
+
+class CheckpointTest(GilmoreTestCase):
+
+    def setUp(self):
+        GilmoreTestCase.setUp(self)
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "proof.ckpt")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_resume(self):
+        for options in [{"backend": "multiplication"}, {"backend": "dpll"}, \
+        {"relevance": True}]:
+            GilmoreTestCase.setUp(self)
+            result = prove_valid(parse_formula(DRINKER), \
+            checkpoint=self.path, max_levels=1, **options)
+            self.assertEqual(result.status, NOT_FOUND)
+            self.assertEqual(result.level, 1)
+
+            # a fresh process: the old bound stops the proof again
+            GilmoreTestCase.setUp(self)
+            result = resume_gilmore(self.path)
+            self.assertEqual(result.status, NOT_FOUND, options)
+            self.assertEqual(result.level, 1)
+
+            # allow one more level and continue
+            GilmoreTestCase.setUp(self)
+            result = resume_gilmore(self.path, max_levels=2)
+            self.assertEqual(result.status, UNSAT, options)
+            self.assertEqual(result.level, 2)
+            self.assertEqual(result.instances, 2)
+
+    def test_unsupported_options(self):
+        for options in [{"streaming": True}, {"dovetailing": True}, \
+        {"parallel": True}, {"backend": "disk"}]:
+            self.assertRaises(Exception, prove_valid, \
+            parse_formula(DRINKER), checkpoint=self.path, **options)
+            self.assertFalse(os.path.exists(self.path))
@@ -0,0 +1,112 @@
+from support import GilmoreTestCase
+from cnf import cnf
+from syntax_tree import Atom, Not, And, Or, Imp, Iff, TrueConstant, \
+FalseConstant, OperandTypes, VariableTerm, Forall
+from itertools import product
+
+def evaluate(formula, values):
+    """Evaluates a propositional formula, values maps atoms to booleans."""
+    formula_type = formula.get_type()
+    if formula_type is OperandTypes.T_ATOM:
+        return values[formula]
+    elif formula_type is OperandTypes.T_TRUE:
+        return True
+    elif formula_type is OperandTypes.T_FALSE:
+        return False
+    elif formula_type is OperandTypes.T_NOT:
+        return not evaluate(formula.get_formula(), values)
+    elif formula_type is OperandTypes.T_AND:
+        return all(evaluate(operand, values) \
+        for operand in formula.get_formulas())
+    elif formula_type is OperandTypes.T_OR:
+        return any(evaluate(operand, values) \
+        for operand in formula.get_formulas())
+    elif formula_type is OperandTypes.T_IMP:
+        return not evaluate(formula.get_formula1(), values) \
+        or evaluate(formula.get_formula2(), values)
+    return evaluate(formula.get_formula1(), values) \
+    == evaluate(formula.get_formula2(), values)
+
+def satisfies(clauses, values):
+    return all(any(evaluate(literal, values) for literal in clause) \
+    for clause in clauses)
+
+class CnfTest(GilmoreTestCase):
+
+    def setUp(self):
+        GilmoreTestCase.setUp(self)
+        self.p, self.q, self.r = [Atom(name, []) for name in "pqr"]
+
+    def formulas(self):
+        p, q, r = self.p, self.q, self.r
+        return [And(p, Or(q, Not(r))), Imp(Or(p, q), And(q, r)), \
+        Not(Iff(p, And(q, Imp(r, p)))), Or(And(p, q), And(Not(p), r)), \
+        Iff(Iff(p, q), Not(Iff(q, r))), And(Imp(p, q), p, Not(q)), \
+        Or(p, Not(And(q, r)), TrueConstant()), And(p, FalseConstant())]
+
+    def test_equisatisfiable(self):
+        """Every model of a formula extends to a model of its CNF, and
+        every model of the CNF is a model of the formula."""
+        atoms = [self.p, self.q, self.r]
+        for formula in self.formulas():
+            clauses = cnf(formula)
+            definitions = sorted(set(literal.get_formula() \
+            if literal.get_type() is OperandTypes.T_NOT else literal \
+            for clause in clauses for literal in clause) - set(atoms))
+            for values in product([False, True], repeat=len(atoms)):
+                values = dict(zip(atoms, values))
+                extensions = []
+                for extension in product([False, True], \
+                repeat=len(definitions)):
+                    values.update(zip(definitions, extension))
+                    if satisfies(clauses, values):
+                        extensions.append(extension)
+                        self.assertTrue(evaluate(formula, values))
+                self.assertEqual(bool(extensions), evaluate(formula, values))
+
+    def test_clauses_are_linear(self):
+        """Nested equivalences do not blow up the clause list."""
+        formula = self.p
+        for index in range(0, 200):
+            formula = Iff(formula, Atom("a%d" % index, []))
+        self.assertLessEqual(len(cnf(formula)), 4 * 200 + 1)
+
+    def test_shared_subformulas_are_defined_once(self):
+        shared = And(self.q, self.r)
+        clauses = cnf(And(Or(self.p, shared), Or(Not(self.p), shared)))
+        # the two clauses of d ==> q /\ r, p \/ d and ~p \/ d
+        self.assertEqual(len(clauses), 4)
+        atoms = set(literal.get_formula() \
+        if literal.get_type() is OperandTypes.T_NOT else literal \
+        for clause in clauses for literal in clause)
+        self.assertEqual(len(atoms - set([self.p, self.q, self.r])), 1)
+
+    def test_top_level_clauses_are_not_defined(self):
+        p, q, r = self.p, self.q, self.r
+        self.assertEqual(cnf(And(Or(p, Not(q)), Imp(q, r), p)), \
+        [[p, Not(q)], [Not(q), r], [p]])
+
+    def test_constants_are_simplified(self):
+        p, q = self.p, self.q
+        self.assertEqual(cnf(And(Or(p, TrueConstant()), Or(q, \
+        FalseConstant()))), [[q]])
+        self.assertEqual(cnf(FalseConstant()), [[]])
+
+    def test_one_polarity_is_defined(self):
+        """A positive conjunction only needs definition => conjunction."""
+        p, q, r = self.p, self.q, self.r
+        clauses = cnf(Or(p, And(q, r)))
+        self.assertEqual(len(clauses), 3)
+        definition = clauses[-1][1]
+        self.assertEqual(clauses, [[Not(definition), q], \
+        [Not(definition), r], [p, definition]])
+
+    def test_definitions_take_the_variables(self):
+        x, y = VariableTerm("x"), VariableTerm("y")
+        s, t = Atom("s", [x]), Atom("t", [y])
+        clauses = cnf(Or(self.r, And(s, t)))
+        self.assertEqual(clauses[-1][1].operands, (x, y))
+
+    def test_quantifiers_are_rejected(self):
+        self.assertRaises(Exception, cnf, Or(self.p, Forall(VariableTerm("x"), \
+        Atom("s", [VariableTerm("x")]))))
@@ -0,0 +1,57 @@
+from support import GilmoreTestCase
+from serialize import dumps, loads
+from cnf import cnf
+from ground import compile_formula
+from syntax_tree import VariableTerm, ConstantTerm, FunctionTerm, Atom, Not, \
+Or, Imp, Forall
+from StringIO import StringIO
+import syntax_tree
+
+class DepthTest(GilmoreTestCase):
+    """Formulas deeper than the recursion limit."""
+
+    def setUp(self):
+        GilmoreTestCase.setUp(self)
+        x = VariableTerm("x")
+        formula = Atom("p", [x])
+        for index in range(0, 20000):
+            if index % 3 == 0:
+                formula = Not(formula)
+            elif index % 3 == 1:
+                formula = Forall(x, formula)
+            else:
+                formula = Imp(Atom("q", [FunctionTerm("f", [x])]), formula)
+        self.formula = formula
+
+        matrix = Atom("p", [x])
+        for index in range(0, 20000):
+            if index % 2:
+                matrix = Not(Or(matrix, Atom("r", [x])))
+            else:
+                matrix = Imp(Atom("q", [FunctionTerm("f", [x])]), matrix)
+        self.matrix = matrix
+
+    def test_cnf(self):
+        self.assertTrue(cnf(self.matrix))
+
+    def test_instances(self):
+        x = VariableTerm("x")
+        template = compile_formula(self.matrix, [x])
+        a = ConstantTerm("a")
+        self.assertIs(template((a,)), self.matrix.substitute_variable(x, a))
+
+    def test_serialize(self):
+        self.assertIs(loads(dumps(self.formula)), self.formula)
+
+    def test_print(self):
+        output = StringIO()
+        stdout = syntax_tree.stdout
+        syntax_tree.stdout = output
+        try:
+            self.formula.print_me()
+        finally:
+            syntax_tree.stdout = stdout
+        text = output.getvalue()
+        self.assertEqual(text.count("(~"), 6667)
+        self.assertEqual(text.count("A{x}"), 6667)
+        self.assertTrue(text.endswith("p(x)" + ")" * (6667 * 3 + 6666)))
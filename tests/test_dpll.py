@@ -0,0 +1,81 @@
+from support import GilmoreTestCase
+from dpll import Solver
+from itertools import product
+import random
+
+def satisfiable(num_vars, clauses):
+    """Decides a small clause set by trying every assignment."""
+    for values in product([False, True], repeat=num_vars):
+        if all(any(values[abs(literal) - 1] == (literal > 0) \
+        for literal in clause) for clause in clauses):
+            return True
+    return False
+
+class SolverTest(GilmoreTestCase):
+
+    def solver(self, num_vars, clauses):
+        solver = Solver()
+        for _ in range(0, num_vars):
+            solver.new_variable()
+        for clause in clauses:
+            solver.add_clause(clause)
+        return solver
+
+    def assertModel(self, solver, clauses):
+        model = set(solver.model())
+        for clause in clauses:
+            self.assertTrue(any(literal in model for literal in clause), \
+            clause)
+
+    def test_random_clauses(self):
+        generator = random.Random(7)
+        for _ in range(0, 300):
+            num_vars = generator.randint(1, 8)
+            clauses = [[generator.choice([1, -1]) * \
+            generator.randint(1, num_vars) \
+            for _ in range(0, generator.randint(1, 3))] \
+            for _ in range(0, generator.randint(1, 30))]
+            solver = self.solver(num_vars, clauses)
+            expected = satisfiable(num_vars, clauses)
+            self.assertEqual(solver.solve(), expected, clauses)
+            if expected:
+                self.assertModel(solver, clauses)
+
+    def test_pigeonhole(self):
+        # four pigeons in three holes, variable 3 * pigeon + hole + 1
+        def variable(pigeon, hole):
+            return 3 * pigeon + hole + 1
+        clauses = [[variable(pigeon, hole) for hole in range(0, 3)] \
+        for pigeon in range(0, 4)]
+        for hole in range(0, 3):
+            for first in range(0, 4):
+                for second in range(first + 1, 4):
+                    clauses.append([-variable(first, hole), \
+                    -variable(second, hole)])
+        self.assertFalse(self.solver(12, clauses).solve())
+        self.assertTrue(self.solver(12, clauses[1:]).solve())
+
+    def test_incremental(self):
+        clauses = [[1, 2], [-1, 3], [-2, 3]]
+        solver = self.solver(3, clauses)
+        self.assertTrue(solver.solve())
+        self.assertModel(solver, clauses)
+
+        # clauses added after a solve extend the same clause set
+        self.assertTrue(solver.add_clause([-3, 1]))
+        self.assertTrue(solver.solve())
+        self.assertModel(solver, clauses + [[-3, 1]])
+        self.assertTrue(solver.add_clause([-2]))
+        self.assertTrue(solver.solve())
+        self.assertEqual(sorted(solver.model()), [-2, 1, 3])
+
+        # 1 is forced on level 0, so the clause is refuted by propagation
+        self.assertFalse(solver.add_clause([-1]))
+        self.assertFalse(solver.solve())
+
+    def test_trivial_clauses(self):
+        solver = self.solver(2, [[1, -1], [2]])
+        self.assertTrue(solver.solve())
+        self.assertIn(2, solver.model())
+        self.assertFalse(solver.add_clause([]))
+        self.assertFalse(solver.solve())
@@ -0,0 +1,72 @@
+from support import GilmoreTestCase
+from ground import compile_formula, compile_clauses
+from dnf import dnf
+from cnf import cnf
+from syntax_tree import VariableTerm, ConstantTerm, FunctionTerm, Atom, \
+Not, And, Or, Imp, Iff, Forall, occurring_variables
+from itertools import product
+
+class MatrixTestCase(GilmoreTestCase):
+    """Starts every test with a matrix over x and y and ground terms."""
+
+    def setUp(self):
+        GilmoreTestCase.setUp(self)
+        self.x, self.y = VariableTerm("x"), VariableTerm("y")
+        a, b = ConstantTerm("a"), ConstantTerm("b")
+        self.terms = [a, b, FunctionTerm("f", [a])]
+        x, y = self.x, self.y
+        self.matrix = Iff(Imp(Atom("p", [x, FunctionTerm("g", [y])]), \
+        Not(Atom("q", [a]))), Or(And(Atom("q", [y]), Atom("p", [b, x])), \
+        Atom("r", [FunctionTerm("g", [FunctionTerm("g", [x])])])))
+
+class GroundTest(MatrixTestCase):
+
+    def test_instances_are_substitutions(self):
+        template = compile_formula(self.matrix, [self.x, self.y])
+        for terms in product(self.terms, repeat=2):
+            self.assertIs(template(terms), self.matrix.substitute( \
+            {self.x: terms[0], self.y: terms[1]}))
+
+    def test_ground_formulas_are_their_instances(self):
+        ground = Atom("q", [ConstantTerm("a")])
+        self.assertIs(compile_formula(ground, [self.x])((self.terms[2],)), \
+        ground)
+        # a variable without a slot stays in the instance
+        template = compile_formula(Atom("q", [self.y]), [self.x])
+        self.assertIs(template((self.terms[0],)), Atom("q", [self.y]))
+
+    def test_quantifiers_are_rejected(self):
+        self.assertRaises(Exception, compile_formula, \
+        Forall(self.x, Atom("q", [self.x])), [self.x])
+
+class ClausesTest(MatrixTestCase):
+
+    def setUp(self):
+        MatrixTestCase.setUp(self)
+        self.matrix = self.matrix.nnf()
+
+    def test_normal_form_is_computed_once(self):
+        calls = []
+
+        def counted_dnf(formula):
+            calls.append(formula)
+            return dnf(formula)
+
+        instance_clauses = compile_clauses(self.matrix, [self.x, self.y], \
+        counted_dnf)
+        clauses = dnf(self.matrix)
+        for terms in product(self.terms, repeat=2):
+            mapping = {self.x: terms[0], self.y: terms[1]}
+            self.assertEqual(instance_clauses(terms), \
+            [[literal.substitute(mapping) for literal in clause] \
+            for clause in clauses])
+        self.assertEqual(calls, [self.matrix])
+
+    def test_cnf_clauses_are_ground(self):
+        instance_clauses = compile_clauses(self.matrix, [self.x, self.y], cnf)
+        for terms in product(self.terms, repeat=2):
+            clauses = instance_clauses(terms)
+            self.assertTrue(clauses)
+            for clause in clauses:
+                for literal in clause:
+                    self.assertEqual(occurring_variables(literal), set())
@@ -0,0 +1,101 @@
+from support import GilmoreTestCase
+from reader import parse_formula
+from gilmore import prove_valid, UNSAT, NOT_FOUND
+from herbrand import HerbrandUniverse, new_tuples, weighted_tuples
+from itertools import product
+
+def parse_term(text):
+    """Returns the term of a given text."""
+    return parse_formula("q(%s)" % text).operands[0]
+
+CHAIN = "p(a) /\\ A{x}.(p(x) ==> p(f(x))) ==> p(f(f(f(a))))"
+
+# a unary and a binary function symbol over two constants
+SIGNATURE = "p(f(a), g(b, b))"
+
+# the terms of SIGNATURE of size at most 3
+SMALL_TERMS = ["a", "b", "f(a)", "f(b)", "f(f(a))", "f(f(b))", "g(a, a)", \
+"g(a, b)", "g(b, a)", "g(b, b)"]
+
+class HerbrandTest(GilmoreTestCase):
+
+    def test_new_tuples_are_generated_once(self):
+        old, new = ["a", "b"], ["c", "d"]
+        tuples = list(new_tuples(old, new, 3))
+        self.assertEqual(len(tuples), len(set(tuples)))
+        self.assertEqual(set(tuples), set(product(old + new, repeat=3)) \
+        - set(product(old, repeat=3)))
+
+    def test_weighted_tuples(self):
+        universe = HerbrandUniverse(parse_formula("p(f(a), g(b, b))"))
+        tuples = list(weighted_tuples(universe, 2, 3))
+        for terms in tuples:
+            self.assertEqual(sum(universe.terms[term][1] for term in terms), 3)
+        # f(a), f(b) in either position next to a or b
+        self.assertEqual(len(tuples), 8)
+
+    def test_dovetailing_reports_the_universe_it_used(self):
+        result = prove_valid(parse_formula(CHAIN), dovetailing=True)
+        self.assertEqual(result.status, UNSAT)
+        # a, f(a) and f(f(a))
+        self.assertEqual(result.universe_size, 3)
+        self.assertEqual(result.instances, 3)
+
+    def grow(self, universe, max_level_terms=None):
+        """Grows the universe until a level brings no new terms, returns
+        its terms."""
+        while True:
+            size = len(universe.get_current_level())
+            level = universe.next_level()
+            new_terms = len(level) - size
+            if max_level_terms is not None:
+                self.assertTrue(new_terms <= max_level_terms)
+            if not new_terms:
+                return set(level)
+
+    def test_max_term_size(self):
+        universe = HerbrandUniverse(parse_formula(SIGNATURE), max_size=3)
+        self.assertEqual(self.grow(universe), \
+        set(parse_term(text) for text in SMALL_TERMS))
+
+    def test_max_level_terms(self):
+        # f alone fills the first levels, the applications of g that do not
+        # fit are made at the following ones
+        for max_level_terms in [1, 2, 3]:
+            GilmoreTestCase.setUp(self)
+            universe = HerbrandUniverse(parse_formula(SIGNATURE), \
+            max_size=3, max_level_terms=max_level_terms)
+            self.assertEqual(self.grow(universe, max_level_terms), \
+            set(parse_term(text) for text in SMALL_TERMS))
+
+    def test_every_function_symbol_is_applied(self):
+        universe = HerbrandUniverse(parse_formula("p(f(a)) /\\ q(g(a, a))"))
+        level = universe.next_level()
+        self.assertEqual(set(level), set(parse_term(text) \
+        for text in ["a", "f(a)", "g(a, a)"]))
+
+        # the applications that repeat a new term are made too
+        GilmoreTestCase.setUp(self)
+        universe = HerbrandUniverse(parse_formula(SIGNATURE))
+        level = universe.next_level()
+        self.assertEqual(set(level), set(parse_term(text) \
+        for text in ["a", "b", "f(a)", "f(b)", "g(a, a)", "g(a, b)", \
+        "g(b, a)", "g(b, b)"]))
+
+    def test_dovetailing_respects_max_term_size(self):
+        result = prove_valid(parse_formula(CHAIN), dovetailing=True, \
+        max_term_size=2)
+        self.assertEqual(result.status, NOT_FOUND)
+        # a and f(a), no weight needs a bigger term
+        self.assertEqual(result.universe_size, 2)
+        self.assertEqual(result.level, 2)
+
+        GilmoreTestCase.setUp(self)
+        universe = HerbrandUniverse(parse_formula(SIGNATURE), max_size=3)
+        self.assertEqual(set(universe.get_terms_of_size(3)), \
+        set(parse_term(text) for text in SMALL_TERMS[4:]))
+        self.assertEqual(universe.get_terms_of_size(4), [])
+
+    def test_dovetailing_has_no_levels_to_bound(self):
+        self.assertRaises(Exception, prove_valid, parse_formula(CHAIN), \
+        dovetailing=True, max_level_terms=2)
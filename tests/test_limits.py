@@ -0,0 +1,38 @@
+from support import GilmoreTestCase
+from reader import parse_formula
+from batch import prove_batch
+from gilmore import prove_valid, UNSAT, INSTANCE_LIMIT
+from StringIO import StringIO
+
+# refuted at the second level with two instances by every method
+DRINKER = "E{x}.(d(x) ==> A{y}.(d(y)))"
+
+METHODS = [{}, {"backend": "dpll"}, {"backend": "disk"}, \
+{"streaming": True}, {"dovetailing": True}, {"relevance": True}, \
+{"parallel": True, "processes": 2}]
+
+class InstanceLimitTest(GilmoreTestCase):
+
+    def prove(self, max_instances, options):
+        GilmoreTestCase.setUp(self)
+        return prove_valid(parse_formula(DRINKER), \
+        max_instances=max_instances, **options)
+
+    def test_limit(self):
+        for options in METHODS:
+            result = self.prove(1, options)
+            self.assertEqual(result.status, INSTANCE_LIMIT, options)
+            self.assertEqual(result.level, 2, options)
+            self.assertEqual(result.instances, 2, options)
+
+            result = self.prove(2, options)
+            self.assertEqual(result.status, UNSAT, options)
+            self.assertEqual(result.instances, 2, options)
+
+    def test_batch(self):
+        problems = [("drinker", parse_formula(DRINKER))]
+        output = StringIO()
+        self.assertEqual(prove_batch(iter(problems), output, 1, \
+        max_instances=1), {INSTANCE_LIMIT: 1})
+        self.assertEqual(output.getvalue().splitlines()[1].split("\t")[1], \
+        INSTANCE_LIMIT)
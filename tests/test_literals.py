@@ -0,0 +1,81 @@
+from support import GilmoreTestCase
+from literals import LiteralTable, EMPTY_CLAUSE, multiply_encoded, \
+remove_subsumed_encoded, bits, is_contradictory
+from syntax_tree import Atom, ConstantTerm, Not, And
+
+class LiteralsTest(GilmoreTestCase):
+
+    def setUp(self):
+        GilmoreTestCase.setUp(self)
+        self.table = LiteralTable()
+        a = ConstantTerm("a")
+        self.p, self.q, self.r = [Atom(name, [a]) for name in "pqr"]
+
+    def encode(self, *clauses):
+        return [self.table.encode_clause(clause) for clause in clauses]
+
+    def test_round_trip(self):
+        clause = [self.p, Not(self.q)]
+        encoded = self.table.encode_clause(clause)
+        self.assertEqual(sorted(self.table.decode_clause(encoded)), \
+        sorted(clause))
+
+    def test_multiply_drops_contradictions(self):
+        p, q = self.p, self.q
+        product = multiply_encoded(self.encode([p], [q]), \
+        self.encode([Not(p)], [Not(q)]))
+        self.assertEqual(product, self.encode([p, Not(q)], [q, Not(p)]))
+        self.assertEqual(multiply_encoded(self.encode([p]), \
+        self.encode([Not(p)])), [])
+
+    def test_multiply_merges_duplicates(self):
+        p, q = self.p, self.q
+        product = multiply_encoded(self.encode([p], [q]), self.encode([p, q]))
+        self.assertEqual(product, self.encode([p, q]))
+
+    def test_subsumed_clauses_are_removed(self):
+        p, q, r = self.p, self.q, self.r
+        clauses = self.encode([p, q, r], [q], [Not(p), q], [p, Not(r)], \
+        [p, Not(r), q])
+        self.assertEqual(remove_subsumed_encoded(clauses), \
+        self.encode([q], [p, Not(r)]))
+
+    def test_the_empty_clause_subsumes_everything(self):
+        clauses = self.encode([self.p], [Not(self.q)]) + [EMPTY_CLAUSE]
+        self.assertEqual(remove_subsumed_encoded(clauses), [EMPTY_CLAUSE])
+
+class EncodingTest(GilmoreTestCase):
+
+    def setUp(self):
+        GilmoreTestCase.setUp(self)
+        self.table = LiteralTable()
+        a = ConstantTerm("a")
+        self.p, self.q = [Atom(name, [a]) for name in "pq"]
+
+    def test_atoms_get_signed_ids(self):
+        table, p, q = self.table, self.p, self.q
+        self.assertEqual(table.encode(p), 1)
+        self.assertEqual(table.encode(Not(q)), -2)
+        self.assertEqual(table.encode(Not(p)), -1)
+        self.assertEqual(table.encode(Atom("p", [ConstantTerm("a")])), 1)
+        self.assertIs(table.decode(-2), Not(q))
+        self.assertIs(table.decode(1), p)
+
+    def test_only_literals_are_encoded(self):
+        self.assertRaises(Exception, self.table.encode, And(self.p, self.q))
+
+    def test_clause_bitsets(self):
+        p, q = self.p, self.q
+        self.assertEqual(self.table.encode_clause([]), EMPTY_CLAUSE)
+        self.assertEqual(self.table.encode_clause([p, Not(q), p]), \
+        (1 << 1, 1 << 2))
+
+    def test_bits(self):
+        self.assertEqual(list(bits(0)), [])
+        self.assertEqual(list(bits(0b101100)), [0b100, 0b1000, 0b100000])
+
+    def test_contradictions(self):
+        p, q = self.p, self.q
+        self.assertTrue(is_contradictory(self.table.encode_clause([p, Not(p)])))
+        self.assertFalse(is_contradictory(self.table.encode_clause([p, \
+        Not(q)])))
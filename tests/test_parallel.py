@@ -0,0 +1,44 @@
+from support import GilmoreTestCase
+from reader import parse_formula
+from gilmore import prove_valid, UNSAT, NOT_FOUND
+from herbrand import HerbrandUniverse
+from parallel import init_worker, check_shard, worker
+from serialize import loads_clauses
+from syntax_tree import VariableTerm, Atom, Not, And
+
+DRINKER = "E{x}.(d(x) ==> A{y}.(d(y)))"
+
+class ParallelTest(GilmoreTestCase):
+
+    def test_stops_when_the_universe_stops_growing(self):
+        for text, status, level in [(DRINKER, UNSAT, 2), \
+        ("p(a) /\\ q(b)", NOT_FOUND, 1)]:
+            GilmoreTestCase.setUp(self)
+            result = prove_valid(parse_formula(text), parallel=True, \
+            processes=2)
+            self.assertEqual((result.status, result.level), (status, level))
+
+    def test_unsupported_options(self):
+        for options in [{"relevance": True}, {"backend": "dpll"}, \
+        {"backend": "disk"}]:
+            self.assertRaises(Exception, prove_valid, \
+            parse_formula(DRINKER), parallel=True, **options)
+
+    def test_workers_grow_their_own_universe(self):
+        x, y = VariableTerm("x"), VariableTerm("y")
+        matrix = And(Atom("d", [x]), Not(Atom("d", [y])))
+        universe = HerbrandUniverse(parse_formula("p(f(a))"))
+        init_worker(matrix, [x, y], universe)
+        try:
+            # level 1 is a and f(a), a task only names the level and the
+            # range of the tuples, (a, f(a)) here
+            clauses = loads_clauses(check_shard((1, 2, 1, 2)))
+            self.assertEqual(universe.level_index, 1)
+            self.assertEqual(len(clauses), 1)
+            self.assertEqual(len(clauses[0]), 2)
+            # the instance of (a, a) is contradictory
+            self.assertEqual(check_shard((1, 2, 0, 2)), None)
+            # a level that is not the one of the proof is refused
+            self.assertRaises(Exception, check_shard, (1, 3, 0, 1))
+        finally:
+            worker.clear()
@@ -0,0 +1,60 @@
+from support import GilmoreTestCase
+from reader import parse_formula, parse_tptp, tptp_problem
+from syntax_tree import Atom, ConstantTerm, VariableTerm, And, Or, Imp, Not, \
+Forall, Exists, prenex_form
+
+class ReaderTest(GilmoreTestCase):
+
+    def atoms(self, *names):
+        return [Atom(name, [ConstantTerm("a")]) for name in names]
+
+    def test_precedence(self):
+        p, q, r = self.atoms("p", "q", "r")
+        self.assertIs(parse_formula("p(a) \\/ q(a) /\\ r(a)"), \
+        Or(p, And(q, r)))
+        self.assertIs(parse_formula("p(a) ==> q(a) ==> r(a)"), \
+        Imp(p, Imp(q, r)))
+        self.assertIs(parse_formula("~p(a) /\\ q(a)"), And(Not(p), q))
+
+    def test_a_run_of_conjunctions_is_one_node(self):
+        text = " /\\ ".join("p%d(a)" % index for index in range(3000))
+        formula = parse_formula(text)
+        self.assertIsInstance(formula, And)
+        self.assertEqual(len(formula.get_formulas()), 3000)
+
+    def test_quantified_variables(self):
+        x = VariableTerm("x")
+        self.assertIs(parse_formula("A{x}.(p(x))"), Forall(x, Atom("p", [x])))
+
+    def test_errors(self):
+        for text in ["p(a) /\\", "p(a) q(a)", "(p(a)"]:
+            self.assertRaises(Exception, parse_formula, text)
+
+    def test_tptp_problem(self):
+        annotated = parse_tptp("fof(a1, axiom, p(a)).\n" \
+        "fof(c, conjecture, ? [X] : p(X)).")
+        self.assertEqual([name for name, _, _ in annotated], ["a1", "c"])
+        formula = tptp_problem(annotated)
+        self.assertIsInstance(formula, Imp)
+
+    def test_tptp_integer_names(self):
+        annotated = parse_tptp("fof(1, axiom, p(a)).\n" \
+        "fof(02, conjecture, p(a)).")
+        self.assertEqual([name for name, _, _ in annotated], ["1", "02"])
+        # an integer is only the name of a statement, not a term
+        self.assertRaises(Exception, parse_tptp, "fof(c, conjecture, p(1)).")
+
+class PrenexTest(GilmoreTestCase):
+
+    def test_operands_are_pulled_in_one_node(self):
+        x = VariableTerm("x")
+        formula = And(*([Forall(x, Atom("p%d" % index, [x])) \
+        for index in range(3)] + [Exists(x, Atom("q", [x]))]))
+        prenex = prenex_form(formula)
+        # the existential quantifier comes first, the universal ones merge
+        self.assertIsInstance(prenex, Exists)
+        self.assertIsInstance(prenex.formula, Forall)
+        matrix = prenex.formula.formula
+        self.assertIsInstance(matrix, And)
+        self.assertEqual(len(matrix.get_formulas()), 4)
+        self.assertIsNot(prenex.variable, prenex.formula.variable)
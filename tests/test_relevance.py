@@ -0,0 +1,48 @@
+from support import GilmoreTestCase
+from reader import parse_formula
+from gilmore import prove_valid, UNSAT
+from literals import LiteralTable
+from relevance import RelevanceFilter
+from syntax_tree import VariableTerm, ConstantTerm, FunctionTerm, Atom, \
+Not, And, Or
+
+class RelevanceTest(GilmoreTestCase):
+
+    def test_tuples_are_held_back_until_they_clash(self):
+        x, a, b = VariableTerm("x"), ConstantTerm("a"), ConstantTerm("b")
+        fx = FunctionTerm("f", [x])
+        matrix = Or(And(Atom("p", [x]), Atom("q", [x])), \
+        And(Not(Atom("p", [fx])), Atom("r", [x])))
+        literal_table = LiteralTable()
+        relevance_filter = RelevanceFilter(matrix, [x], literal_table)
+        # p(a) and ~p(f(a)) clash with nothing yet
+        self.assertEqual(relevance_filter.add((a,)), [])
+        # p(f(a)) clashes with ~p(f(a)), a is released with it
+        fa = FunctionTerm("f", [a])
+        self.assertEqual(relevance_filter.add((fa,)), [(fa,), (a,)])
+        self.assertEqual(relevance_filter.add((b,)), [])
+        # only the clashing literals were instantiated
+        self.assertEqual([atom.predicate_symbol \
+        for atom in literal_table.atoms[1:]], ["p"] * 5)
+
+    def test_constant_matrices_are_not_filtered(self):
+        relevance_filter = RelevanceFilter(parse_formula("FALSE"), [], \
+        LiteralTable())
+        self.assertEqual(relevance_filter.add(()), [()])
+
+    def test_fewer_instances_are_made(self):
+        text = "A{x}.(E{y}.(p(x, y))) /\\ " \
+        "A{x}.(A{y}.(p(x, y) ==> q(x, y))) ==> A{x}.(E{y}.(q(x, y)))"
+        plain = prove_valid(parse_formula(text))
+        self.setUp()
+        relevant = prove_valid(parse_formula(text), relevance=True)
+        self.assertEqual((plain.status, relevant.status), (UNSAT, UNSAT))
+        self.assertLess(relevant.instances, plain.instances)
+
+    def test_tautologies_are_proven(self):
+        for text in ["p(a) \\/ ~p(a)", "A{y}.(TRUE)"]:
+            for backend in ["multiplication", "dpll"]:
+                self.setUp()
+                result = prove_valid(parse_formula(text), backend=backend, \
+                relevance=True)
+                self.assertEqual(result.status, UNSAT, (text, backend))
@@ -0,0 +1,46 @@
+from support import GilmoreTestCase
+from reader import parse_formula
+from gilmore import prove_valid, UNSAT, NOT_FOUND, INSTANCE_LIMIT, QUIET, \
+PROGRESS
+from syntax_tree import OperandTypes
+from StringIO import StringIO
+import sys
+
+DRINKER = "E{x}.(d(x) ==> A{y}.(d(y)))"
+SUCCESSOR = "A{x}.(A{y}.(r(x, y) ==> r(f(x), y))) ==> r(a, a)"
+
+class ResultTest(GilmoreTestCase):
+
+    def prove(self, text, **options):
+        """Returns the result of a proof and what it printed."""
+        output = StringIO()
+        sys.stdout = output
+        try:
+            result = prove_valid(parse_formula(text), **options)
+        finally:
+            sys.stdout = sys.__stdout__
+        return result, output.getvalue()
+
+    def test_proof(self):
+        result, output = self.prove(DRINKER)
+        self.assertEqual((result.status, result.level, result.instances), \
+        (UNSAT, 2, 2))
+        self.assertEqual(result.clause, None)
+        self.assertEqual(output, "")
+
+    def test_surviving_clause(self):
+        result, output = self.prove(SUCCESSOR, max_levels=2)
+        self.assertEqual((result.status, result.level, result.universe_size, \
+        result.instances), (NOT_FOUND, 2, 2, 4))
+        self.assertTrue(result.clause)
+        self.assertTrue(all(literal.get_type() in [OperandTypes.T_ATOM, \
+        OperandTypes.T_NOT] for literal in result.clause))
+        self.assertEqual(output, "")
+
+    def test_instance_limit(self):
+        result, _ = self.prove(SUCCESSOR, max_instances=3, verbosity=QUIET)
+        self.assertEqual(result.status, INSTANCE_LIMIT)
+
+    def test_progress_is_printed(self):
+        _, output = self.prove(DRINKER, verbosity=PROGRESS)
+        self.assertNotEqual(output, "")
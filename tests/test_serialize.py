@@ -0,0 +1,50 @@
+from support import GilmoreTestCase
+from serialize import Encoder, Decoder, dumps, loads, dumps_clauses, \
+loads_clauses
+from reader import parse_formula
+from syntax_tree import Not, And, Atom, ConstantTerm, FunctionTerm
+
+class SerializeTest(GilmoreTestCase):
+
+    def test_round_trip(self):
+        for text in ["A{x}.(E{y}.(p(x, f(y)) ==> ~q(g(x, a))))", \
+        "(s(a) <==> q(b)) \\/ TRUE /\\ r(c)", "t(f(f(f(a))))"]:
+            formula = parse_formula(text)
+            self.assertIs(loads(dumps(formula)), formula)
+
+    def test_items_are_decoded_on_demand(self):
+        shared = parse_formula("p(f(a)) /\\ q(b)")
+        encoder = Encoder()
+        encoder.add_formula(shared)
+        clause_list = [[shared, Not(shared)], [parse_formula("q(b)")]]
+        encoder.add_clause_list(clause_list)
+        decoder = Decoder(encoder.to_bytes())
+        self.assertEqual(len(decoder), 2)
+        # the clause list refers to the codes of the first formula
+        self.assertEqual(decoder.clause_list(1), clause_list)
+        self.assertIs(decoder.formula(0), shared)
+        self.assertRaises(Exception, decoder.formula, 1)
+        self.assertEqual(loads_clauses(dumps_clauses(clause_list)), \
+        clause_list)
+
+    def test_shared_subtrees_are_written_once(self):
+        # a formula of 2 ** 20 nodes with 20 distinct subformulas
+        formula = Atom("p", [ConstantTerm("a")])
+        for _ in range(0, 20):
+            formula = And(formula, formula)
+        data = dumps(formula)
+        self.assertLess(len(data), 1024)
+        self.assertIs(loads(data), formula)
+
+    def test_symbols_are_written_once(self):
+        term = ConstantTerm("a_long_constant_name")
+        for _ in range(0, 10):
+            term = FunctionTerm("a_long_function_name", [term])
+        data = dumps(Atom("p", [term]))
+        self.assertEqual(data.count("a_long_function_name"), 1)
+        self.assertEqual(data.count("a_long_constant_name"), 1)
+
+    def test_bad_blobs_are_rejected(self):
+        data = dumps(parse_formula("p(a)"))
+        self.assertRaises(Exception, loads, "XXXX" + data[4:])
+        self.assertRaises(Exception, loads_clauses, data)
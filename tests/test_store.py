@@ -0,0 +1,89 @@
+from support import GilmoreTestCase
+from backends import make_backend
+from literals import LiteralTable, EMPTY_CLAUSE, remove_subsumed_encoded
+import store
+from store import ClauseStore
+from tempfile import mkdtemp
+import os
+import random
+
+def random_clause(generator, atoms):
+    positive = 0
+    negative = 0
+    for _ in range(0, generator.randint(0, 3)):
+        bit = 1 << generator.randrange(1, atoms)
+        if generator.random() < 0.5:
+            positive |= bit
+        else:
+            negative |= bit
+    return (positive, negative)
+
+class ClauseStoreTest(GilmoreTestCase):
+
+    def setUp(self):
+        GilmoreTestCase.setUp(self)
+        self.directory = mkdtemp()
+
+    def tearDown(self):
+        os.rmdir(self.directory)
+
+    def test_clauses_are_read_back_in_order(self):
+        generator = random.Random(5)
+        clauses = [random_clause(generator, 100) for _ in range(0, 1000)]
+        clause_store = ClauseStore(self.directory)
+        self.assertEqual(list(clause_store), [])
+        for clause in clauses:
+            clause_store.append(clause)
+        self.assertEqual(len(clause_store), len(clauses))
+        self.assertEqual(list(clause_store), clauses)
+        clause_store.append(EMPTY_CLAUSE)
+        self.assertEqual(list(clause_store), clauses + [EMPTY_CLAUSE])
+        clause_store.close()
+
+    def test_clauses_across_windows(self):
+        """Clauses that straddle two windows of the map are not lost."""
+        sizes = store.WINDOW_SIZE, store.BUFFER_SIZE
+        store.WINDOW_SIZE, store.BUFFER_SIZE = 12, 5
+        try:
+            generator = random.Random(7)
+            clauses = [random_clause(generator, 20) for _ in range(0, 100)]
+            clause_store = ClauseStore(self.directory)
+            for clause in clauses:
+                clause_store.append(clause)
+            self.assertEqual(list(clause_store), clauses)
+            clause_store.close()
+        finally:
+            store.WINDOW_SIZE, store.BUFFER_SIZE = sizes
+
+    def test_close_removes_the_file(self):
+        clause_store = ClauseStore(self.directory)
+        clause_store.append((1 << 2, 1 << 3))
+        self.assertEqual(os.listdir(self.directory), \
+        [os.path.basename(clause_store.path)])
+        clause_store.close()
+        self.assertEqual(os.listdir(self.directory), [])
+
+class DiskBackendTest(GilmoreTestCase):
+
+    def test_same_clauses_as_multiplication(self):
+        generator = random.Random(11)
+        directory = mkdtemp()
+        for _ in range(0, 50):
+            backends = [make_backend(name, LiteralTable(), directory) \
+            for name in ["multiplication", "disk"]]
+            # more instances than one pass over the store multiplies
+            for _ in range(0, generator.randint(1, 3)):
+                instances = [[random_clause(generator, 12) \
+                for _ in range(0, generator.randint(1, 3))] \
+                for _ in range(0, generator.randint(0, 20))]
+                for backend in backends:
+                    backend.add(instances)
+                results = [backend.check() for backend in backends]
+                self.assertEqual(results[0], results[1])
+            # the store keeps the duplicate and subsumed products
+            self.assertEqual(sorted(remove_subsumed_encoded( \
+            list(backends[1].store))), sorted(backends[0].surviving_clauses))
+            for backend in backends:
+                backend.close()
+        self.assertEqual(os.listdir(directory), [])
+        os.rmdir(directory)
@@ -0,0 +1,70 @@
+from support import GilmoreTestCase
+from syntax_tree import ConstantTerm
+from literals import LiteralTable, find_open_clause
+from reader import parse_formula
+from gilmore import prove_valid, streaming_method, UNSAT, NOT_FOUND
+
+class Universe(object):
+    """A universe of fixed terms that never grows."""
+
+    def __init__(self, terms):
+        self.terms = terms
+
+    def get_current_level(self):
+        return self.terms
+
+    def next_level(self):
+        return self.terms
+
+class StreamingTest(GilmoreTestCase):
+
+    def test_every_tuple_is_counted_once(self):
+        # ten instances of two clauses and a contradictory last one, the
+        # search backtracks over all the 2^10 clauses of the product
+        terms = [ConstantTerm("c%d" % index) for index in range(0, 11)]
+
+        def encode_instance(substitution):
+            index = terms.index(substitution[0])
+            if index == 10:
+                return []
+            return [(1 << (2 * index + 1), 0), (1 << (2 * index + 2), 0)]
+
+        progress = {"level": 0, "instances": 0}
+
+        def count_instances(number):
+            progress["instances"] += number
+
+        status, clause = streaming_method(Universe(terms), 1, \
+        encode_instance, count_instances, LiteralTable(), progress, 1)
+        self.assertEqual(status, UNSAT)
+        self.assertEqual(progress["instances"], 11)
+
+    def test_every_instance_is_built_once(self):
+        calls = []
+
+        def instance_at(index):
+            calls.append(index)
+            if index == 10:
+                return []
+            return [(1 << (2 * index + 1), 0), (1 << (2 * index + 2), 0)]
+
+        self.assertEqual(find_open_clause(11, instance_at), None)
+        self.assertEqual(calls, range(0, 11))
+
+    def test_open_clause(self):
+        instances = [[(2, 0), (4, 0)], [(0, 2), (0, 8)]]
+        self.assertEqual(find_open_clause(2, instances.__getitem__), (2, 8))
+
+    def test_stops_when_the_universe_stops_growing(self):
+        result = prove_valid(parse_formula("p(a) ==> q(a)"), streaming=True)
+        self.assertEqual(result.status, NOT_FOUND)
+        self.assertEqual(result.level, 1)
+        self.assertEqual(result.instances, 1)
+
+    def test_earlier_levels_are_counted_once(self):
+        # the second level searches the tuple of the first one again
+        result = prove_valid(parse_formula(\
+        "E{x}.(d(x) ==> A{y}.(d(y)))"), streaming=True)
+        self.assertEqual(result.status, UNSAT)
+        self.assertEqual(result.level, 2)
+        self.assertEqual(result.instances, 2)
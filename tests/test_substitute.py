@@ -0,0 +1,42 @@
+from support import GilmoreTestCase
+from syntax_tree import VariableTerm, ConstantTerm, FunctionTerm, Atom, \
+Not, And, Forall, Exists
+
+class SubstituteTest(GilmoreTestCase):
+
+    def setUp(self):
+        GilmoreTestCase.setUp(self)
+        self.x, self.y = VariableTerm("x"), VariableTerm("y")
+        self.a = ConstantTerm("a")
+
+    def test_simultaneous(self):
+        x, y = self.x, self.y
+        formula = And(Atom("p", [x, y]), Not(Atom("q", [FunctionTerm("f", \
+        [y, x])])))
+        self.assertIs(formula.substitute({x: y, y: x}), \
+        And(Atom("p", [y, x]), Not(Atom("q", [FunctionTerm("f", [x, y])]))))
+
+    def test_bound_variables_are_not_substituted(self):
+        x, a = self.x, self.a
+        formula = And(Atom("p", [x]), Forall(x, Atom("q", [x])))
+        self.assertIs(formula.substitute({x: a}), \
+        And(Atom("p", [a]), Forall(x, Atom("q", [x]))))
+
+    def test_capture_is_avoided(self):
+        x, y = self.x, self.y
+        fy = FunctionTerm("f", [y])
+        for quantifier in [Forall, Exists]:
+            formula = quantifier(y, Atom("p", [x, y]))
+            result = formula.substitute({x: fy})
+            self.assertIs(result.__class__, quantifier)
+            self.assertIsNot(result.variable, y)
+            self.assertIsNot(result.variable, x)
+            # the bound variable is renamed, the free y of f(y) stays free
+            self.assertIs(result.formula, Atom("p", [fy, result.variable]))
+
+    def test_untouched_subtrees_are_shared(self):
+        x, y, a = self.x, self.y, self.a
+        untouched = Atom("q", [y])
+        formula = And(Atom("p", [x]), untouched)
+        self.assertIs(formula.substitute({x: a}).formulas[1], untouched)
+        self.assertIs(formula.substitute({VariableTerm("z"): a}), formula)
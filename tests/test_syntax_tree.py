@@ -0,0 +1,37 @@
+from support import GilmoreTestCase
+from syntax_tree import VariableTerm, ConstantTerm, FunctionTerm, Atom, \
+Not, Forall, node_table
+import copy
+import gc
+import pickle
+
+class HashConsingTest(GilmoreTestCase):
+
+    def test_equal_nodes_are_identical(self):
+        x = VariableTerm("x")
+        first = Forall(x, Not(Atom("p", [x, FunctionTerm("f", [x])])))
+        second = Forall(VariableTerm("x"), Not(Atom("p", \
+        [VariableTerm("x"), FunctionTerm("f", [VariableTerm("x")])])))
+        self.assertIs(first, second)
+        self.assertEqual(hash(first), hash(second))
+        self.assertIsNot(Atom("q", [x]), Atom("q", [ConstantTerm("x")]))
+
+    def test_nodes_are_immutable(self):
+        atom = Atom("p", [ConstantTerm("a")])
+        self.assertRaises(AttributeError, setattr, atom, \
+        "predicate_symbol", "q")
+        self.assertRaises(AttributeError, delattr, atom, "predicate_symbol")
+
+    def test_copies_are_the_node(self):
+        atom = Atom("p", [FunctionTerm("f", [ConstantTerm("a")])])
+        self.assertIs(copy.copy(atom), atom)
+        self.assertIs(copy.deepcopy(atom), atom)
+        self.assertIs(pickle.loads(pickle.dumps(atom, 2)), atom)
+
+    def test_unused_nodes_are_released(self):
+        size = len(node_table)
+        atom = Atom("unused", [ConstantTerm("unused")])
+        self.assertEqual(len(node_table), size + 2)
+        del atom
+        gc.collect()
+        self.assertEqual(len(node_table), size)
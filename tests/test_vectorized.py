@@ -0,0 +1,69 @@
+from support import GilmoreTestCase
+from reader import parse_formula
+from gilmore import prove_valid
+from literals import multiply_encoded
+import vectorized
+from vectorized import multiply_level
+import random
+import unittest
+
+FORMULAS = [
+    "E{x}.(d(x) ==> A{y}.(d(y)))",
+    "A{x}.(E{y}.(p(x, y))) /\\ A{x}.(A{y}.(p(x, y) ==> q(x, y))) " \
+    "==> A{x}.(E{y}.(q(x, y)))",
+    "~(E{b}.(A{x}.(s(b, x) <==> ~s(x, x))))",
+    "A{x}.(E{y}.(r(x, y))) ==> E{y}.(A{x}.(r(x, y)))",
+    "p(a) /\\ A{x}.(p(x) ==> p(f(x))) ==> p(f(f(a)))",
+]
+
+def random_clause(generator, atoms):
+    positive = 0
+    negative = 0
+    for _ in range(0, generator.randint(0, 3)):
+        bit = 1 << generator.randrange(1, atoms)
+        if generator.random() < 0.5:
+            positive |= bit
+        else:
+            negative |= bit
+    return (positive, negative)
+
+class VectorizedTest(GilmoreTestCase):
+
+    def multiply(self):
+        # more than 64 atoms, so the clauses take two words
+        generator = random.Random(3)
+        for _ in range(0, 200):
+            atoms = generator.choice([4, 8, 100])
+            clause_list = [random_clause(generator, atoms) \
+            for _ in range(0, generator.randint(0, 4))]
+            instances = [[random_clause(generator, atoms) \
+            for _ in range(0, generator.randint(0, 3))] \
+            for _ in range(0, generator.randint(0, 4))]
+
+            expected = clause_list
+            for instance in instances:
+                expected = multiply_encoded(expected, instance)
+            self.assertEqual(sorted(multiply_level(clause_list, instances)), \
+            sorted(expected), (clause_list, instances))
+
+    @unittest.skipIf(vectorized.numpy is None, "numpy is not installed")
+    def test_multiply_level(self):
+        self.multiply()
+
+    def test_multiply_level_without_numpy(self):
+        numpy = vectorized.numpy
+        vectorized.numpy = None
+        try:
+            self.multiply()
+        finally:
+            vectorized.numpy = numpy
+
+    def test_same_proofs_as_multiplication(self):
+        for text in FORMULAS:
+            results = []
+            for backend in ["multiplication", "vectorized"]:
+                GilmoreTestCase.setUp(self)
+                result = prove_valid(parse_formula(text), max_levels=4, \
+                backend=backend)
+                results.append((result.status, result.level))
+            self.assertEqual(results[0], results[1], text)